@@ -0,0 +1,233 @@
+"""
+LocationCache class: Persistent cache for geocode and elevation lookups.
+
+Address lookups (Nominatim) and elevation lookups (open-elevation) are
+slow external calls. The cache stores each result in a local JSON file,
+keyed by the normalized address or by the latitude/longitude rounded to
+about 10 meters, so provisioning many devices at the same site makes at
+most one lookup per site. An address that is not found is also cached,
+for a shorter time, and a lookup that fails with an error is not
+repeated by the same cache object.
+
+The lookups are done by a resolver object with two methods:
+
+    geocode(address) -> (latitude, longitude) or None
+    elevation(latitude, longitude) -> elevation in meters
+
+OnlineResolver uses the public web services. Pass any other object with
+the same methods, for example a fixed table in tests.
+
+Example usage:
+
+cache = LocationCache()
+latitude, longitude = cache.geocode("Seattle, WA, USA")
+elevation = cache.elevation(latitude, longitude)
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+
+# 30 days. Addresses and elevations rarely change.
+DefaultTimeToLive = 30 * 24 * 60 * 60
+
+# 1 hour for lookups that found nothing, the service may find it later.
+NegativeTimeToLive = 60 * 60
+
+DefaultPathname = os.path.join(
+    os.path.expanduser("~"), ".cache", "motionnode", "location_cache.json")
+
+
+class OnlineResolver:
+    """
+    Look up locations using the Nominatim geocoder (geopy) and the
+    open-elevation web API (requests). Both are imported on first use.
+    """
+
+    def __init__(self, max_attempts=5, user_agent="geo_app"):
+        self.__max_attempts = max_attempts
+        self.__user_agent = user_agent
+
+    def geocode(self, address):
+        """
+        Run geocode call to estimate lat/long. Try up to max_attempts
+        times, as sometimes this api times out. Returns a (latitude,
+        longitude) pair, or None if the address is not found.
+        """
+        from geopy.geocoders import Nominatim
+        from geopy.exc import GeocoderTimedOut
+
+        geolocator = Nominatim(user_agent=self.__user_agent)
+        for attempt in range(1, self.__max_attempts + 1):
+            try:
+                location = geolocator.geocode(address)
+                if not location:
+                    return None
+                return location.latitude, location.longitude
+            except GeocoderTimedOut:
+                if attempt == self.__max_attempts:
+                    raise
+
+    def elevation(self, latitude, longitude):
+        """
+        Get the elevation in meters at a location on Earth.
+        """
+        import requests
+
+        url = "https://api.open-elevation.com/api/v1/lookup?locations={},{}".format(
+            latitude, longitude
+        )
+        response = requests.get(url, timeout=30).json()
+        return response["results"][0]["elevation"]
+
+#
+# END class OnlineResolver
+#
+
+
+class LocationCache:
+    """
+    Cache geocode and elevation results in a JSON file. Entries older than
+    the time to live are looked up again. In offline mode the resolver is
+    never called, and expired entries are still used.
+    """
+
+    def __init__(self, pathname=DefaultPathname, ttl_second=DefaultTimeToLive,
+                 offline=False, resolver=None,
+                 negative_ttl_second=NegativeTimeToLive):
+        """
+        Load the cache file if it exists. Set pathname to None for an in
+        memory cache only. Lookups that found nothing are kept for
+        negative_ttl_second.
+        """
+        if None == resolver:
+            resolver = OnlineResolver()
+
+        self.__pathname = pathname
+        self.__ttl_second = ttl_second
+        self.__negative_ttl_second = negative_ttl_second
+        self.__offline = offline
+        self.__resolver = resolver
+        self.__entries = {}
+        self.__lookup_count = 0
+        # Lookups that raised an error in this run, by key.
+        self.__errors = {}
+
+        if None != pathname:
+            try:
+                with open(pathname, "r") as f:
+                    self.__entries = json.load(f)
+            except (OSError, ValueError):
+                self.__entries = {}
+
+    def lookupCount(self):
+        """
+        Return the number of resolver calls made by this cache.
+        """
+        return self.__lookup_count
+
+    def geocode(self, address):
+        """
+        Return the (latitude, longitude) pair for an address, or None if
+        the address is not found.
+        """
+        result = self.__get(
+            "address:" + normalize_address(address),
+            lambda: self.__resolver.geocode(address))
+        if None == result:
+            return None
+
+        return tuple(result)
+
+    def elevation(self, latitude, longitude):
+        """
+        Return the elevation in meters at a latitude and longitude.
+        """
+        latitude = float(latitude)
+        longitude = float(longitude)
+
+        return self.__get(
+            "elevation:{:.4f},{:.4f}".format(latitude, longitude),
+            lambda: self.__resolver.elevation(latitude, longitude))
+
+    def location(self, address):
+        """
+        Return (latitude, longitude, elevation) for an address, or None if
+        the address is not found.
+        """
+        result = self.geocode(address)
+        if None == result:
+            return None
+
+        return result + (self.elevation(*result),)
+
+    def __get(self, key, lookup):
+        entry = self.__entries.get(key)
+        now = time.time()
+
+        if None != entry:
+            ttl_second = self.__ttl_second
+            if None == entry["value"]:
+                ttl_second = self.__negative_ttl_second
+            if self.__offline or (now - entry["time"] < ttl_second):
+                return entry["value"]
+
+        if self.__offline:
+            raise RuntimeError(
+                "location lookup \"{}\" not in cache, offline mode".format(
+                    key))
+
+        if key in self.__errors:
+            raise self.__errors[key]
+
+        self.__lookup_count += 1
+        try:
+            value = lookup()
+        except Exception as e:
+            # Service down or a bad response. Do not call it again for the
+            # same key in this run.
+            self.__errors[key] = e
+            raise
+
+        # Not found is stored too, with the shorter negative_ttl_second.
+        self.__entries[key] = {"time": now, "value": value}
+        self.__save()
+
+        return value
+
+    def __save(self):
+        """
+        Write the cache file. Write a temporary file and rename it so a
+        concurrent reader never sees a partial file.
+        """
+        if None == self.__pathname:
+            return
+
+        directory = os.path.dirname(os.path.abspath(self.__pathname))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_pathname = tempfile.mkstemp(dir=directory)
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.__entries, f, indent=1, sort_keys=True)
+            os.replace(temp_pathname, self.__pathname)
+        except OSError:
+            # Read only location. Keep the in memory cache.
+            pass
+
+#
+# END class LocationCache
+#
+
+
+def normalize_address(address):
+    """
+    Lower case, single spaces, no space around commas. So that
+    "Seattle,WA , USA" and "seattle, wa, usa" share a cache entry.
+    """
+    address = re.sub(r"\s+", " ", address.strip().lower())
+    return re.sub(r"\s*,\s*", ",", address)
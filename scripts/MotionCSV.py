@@ -0,0 +1,146 @@
+"""
+MotionCSV module: Block buffered CSV output.
+
+CSVWriter collects rows of values and formats a whole block at once, with
+a single string format operation, then writes it with a single call. The
+block is written when it holds block_frames rows, or when the oldest row
+is older than flush_second, so output still follows a live stream
+closely.
+
+Values are written with a fixed number of decimal places. By default
+trailing zeros are removed, so the output matches "{}".format(round(v, 8))
+for values from 0.0001 up to 1e16 in magnitude. Smaller and larger values
+are written in fixed point, not in exponent notation: 1e-05 is written as
+0.00001 and -3.2e-05 as -0.000032. Set width to pad every value to a
+fixed width instead.
+
+Example usage:
+
+writer = CSVWriter(sys.stdout, precision=8)
+writer.writeLine("Node01.ax,Node01.ay,Node01.az")
+while True:
+    writer.writeRow(values)
+writer.close()
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import re
+import time
+
+# Trailing zeros of each value. Every value has a decimal point, so these
+# are always in the fraction.
+TrailingZeros = re.compile(r"0+(?=[,\n])")
+
+
+class CSVWriter:
+    """
+    Buffer rows of numbers and write them as CSV text in blocks.
+    """
+
+    def __init__(self, out, precision=8, width=0, block_frames=256,
+                 flush_second=0.5, profile=None):
+        """
+        Parameter out is a text file object. Parameter precision is the
+        number of decimal places. Set width to a positive number to pad
+        every value to that width and keep trailing zeros. Parameter
+        profile is an optional MotionProfile.StageProfile, the time to
+        format and write each block is added to the "format" and "write"
+        stages.
+        """
+        self.__out = out
+        self.__profile = profile
+        self.__block_frames = max(1, block_frames)
+        self.__flush_second = flush_second
+        self.__trim = (width <= 0) and (precision > 0)
+
+        if width > 0:
+            self.__value_format = "%{}.{}f".format(width, precision)
+        else:
+            self.__value_format = "%.{}f".format(precision)
+
+        self.__values = []
+        self.__num_rows = 0
+        self.__num_columns = 0
+        self.__row_format = None
+        self.__block_time = None
+
+        self.__bytes_written = 0
+
+    def bytesWritten(self):
+        """
+        Return the number of characters written so far.
+        """
+        return self.__bytes_written
+
+    def writeRow(self, values):
+        """
+        Add one row of numbers. Rows may change length, the block is
+        written first.
+        """
+        if len(values) != self.__num_columns:
+            self.flush()
+            self.__num_columns = len(values)
+            self.__row_format = ",".join(
+                [self.__value_format] * self.__num_columns) + "\n"
+
+        if 0 == self.__num_rows:
+            self.__block_time = time.monotonic()
+
+        self.__values.extend(values)
+        self.__num_rows += 1
+
+        if (self.__num_rows >= self.__block_frames) or \
+                (time.monotonic() - self.__block_time >= self.__flush_second):
+            self.flush()
+
+    def writeLine(self, text):
+        """
+        Write a line of text, for example the header or an empty row.
+        Buffered rows are written first to keep the order.
+        """
+        self.flush()
+        self.__write(text + "\n")
+
+    def flush(self):
+        """
+        Format and write all buffered rows, and flush the output.
+        """
+        if 0 == self.__num_rows:
+            return
+
+        if None != self.__profile:
+            start_ns = time.perf_counter_ns()
+
+        text = (self.__row_format * self.__num_rows) % tuple(self.__values)
+        if self.__trim:
+            # Keep one digit after the decimal point, "1.0" not "1.".
+            text = TrailingZeros.sub("", text).replace(
+                ".,", ".0,").replace(".\n", ".0\n")
+
+        self.__values = []
+        self.__num_rows = 0
+
+        if None != self.__profile:
+            write_ns = time.perf_counter_ns()
+            self.__profile.add("format", write_ns - start_ns)
+            self.__write(text)
+            self.__profile.add("write", time.perf_counter_ns() - write_ns)
+        else:
+            self.__write(text)
+
+    def close(self):
+        """
+        Write the buffered rows. Does not close the output.
+        """
+        self.flush()
+
+    def __write(self, text):
+        self.__out.write(text)
+        self.__out.flush()
+        self.__bytes_written += len(text)
+
+#
+# END class CSVWriter
+#
@@ -0,0 +1,412 @@
+"""
+MotionColumnar module: Columnar export of recorded streams.
+
+ColumnarWriter writes stream frames directly in a column oriented layout,
+one column per node and channel, named from the name map and channel
+selection ("Node01.ax", ...). Rows are grouped, and each row group stores
+the min, max, and NaN count of every column so that readers can skip row
+groups that do not match a query.
+
+If pyarrow is installed and the file name ends in ".parquet", the writer
+produces a standard Parquet file. Otherwise it writes a self-contained
+columnar file (".mtcf") that ColumnarReader reads with numpy only:
+
+    magic "MTCF", version
+    header: JSON length (u32), JSON with the column names and metadata
+    row group 0: magic "MTRG", row count (u32),
+                 column 0 float32 values, column 1 values, ...
+    row group 1: ...
+    footer: JSON with the column names, row group offsets, and statistics
+    trailer: footer offset, footer length, magic "MTCF"
+
+Row groups are sized in bytes, row_group_bytes of buffered values, so
+the writer memory does not grow with the number of columns. If the
+writer did not close the file, for example after a crash, the footer is
+missing and ColumnarReader recovers the complete row groups from their
+headers.
+
+Example usage:
+
+writer = ColumnarWriter("take.mtcf", column_names(name_map, ChannelNames))
+writer.writeRow(values)
+writer.close()
+
+reader = ColumnarReader("take.mtcf")
+data = reader.read(["Node01.ax"], where=("Node01.ax", 1.5, None))
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import json
+import struct
+
+import numpy as np
+
+Magic = b"MTCF"
+Version = 1
+Trailer = struct.Struct("<QI4s")
+RowGroupMagic = b"MTRG"
+RowGroupHeader = struct.Struct("<4sI")
+
+# Default size of the buffered values of one row group, 16 MB.
+RowGroupBytes = 1 << 24
+
+# Row count limit of one row group, for files with few columns.
+MaxRowGroupSize = 65536
+
+
+def column_names(node_names, channel_names):
+    """
+    Return the list of column names for a list of node names and channel
+    names, in stream order: "node.channel" for each node and channel.
+    """
+    return [
+        "{}.{}".format(node, channel)
+        for node in node_names
+        for channel in channel_names
+    ]
+
+
+class ColumnarWriter:
+    """
+    Write float32 rows in column groups. Rows are buffered in a
+    preallocated array and each full row group is written as one block
+    per column.
+    """
+
+    def __init__(self, pathname, names, row_group_size=None, metadata=None,
+                 row_group_bytes=RowGroupBytes):
+        """
+        Parameter names is the list of column names. Parameter metadata is
+        an optional dictionary of strings stored in the file, for example
+        the sampling rate. Row groups hold row_group_size rows, or if
+        row_group_size is None as many rows as fit in row_group_bytes, at
+        most MaxRowGroupSize.
+        """
+        if len(set(names)) != len(names):
+            raise RuntimeError("column names must be unique")
+
+        if None == row_group_size:
+            row_group_size = min(
+                max(row_group_bytes // (4 * max(len(names), 1)), 1),
+                MaxRowGroupSize)
+
+        self.__names = list(names)
+        self.__metadata = dict(metadata or {})
+        self.__buffer = np.empty((row_group_size, len(names)), np.float32)
+        self.__count = 0
+        self.__num_rows = 0
+
+        self.__parquet = None
+        self.__output = None
+        if pathname.lower().endswith(".parquet"):
+            self.__open_parquet(pathname)
+        else:
+            self.__row_groups = []
+            self.__output = open(pathname, "wb")
+            header = json.dumps({
+                "columns": self.__names,
+                "dtype": "float32",
+                "metadata": self.__metadata,
+            }).encode("utf-8")
+            self.__output.write(Magic + struct.pack("<I", Version))
+            self.__output.write(struct.pack("<I", len(header)) + header)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def numRows(self):
+        return self.__num_rows + self.__count
+
+    def writeRow(self, values):
+        """
+        Append one row, a sequence with one value per column.
+        """
+        self.__buffer[self.__count] = values
+        self.__count += 1
+        if self.__count == self.__buffer.shape[0]:
+            self.flush()
+
+    def writeRows(self, rows):
+        """
+        Append a block of rows, an array of shape [row, column].
+        """
+        rows = np.asarray(rows, np.float32)
+        start = 0
+        while start < rows.shape[0]:
+            n = min(rows.shape[0] - start,
+                    self.__buffer.shape[0] - self.__count)
+            self.__buffer[self.__count:self.__count + n] = \
+                rows[start:start + n]
+            self.__count += n
+            start += n
+            if self.__count == self.__buffer.shape[0]:
+                self.flush()
+
+    def flush(self):
+        """
+        Write the buffered rows as a row group.
+        """
+        count = self.__count
+        if 0 == count:
+            return
+
+        block = self.__buffer[:count]
+        if None != self.__parquet:
+            import pyarrow as pa
+            self.__parquet.write_table(pa.Table.from_arrays(
+                [pa.array(block[:, i]) for i in range(len(self.__names))],
+                names=self.__names), row_group_size=count)
+        else:
+            self.__output.write(RowGroupHeader.pack(RowGroupMagic, count))
+            columns = []
+            for i in range(len(self.__names)):
+                column = np.ascontiguousarray(block[:, i])
+                finite = column[~np.isnan(column)]
+                columns.append({
+                    "offset": self.__output.tell(),
+                    "min": float(finite.min()) if finite.size else None,
+                    "max": float(finite.max()) if finite.size else None,
+                    "nan_count": int(count - finite.size),
+                })
+                self.__output.write(column.astype("<f4").tobytes())
+            self.__row_groups.append({"rows": count, "columns": columns})
+
+        self.__num_rows += count
+        self.__count = 0
+
+    def close(self):
+        """
+        Write the last row group and the footer, and close the file.
+        """
+        if (None == self.__parquet) and (None == self.__output):
+            return
+
+        self.flush()
+
+        if None != self.__parquet:
+            self.__parquet.close()
+            self.__parquet = None
+            return
+
+        footer = json.dumps({
+            "columns": self.__names,
+            "dtype": "float32",
+            "rows": self.__num_rows,
+            "row_groups": self.__row_groups,
+            "metadata": self.__metadata,
+        }).encode("utf-8")
+
+        offset = self.__output.tell()
+        self.__output.write(footer)
+        self.__output.write(Trailer.pack(offset, len(footer), Magic))
+        self.__output.close()
+        self.__output = None
+
+    def __open_parquet(self, pathname):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError(
+                "pyarrow is required to write Parquet files, use a .mtcf "
+                "file name to write the built in columnar format")
+
+        schema = pa.schema(
+            [(name, pa.float32()) for name in self.__names],
+            metadata=dict(
+                (str(k), str(v)) for k, v in self.__metadata.items()))
+        self.__parquet = pq.ParquetWriter(pathname, schema)
+
+#
+# END class ColumnarWriter
+#
+
+
+class ColumnarReader:
+    """
+    Read the built in columnar format written by ColumnarWriter. Only the
+    requested columns of the row groups that can match the query are
+    read. If the footer is missing the complete row groups are recovered,
+    see recovered().
+    """
+
+    def __init__(self, pathname):
+        self.__input = None
+        self.__input = open(pathname, "rb")
+
+        header = self.__input.read(len(Magic) + 4)
+        if (len(header) < len(Magic) + 4) or (Magic != header[:len(Magic)]):
+            raise RuntimeError("not a columnar stream file")
+        version = struct.unpack_from("<I", header, len(Magic))[0]
+        if Version != version:
+            raise RuntimeError(
+                "unsupported columnar stream file version {}".format(version))
+
+        self.__recovered = False
+        self.__footer = self.__read_footer()
+        if None == self.__footer:
+            self.__footer = self.__recover()
+            self.__recovered = True
+
+        self.__column_index = dict(
+            (name, i) for i, name in enumerate(self.__footer["columns"]))
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if None != self.__input:
+            self.__input.close()
+            self.__input = None
+
+    def recovered(self):
+        """
+        Return True if the file has no footer, the writer was not closed.
+        Only the complete row groups are read.
+        """
+        return self.__recovered
+
+    def columns(self):
+        return list(self.__footer["columns"])
+
+    def numRows(self):
+        return self.__footer["rows"]
+
+    def metadata(self):
+        return dict(self.__footer["metadata"])
+
+    def rowGroups(self):
+        """
+        Return the row group list from the footer, with the per column
+        statistics.
+        """
+        return self.__footer["row_groups"]
+
+    def read(self, columns=None, where=None):
+        """
+        Return a map from column name to a float32 array.
+
+        Parameter where is an optional (column, minimum, maximum) filter,
+        either bound may be None. Row groups whose statistics show no
+        value in range are skipped, and the remaining rows are filtered.
+        """
+        if None == columns:
+            columns = self.columns()
+
+        names = list(columns)
+        if (None != where) and (where[0] not in names):
+            names.append(where[0])
+
+        result = dict((name, []) for name in names)
+        for group in self.__footer["row_groups"]:
+            if (None != where) and \
+                    not self.__may_match(group, where[0], where[1], where[2]):
+                continue
+
+            block = dict(
+                (name, self.__read_column(group, name)) for name in names)
+
+            if None != where:
+                mask = np.ones(group["rows"], bool)
+                if None != where[1]:
+                    mask &= block[where[0]] >= where[1]
+                if None != where[2]:
+                    mask &= block[where[0]] <= where[2]
+                block = dict((name, v[mask]) for name, v in block.items())
+
+            for name in names:
+                result[name].append(block[name])
+
+        return dict(
+            (name, np.concatenate(result[name]) if len(result[name])
+             else np.zeros(0, np.float32))
+            for name in columns)
+
+    def __read_footer(self):
+        """
+        Return the footer, or None if the trailer is missing.
+        """
+        size = self.__input.seek(0, 2)
+        if size < len(Magic) + 4 + Trailer.size:
+            return None
+
+        self.__input.seek(-Trailer.size, 2)
+        offset, length, magic = Trailer.unpack(self.__input.read(Trailer.size))
+        if (Magic != magic) or (offset + length + Trailer.size != size):
+            return None
+
+        self.__input.seek(offset)
+        return json.loads(self.__input.read(length).decode("utf-8"))
+
+    def __recover(self):
+        """
+        Build the footer from the file header and the row group headers.
+        Stops at the first incomplete row group. The statistics are
+        computed from the values.
+        """
+        self.__input.seek(len(Magic) + 4)
+        data = self.__input.read(4)
+        if len(data) < 4:
+            raise RuntimeError("columnar stream file has no header")
+        length = struct.unpack("<I", data)[0]
+        data = self.__input.read(length)
+        if len(data) < length:
+            raise RuntimeError("columnar stream file has no header")
+
+        footer = json.loads(data.decode("utf-8"))
+        num_columns = len(footer["columns"])
+        footer["row_groups"] = []
+        footer["rows"] = 0
+
+        while True:
+            data = self.__input.read(RowGroupHeader.size)
+            if len(data) < RowGroupHeader.size:
+                break
+            magic, rows = RowGroupHeader.unpack(data)
+            if (RowGroupMagic != magic) or (0 == rows):
+                break
+
+            offset = self.__input.tell()
+            data = self.__input.read(4 * rows * num_columns)
+            if len(data) < 4 * rows * num_columns:
+                break
+
+            block = np.frombuffer(data, "<f4").reshape(num_columns, rows)
+            columns = []
+            for i in range(num_columns):
+                finite = block[i][~np.isnan(block[i])]
+                columns.append({
+                    "offset": offset + 4 * rows * i,
+                    "min": float(finite.min()) if finite.size else None,
+                    "max": float(finite.max()) if finite.size else None,
+                    "nan_count": int(rows - finite.size),
+                })
+            footer["row_groups"].append({"rows": rows, "columns": columns})
+            footer["rows"] += rows
+
+        return footer
+
+    def __may_match(self, group, name, minimum, maximum):
+        stats = group["columns"][self.__column_index[name]]
+        if None == stats["min"]:
+            return False
+        if (None != minimum) and (stats["max"] < minimum):
+            return False
+        if (None != maximum) and (stats["min"] > maximum):
+            return False
+        return True
+
+    def __read_column(self, group, name):
+        stats = group["columns"][self.__column_index[name]]
+        self.__input.seek(stats["offset"])
+        return np.frombuffer(
+            self.__input.read(4 * group["rows"]), "<f4").astype(np.float32)
+
+#
+# END class ColumnarReader
+#
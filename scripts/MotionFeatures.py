@@ -0,0 +1,253 @@
+"""
+MotionFeatures module: Sliding window features over live streams.
+
+WindowFeatures keeps the last N frames of every node and channel in a ring
+buffer, together with running sums of the values and squared values.
+Each new frame updates the mean, variance, and RMS in O(1) per channel,
+regardless of the window length. Spectral band energy is computed with
+one batched FFT over all nodes and channels every hop frames.
+
+Each node keeps its own sample count. A node missing from a frame, or
+added after the window started, has no sample for that frame, so it does
+not bias the statistics of that node toward zero.
+
+Example usage:
+
+# 2 second window at 1000 Hz, spectral features 4 times per second.
+features = WindowFeatures(6, window=2000, hop=250, sampling_rate=1000,
+                          bands=[(0.5, 3), (3, 10), (10, 30)])
+while True:
+    container = MotionSDK.Format.Configurable(client.readData())
+    energy = features.updateContainer(container)
+    if energy is not None:
+        classify(features.mean(), features.variance(), energy)
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import numpy as np
+
+from MotionFilter import present_rows, stack_container
+
+
+class WindowFeatures:
+    """
+    Incremental windowed statistics for arrays of shape [node, channel].
+    All results are arrays of shape [node, channel], or
+    [band, node, channel] for the spectral energy.
+    """
+
+    def __init__(self, num_channels, window, hop=None, sampling_rate=100,
+                 bands=None):
+        """
+        Parameter window is the number of frames in the window and hop the
+        number of frames between spectral updates, default window. Each
+        band is a [low, high) frequency range in Hz. The default single
+        band is all frequencies above DC.
+        """
+        if window <= 1:
+            raise RuntimeError("feature window must be at least 2 frames")
+
+        if None == hop:
+            hop = window
+        if None == bands:
+            bands = [(0, np.inf)]
+
+        self.__num_channels = num_channels
+        self.__window = window
+        self.__hop = hop
+        self.__node_index = {}
+
+        # Boolean mask per band over the rfft frequency bins, excluding
+        # the DC bin.
+        frequency = np.fft.rfftfreq(window, 1.0 / sampling_rate)
+        self.__band_mask = np.array([
+            (frequency > 0) & (frequency >= low) & (frequency < high)
+            for low, high in bands
+        ], np.float64)
+
+        self.__allocate(0)
+
+    def nodeIndex(self):
+        """
+        Return the map from node key to row in the result arrays.
+        """
+        return self.__node_index
+
+    def count(self):
+        """
+        Return the number of frames in the window, at most window.
+        """
+        return self.__count
+
+    def nodeCount(self):
+        """
+        Return the number of samples of each node in the window, an array
+        of shape [node].
+        """
+        return self.__node_count.copy()
+
+    def mean(self):
+        return self.__sum / self.__divisor()
+
+    def variance(self):
+        mean = self.mean()
+        return np.maximum(self.__sum_sq / self.__divisor() - mean * mean, 0)
+
+    def rms(self):
+        return np.sqrt(self.__sum_sq / self.__divisor())
+
+    def window(self):
+        """
+        Return a copy of the window contents in time order, shape
+        [frame, node, channel]. Samples of absent nodes are zero.
+        """
+        if self.__count < self.__window:
+            return self.__buffer[:self.__count].copy()
+
+        return np.roll(self.__buffer, -self.__position, axis=0)
+
+    def spectralEnergy(self):
+        """
+        Compute the energy in each band for the current window, mean
+        removed. Absent samples are zero after the mean is removed.
+        Returns an array of shape [band, node, channel].
+        """
+        data = self.__buffer[:self.__count]
+        if self.__count < 2:
+            return np.zeros(
+                (len(self.__band_mask),) + self.__buffer.shape[1:])
+
+        # A circular shift of the window only changes the phase of the
+        # spectrum, so the ring buffer does not need to be reordered.
+        present = self.__present[:self.__count, :, np.newaxis]
+        power = np.abs(np.fft.rfft((data - self.mean()) * present,
+                                   self.__window, axis=0)) ** 2
+        power /= self.__divisor()
+
+        return np.tensordot(self.__band_mask, power, axes=(1, 0))
+
+    def update(self, frame, present=None):
+        """
+        Add one frame of shape [node, channel]. Parameter present is an
+        optional [node] mask of the nodes in this frame, None if all
+        nodes are present. Returns the spectral energy if this frame
+        completes a hop, otherwise None.
+        """
+        frame = np.asarray(frame, np.float64)
+        if present is not None:
+            present = np.asarray(present, bool)[np.newaxis]
+        return self.updateBatch(frame[np.newaxis], present)
+
+    def updateBatch(self, frames, present=None):
+        """
+        Add a block of frames of shape [frame, node, channel]. Parameter
+        present is an optional [frame, node] mask of the nodes in each
+        frame. The running sums are updated for the whole block at once.
+        Returns the spectral energy at the last hop boundary inside the
+        block, or None.
+        """
+        frames = np.asarray(frames, np.float64)
+        if frames.shape[1] != self.__buffer.shape[1]:
+            self.__grow(frames.shape[1])
+
+        if present is None:
+            present = np.ones(frames.shape[:2], bool)
+        else:
+            # Absent samples are stored as zero, they add nothing to the
+            # sums.
+            present = np.asarray(present, bool)
+            frames = np.where(present[:, :, np.newaxis], frames, 0.0)
+
+        result = None
+        start = 0
+        while start < frames.shape[0]:
+            # Split the block at hop boundaries and at the end of the ring
+            # buffer.
+            n = min(frames.shape[0] - start,
+                    self.__hop - self.__since_hop,
+                    self.__window - self.__position)
+            block = frames[start:start + n]
+            block_present = present[start:start + n]
+            ring = slice(self.__position, self.__position + n)
+
+            # Subtract the frames that fall out of the window.
+            if self.__count == self.__window:
+                outgoing = self.__buffer[ring]
+                self.__sum -= outgoing.sum(axis=0)
+                self.__sum_sq -= np.square(outgoing).sum(axis=0)
+                self.__node_count -= self.__present[ring].sum(axis=0)
+
+            self.__buffer[ring] = block
+            self.__present[ring] = block_present
+            self.__sum += block.sum(axis=0)
+            self.__sum_sq += np.square(block).sum(axis=0)
+            self.__node_count += block_present.sum(axis=0)
+
+            self.__count = min(self.__count + n, self.__window)
+            self.__position += n
+            if self.__position == self.__window:
+                self.__position = 0
+                # Recompute the sums once per window so that rounding
+                # errors do not accumulate.
+                self.__sum = self.__buffer.sum(axis=0)
+                self.__sum_sq = np.square(self.__buffer).sum(axis=0)
+
+            self.__since_hop += n
+            if self.__since_hop == self.__hop:
+                self.__since_hop = 0
+                result = self.spectralEnergy()
+
+            start += n
+
+        return result
+
+    def updateContainer(self, container):
+        """
+        Add one frame from Format.Configurable. Nodes are added the first
+        time their key is seen. Nodes missing from this frame have no
+        sample for it.
+        """
+        frame = stack_container(
+            container, self.__node_index, self.__num_channels)
+        return self.update(
+            frame, present_rows(container, self.__node_index))
+
+    def __divisor(self):
+        """
+        Return the per node sample counts as a [node, 1] array, at least 1.
+        """
+        return np.maximum(self.__node_count, 1)[:, np.newaxis]
+
+    def __allocate(self, num_nodes):
+        shape = (num_nodes, self.__num_channels)
+        self.__buffer = np.zeros((self.__window,) + shape)
+        self.__present = np.zeros((self.__window, num_nodes), bool)
+        self.__sum = np.zeros(shape)
+        self.__sum_sq = np.zeros(shape)
+        self.__node_count = np.zeros(num_nodes, np.int64)
+        self.__count = 0
+        self.__position = 0
+        self.__since_hop = 0
+
+    def __grow(self, num_nodes):
+        """
+        Add rows for new nodes. The new rows have no samples for the part
+        of the window before they were added.
+        """
+        old = self.__buffer.shape[1]
+        if num_nodes < old:
+            raise RuntimeError(
+                "frame has {} nodes, window has {}".format(num_nodes, old))
+
+        pad = ((0, 0), (0, num_nodes - old), (0, 0))
+        self.__buffer = np.pad(self.__buffer, pad)
+        self.__present = np.pad(self.__present, pad[:2])
+        self.__sum = np.pad(self.__sum, pad[1:])
+        self.__sum_sq = np.pad(self.__sum_sq, pad[1:])
+        self.__node_count = np.pad(self.__node_count, pad[1])
+
+#
+# END class WindowFeatures
+#
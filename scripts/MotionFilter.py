@@ -0,0 +1,277 @@
+"""
+MotionFilter module: Streaming IIR filters for sensor channels.
+
+FilterBank applies a cascade of biquad (second order IIR) sections to every
+channel of every node. Filter state is kept in arrays indexed by
+[section, node, channel], so one frame of all nodes and channels is
+filtered in a single vectorized step. Filters can be changed while
+streaming without resetting the state.
+
+Example usage:
+
+# Accelerometer, magnetometer, gyroscope. 9 channels per node.
+bank = FilterBank(9, sampling_rate=1000)
+bank.setFilter("lowpass", 20, channels=slice(0, 6))
+bank.setFilter("highpass", 0.5, channels=slice(6, 9))
+
+while True:
+    container = MotionSDK.Format.Configurable(client.readData())
+    filtered = bank.processContainer(container)
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import math
+
+import numpy as np
+
+
+def design_biquad(kind, frequency_hz, sampling_rate, q=math.sqrt(0.5)):
+    """
+    Return normalized biquad coefficients (b0, b1, b2, a1, a2) from the
+    Audio EQ Cookbook (R. Bristow-Johnson) formulas.
+
+    Parameter kind is one of "lowpass", "highpass", "bandpass", "notch",
+    or "pass" for an identity section. Parameter frequency_hz is the
+    cutoff or center frequency, q the quality factor.
+    """
+    if "pass" == kind:
+        return (1.0, 0.0, 0.0, 0.0, 0.0)
+
+    if not (0 < frequency_hz < 0.5 * sampling_rate):
+        raise RuntimeError(
+            "filter frequency {} Hz must be between 0 and the Nyquist "
+            "frequency {} Hz".format(frequency_hz, 0.5 * sampling_rate))
+
+    w0 = 2 * math.pi * frequency_hz / sampling_rate
+    cos_w0 = math.cos(w0)
+    alpha = math.sin(w0) / (2 * q)
+
+    if "lowpass" == kind:
+        b = ((1 - cos_w0) / 2, 1 - cos_w0, (1 - cos_w0) / 2)
+    elif "highpass" == kind:
+        b = ((1 + cos_w0) / 2, -(1 + cos_w0), (1 + cos_w0) / 2)
+    elif "bandpass" == kind:
+        b = (alpha, 0.0, -alpha)
+    elif "notch" == kind:
+        b = (1.0, -2 * cos_w0, 1.0)
+    else:
+        raise RuntimeError("unknown filter type \"{}\"".format(kind))
+
+    a0 = 1 + alpha
+    a1 = -2 * cos_w0
+    a2 = 1 - alpha
+
+    return (b[0] / a0, b[1] / a0, b[2] / a0, a1 / a0, a2 / a0)
+
+
+def stack_container(container, node_index, num_channels):
+    """
+    Stack the values of a Format.Configurable frame into an array of
+    shape [node, channel]. Parameter node_index maps node key to row. Keys
+    not in the map are added if the node has num_channels values, other
+    nodes such as empty Bus nodes are skipped. Rows of nodes missing from
+    this frame are zero, see present_rows.
+    """
+    for key in container:
+        if (key not in node_index) and \
+                (container[key].size() == num_channels):
+            node_index[key] = len(node_index)
+
+    frame = np.zeros((len(node_index), num_channels))
+    for key, row in node_index.items():
+        element = container.get(key)
+        if None != element:
+            frame[row] = element.access()
+
+    return frame
+
+
+def present_rows(container, node_index):
+    """
+    Return a boolean array with one entry per row of node_index, True if
+    the node is in this Format.Configurable frame.
+    """
+    present = np.zeros(len(node_index), bool)
+    for key, row in node_index.items():
+        present[row] = key in container
+
+    return present
+
+
+class FilterBank:
+    """
+    A cascade of biquad sections applied to all channels of all nodes.
+    Each section has its own coefficients per channel, so different
+    channels of a node can use different filters.
+
+    Nodes are added the first time their key is seen. A node missing
+    from a frame keeps its filter state until it comes back. Use
+    processContainer for Format.Configurable frames, or process and
+    processBatch for arrays that are already stacked by node.
+    """
+
+    def __init__(self, num_channels, sampling_rate=100, num_sections=1,
+                 initialize=True):
+        """
+        Parameter num_channels is the number of values per node in each
+        frame. Each of the num_sections cascaded sections starts as an
+        identity filter. Set initialize to True to start the filter state
+        at the steady state response to the first frame, which avoids the
+        start up transient of a low pass filter.
+        """
+        self.__num_channels = num_channels
+        self.__sampling_rate = float(sampling_rate)
+        self.__initialize = initialize
+
+        # Coefficients [section, coefficient, channel]. Identity sections.
+        self.__coefficients = np.zeros((num_sections, 5, num_channels))
+        self.__coefficients[:, 0, :] = 1.0
+
+        # Transposed direct form II state [section, node, channel].
+        self.__z1 = np.zeros((num_sections, 0, num_channels))
+        self.__z2 = np.zeros((num_sections, 0, num_channels))
+
+        self.__node_index = {}
+        self.__primed = np.zeros(0, bool)
+
+    def numChannels(self):
+        return self.__num_channels
+
+    def nodeIndex(self):
+        """
+        Return the map from node key to row in the stacked arrays.
+        """
+        return self.__node_index
+
+    def setFilter(self, kind, frequency_hz=None, q=math.sqrt(0.5),
+                  channels=None, section=0):
+        """
+        Set the filter of one section for the selected channels, all
+        channels if channels is None. Parameter channels is anything that
+        indexes a numpy array, a slice or list of channel indices.
+
+        The filter state is kept, so reconfiguring while streaming does
+        not drop or restart any channel.
+        """
+        if None == channels:
+            channels = slice(None)
+
+        coefficients = design_biquad(
+            kind, frequency_hz, self.__sampling_rate, q)
+        for i in range(5):
+            self.__coefficients[section, i, channels] = coefficients[i]
+
+    def reset(self):
+        """
+        Clear the filter state of all nodes.
+        """
+        self.__z1[:] = 0
+        self.__z2[:] = 0
+        self.__primed[:] = False
+
+    def process(self, frame, present=None):
+        """
+        Filter one frame. Parameter frame is an array of shape
+        [node, channel] with one row per node, in the order of
+        nodeIndex(). Parameter present is a boolean array with one entry
+        per node, None if all nodes are present. Absent nodes keep their
+        filter state and their rows of the result are NaN. Returns the
+        filtered array.
+        """
+        x = np.asarray(frame, np.float64)
+        if x.shape[0] != self.__z1.shape[1]:
+            self.__resize(x.shape[0])
+
+        absent = None
+        if (present is not None) and not np.all(present):
+            absent = ~np.asarray(present, bool)
+
+        if self.__initialize and not self.__primed.all():
+            self.__prime(x, absent)
+
+        z1 = self.__z1
+        z2 = self.__z2
+        if absent is not None:
+            held = (z1[:, absent], z2[:, absent])
+
+        for s, (b0, b1, b2, a1, a2) in enumerate(self.__coefficients):
+            y = b0 * x + z1[s]
+            z1[s] = b1 * x - a1 * y + z2[s]
+            z2[s] = b2 * x - a2 * y
+            x = y
+
+        if absent is not None:
+            z1[:, absent], z2[:, absent] = held
+            x[absent] = np.nan
+
+        return x
+
+    def processBatch(self, frames):
+        """
+        Filter a block of frames with shape [frame, node, channel]. The
+        recursion runs once per frame over all nodes and channels.
+        Returns the filtered block.
+        """
+        frames = np.asarray(frames, np.float64)
+        result = np.empty_like(frames)
+        for i in range(frames.shape[0]):
+            result[i] = self.process(frames[i])
+
+        return result
+
+    def processContainer(self, container):
+        """
+        Filter one frame from Format.Configurable. Returns a map from node
+        key to an array of filtered channel values. Nodes that do not
+        have num_channels values, for example empty Bus nodes, are
+        skipped. Nodes missing from this frame are not in the result and
+        their filter state is not updated.
+        """
+        frame = stack_container(
+            container, self.__node_index, self.__num_channels)
+        result = self.process(
+            frame, present_rows(container, self.__node_index))
+
+        return dict(
+            (key, result[row]) for key, row in self.__node_index.items()
+            if key in container)
+
+    def __resize(self, num_nodes):
+        """
+        Grow the state arrays for new nodes. Existing state is kept.
+        """
+        old = self.__z1.shape[1]
+        if num_nodes < old:
+            raise RuntimeError(
+                "frame has {} nodes, filter bank has {}".format(
+                    num_nodes, old))
+
+        shape = (self.__z1.shape[0], num_nodes - old, self.__num_channels)
+        self.__z1 = np.concatenate((self.__z1, np.zeros(shape)), axis=1)
+        self.__z2 = np.concatenate((self.__z2, np.zeros(shape)), axis=1)
+        self.__primed = np.concatenate(
+            (self.__primed, np.zeros(num_nodes - old, bool)))
+
+    def __prime(self, x, absent=None):
+        """
+        Set the state of new nodes to the steady state response to a
+        constant input x. Absent nodes are primed when they first appear.
+        """
+        rows = ~self.__primed
+        if absent is not None:
+            rows &= ~absent
+        x = x[rows]
+        for s, (b0, b1, b2, a1, a2) in enumerate(self.__coefficients):
+            gain = (b0 + b1 + b2) / (1 + a1 + a2)
+            y = gain * x
+            self.__z2[s, rows] = b2 * x - a2 * y
+            self.__z1[s, rows] = y - b0 * x
+            x = y
+
+        self.__primed |= rows
+
+#
+# END class FilterBank
+#
@@ -0,0 +1,205 @@
+"""
+MotionHistory module: Fixed memory history of recent frames.
+
+History stores the most recent frames of every node and channel in
+preallocated float32 arrays, with a monotonic timestamp per frame. Memory
+use is fixed when the History is created and does not grow with the
+length of the session.
+
+The ring buffer is mirrored, each frame is written at index i and at
+i + capacity. Any run of up to capacity consecutive frames is then one
+contiguous slice, so a time range query returns numpy views without
+copying. The range is located with a binary search of the timestamps.
+
+Example usage:
+
+history = History(12, capacity=60 * 1000, max_nodes=8,
+                  channel_names=MotionHistory.ChannelNames)
+while True:
+    data = client.readData()
+    history.appendContainer(MotionSDK.Format.Configurable(data))
+
+# Last 2 seconds of the accelerometer and gyroscope of node key 2.
+timestamps, values = history.last(2.0, key=2, channels=["ax", "ay", "az"])
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import time
+
+import numpy as np
+
+# Channel names of the <a/><m/><g/><r/> Configurable request used by
+# example_stream.py.
+ChannelNames = [
+    "ax", "ay", "az", "mx", "my", "mz", "gx", "gy", "gz", "rx", "ry", "rz"
+]
+
+
+class History:
+    """
+    Ring buffer of the last capacity frames of up to max_nodes nodes.
+    Query results are views of shape [frame] for the timestamps and
+    [frame, node, channel], [frame, channel] or [frame] for the values,
+    depending on the key and channel selection. Views are only valid
+    until capacity more frames are appended, copy them to keep them.
+    """
+
+    def __init__(self, num_channels, capacity, max_nodes=1,
+                 channel_names=None):
+        """
+        Allocate the buffers, 2 * capacity * max_nodes * num_channels
+        float32 values plus 2 * capacity timestamps. Parameter
+        channel_names optionally names each channel for queries.
+        """
+        if capacity <= 0 or max_nodes <= 0:
+            raise RuntimeError("invalid history size")
+
+        if (None != channel_names) and (len(channel_names) != num_channels):
+            raise RuntimeError("expected {} channel names".format(
+                num_channels))
+
+        self.__num_channels = num_channels
+        self.__capacity = capacity
+        self.__channel_names = channel_names
+        self.__node_index = {}
+
+        self.__values = np.zeros(
+            (2 * capacity, max_nodes, num_channels), np.float32)
+        self.__timestamps = np.zeros(2 * capacity, np.float64)
+
+        # Next write position in [0, capacity) and number of frames stored.
+        self.__position = 0
+        self.__count = 0
+
+    def __len__(self):
+        return self.__count
+
+    def nodeIndex(self):
+        """
+        Return the map from node key to node row in the value arrays.
+        """
+        return self.__node_index
+
+    def nbytes(self):
+        """
+        Return the total size of the buffers in bytes.
+        """
+        return self.__values.nbytes + self.__timestamps.nbytes
+
+    def append(self, frame, timestamp=None):
+        """
+        Add one frame of shape [node, channel], rows in nodeIndex() order.
+        Parameter timestamp defaults to time.monotonic(). Timestamps must
+        not decrease.
+        """
+        if None == timestamp:
+            timestamp = time.monotonic()
+
+        frame = np.asarray(frame)
+        i = self.__position
+        j = i + self.__capacity
+        rows = frame.shape[0]
+
+        self.__values[i, :rows] = frame
+        self.__values[j, :rows] = frame
+        self.__values[i, rows:] = np.nan
+        self.__values[j, rows:] = np.nan
+        self.__timestamps[i] = timestamp
+        self.__timestamps[j] = timestamp
+
+        self.__position = (i + 1) % self.__capacity
+        self.__count = min(self.__count + 1, self.__capacity)
+
+    def appendContainer(self, container, timestamp=None):
+        """
+        Add one frame from Format.Configurable. Nodes are added the first
+        time their key is seen, nodes that do not have num_channels values
+        are skipped. Values of nodes missing from a frame are NaN.
+        """
+        frame = np.full(
+            (self.__values.shape[1], self.__num_channels), np.nan,
+            np.float32)
+        for key in container:
+            element = container[key]
+            if element.size() != self.__num_channels:
+                continue
+
+            row = self.__node_index.get(key)
+            if None == row:
+                row = len(self.__node_index)
+                if row >= self.__values.shape[1]:
+                    raise RuntimeError(
+                        "more than {} nodes in stream".format(
+                            self.__values.shape[1]))
+                self.__node_index[key] = row
+
+            frame[row] = element.access()
+
+        self.append(frame, timestamp)
+
+    def query(self, start_time, end_time, key=None, channels=None):
+        """
+        Return (timestamps, values) views for the frames with timestamp in
+        [start_time, end_time). Parameter key selects a single node,
+        channels a single channel, a slice, or a list of channel indices
+        or names. A contiguous list of channels is still returned as a
+        view, other lists are copied.
+        """
+        first, last = self.__logical_range()
+        timestamps = self.__timestamps[first:last]
+
+        lo, hi = np.searchsorted(timestamps, (start_time, end_time), "left")
+
+        values = self.__values[first + lo:first + hi]
+        if None != key:
+            values = values[:, self.__node_index[key]]
+        if None != channels:
+            values = values[..., self.__channel_selection(channels)]
+
+        return timestamps[lo:hi], values
+
+    def last(self, duration_second, key=None, channels=None):
+        """
+        Return (timestamps, values) views for the last duration_second
+        seconds before the most recent frame, inclusive.
+        """
+        if 0 == self.__count:
+            return self.query(0, 0, key, channels)
+
+        newest = self.__timestamps[self.__position + self.__capacity - 1]
+        return self.query(
+            newest - duration_second, np.nextafter(newest, np.inf), key,
+            channels)
+
+    def __logical_range(self):
+        """
+        Return the mirrored buffer range [first, last) that holds the
+        stored frames in time order.
+        """
+        last = self.__position + self.__capacity
+        return last - self.__count, last
+
+    def __channel_selection(self, channels):
+        if isinstance(channels, (int, slice)):
+            return channels
+
+        if isinstance(channels, str):
+            return self.__channel_names.index(channels)
+
+        index = [
+            self.__channel_names.index(c) if isinstance(c, str) else c
+            for c in channels
+        ]
+
+        # Contiguous channels, use a slice so the result is a view.
+        if len(index) > 0 and \
+                index == list(range(index[0], index[0] + len(index))):
+            return slice(index[0], index[0] + len(index))
+
+        return index
+
+#
+# END class History
+#
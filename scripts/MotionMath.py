@@ -0,0 +1,182 @@
+"""
+MotionMath module: Vectorized rotation math for whole frames.
+
+All functions operate on numpy arrays of any leading shape. Quaternions
+are arrays with a last dimension of 4 in [w, x, y, z] order, the same
+layout as PreviewElement.getQuaternion. Euler angles are arrays with a
+last dimension of 3 in [x, y, z] order, in radians. So a single
+quaternion, all nodes of one frame [node, 4], or many frames
+[frame, node, 4] are all handled in one call.
+
+Euler angles use x-y-z rotation order, the rotation matrix is
+R = Rx(x) * Ry(y) * Rz(z). Matrices follow Format.quaternion_to_R3_rotation,
+with a 3-by-3 rotation block.
+
+Example usage:
+
+keys, arrays = preview_arrays(MotionSDK.Format.Preview(data))
+# Orientation of each node relative to the first node.
+relative = relative_orientation(arrays["global"][0], arrays["global"])
+euler = quaternion_to_euler(relative)
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import numpy as np
+
+
+def preview_arrays(container):
+    """
+    Stack a Format.Preview frame into arrays. Returns the list of node
+    keys and a map with arrays "global" [node, 4], "local" [node, 4],
+    "euler" [node, 3], and "accelerate" [node, 3], rows in key order.
+    """
+    keys = list(container.keys())
+    data = np.array(
+        [container[key].access() for key in keys], np.float64).reshape(
+            len(keys), 14)
+
+    return keys, {
+        "global": data[:, 0:4],
+        "local": data[:, 4:8],
+        "euler": data[:, 8:11],
+        "accelerate": data[:, 11:14],
+    }
+
+
+def quaternion_multiply(a, b):
+    """
+    Hamilton product a * b.
+    """
+    a = np.asarray(a, np.float64)
+    b = np.asarray(b, np.float64)
+    aw, ax, ay, az = np.moveaxis(a, -1, 0)
+    bw, bx, by, bz = np.moveaxis(b, -1, 0)
+
+    return np.stack((
+        aw * bw - ax * bx - ay * by - az * bz,
+        aw * bx + ax * bw + ay * bz - az * by,
+        aw * by - ax * bz + ay * bw + az * bx,
+        aw * bz + ax * by - ay * bx + az * bw,
+    ), axis=-1)
+
+
+def quaternion_conjugate(q):
+    q = np.asarray(q, np.float64)
+    return q * np.array([1.0, -1.0, -1.0, -1.0])
+
+
+def quaternion_normalize(q):
+    """
+    Scale to unit length. Zero length quaternions become the identity.
+    """
+    q = np.asarray(q, np.float64)
+    norm = np.linalg.norm(q, axis=-1, keepdims=True)
+    identity = np.zeros_like(q)
+    identity[..., 0] = 1.0
+
+    return np.where(norm > 1e-12, q / np.where(norm > 1e-12, norm, 1),
+                    identity)
+
+
+def quaternion_inverse(q):
+    """
+    Inverse of a quaternion of any length. Zero length quaternions become
+    the identity.
+    """
+    q = np.asarray(q, np.float64)
+    norm_sq = np.sum(q * q, axis=-1, keepdims=True)
+    identity = np.zeros_like(q)
+    identity[..., 0] = 1.0
+
+    return np.where(norm_sq > 1e-12,
+                    quaternion_conjugate(q) / np.where(
+                        norm_sq > 1e-12, norm_sq, 1),
+                    identity)
+
+
+def relative_orientation(parent, child):
+    """
+    Rotation of child relative to parent, inverse(parent) * child. For
+    example the joint rotation between two body segments. Inputs
+    broadcast, so one parent can be compared to all nodes.
+    """
+    return quaternion_multiply(quaternion_inverse(parent), child)
+
+
+def quaternion_to_matrix(q):
+    """
+    Convert quaternions to 3-by-3 rotation matrices, shape [..., 3, 3].
+    The quaternions need not be unit length.
+    """
+    q = quaternion_normalize(q)
+    w, x, y, z = np.moveaxis(q, -1, 0)
+
+    return np.stack((
+        np.stack((1 - 2 * (y * y + z * z), 2 * (x * y - w * z),
+                  2 * (x * z + w * y)), axis=-1),
+        np.stack((2 * (x * y + w * z), 1 - 2 * (x * x + z * z),
+                  2 * (y * z - w * x)), axis=-1),
+        np.stack((2 * (x * z - w * y), 2 * (y * z + w * x),
+                  1 - 2 * (x * x + y * y)), axis=-1),
+    ), axis=-2)
+
+
+def quaternion_to_euler(q):
+    """
+    Convert quaternions to x-y-z Euler angles in radians. Angles x and z
+    lie on [-pi, pi], y on [-pi/2, pi/2].
+    """
+    r = quaternion_to_matrix(q)
+
+    return np.stack((
+        np.arctan2(-r[..., 1, 2], r[..., 2, 2]),
+        np.arcsin(np.clip(r[..., 0, 2], -1.0, 1.0)),
+        np.arctan2(-r[..., 0, 1], r[..., 0, 0]),
+    ), axis=-1)
+
+
+def euler_to_quaternion(euler):
+    """
+    Convert x-y-z Euler angles in radians to unit quaternions.
+    """
+    half = 0.5 * np.asarray(euler, np.float64)
+    c = np.cos(half)
+    s = np.sin(half)
+    cx, cy, cz = np.moveaxis(c, -1, 0)
+    sx, sy, sz = np.moveaxis(s, -1, 0)
+
+    # qx * qy * qz
+    return np.stack((
+        cx * cy * cz - sx * sy * sz,
+        sx * cy * cz + cx * sy * sz,
+        cx * sy * cz - sx * cy * sz,
+        cx * cy * sz + sx * sy * cz,
+    ), axis=-1)
+
+
+def slerp(a, b, t):
+    """
+    Spherical linear interpolation from unit quaternion a to b. Parameter
+    t broadcasts against the leading dimensions, for example a [frame]
+    array of interpolation times. Takes the shortest path, and falls back
+    to normalized linear interpolation for nearly equal rotations.
+    """
+    a = np.asarray(a, np.float64)
+    b = np.asarray(b, np.float64)
+    t = np.asarray(t, np.float64)[..., np.newaxis]
+
+    dot = np.sum(a * b, axis=-1, keepdims=True)
+    b = np.where(dot < 0, -b, b)
+    dot = np.abs(dot)
+
+    theta = np.arccos(np.clip(dot, -1.0, 1.0))
+    sin_theta = np.sin(theta)
+    near = sin_theta < 1e-6
+    safe = np.where(near, 1.0, sin_theta)
+
+    wa = np.where(near, 1 - t, np.sin((1 - t) * theta) / safe)
+    wb = np.where(near, t, np.sin(t * theta) / safe)
+
+    return quaternion_normalize(wa * a + wb * b)
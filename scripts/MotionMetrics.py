@@ -0,0 +1,337 @@
+"""
+MotionMetrics module: Health and metrics endpoint for stream processes.
+
+StreamMetrics keeps the counters of a long running stream loop, the
+frames of every node, the frame decode time, and the time each node was
+last seen. Values owned by other objects, for example the receive queue
+depth of the Client or the bytes written by the CSV writer, are added as
+gauges, functions that are called when the metrics are read.
+
+MetricsServer serves the metrics over HTTP from a background thread:
+
+    /metrics  Prometheus text format
+    /health   JSON status, HTTP 503 if no frame arrived for stale_second
+
+The stream loop only updates counters, all formatting is done in the
+server thread when the endpoint is read.
+
+Example usage:
+
+metrics = StreamMetrics()
+metrics.addGauge("queue_bytes", client.queuedBytes)
+server = MetricsServer(metrics, ("127.0.0.1", 9108))
+while True:
+    data = client.readData()
+    start_ns = time.perf_counter_ns()
+    container = MotionSDK.Format.Configurable(data)
+    metrics.frame(container, time.perf_counter_ns() - start_ns)
+
+curl http://127.0.0.1:9108/metrics
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import collections
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Prefix of every metric name.
+Prefix = "motion_"
+
+# Time between the frame count samples used for the frame rate.
+SampleSecond = 1.0
+
+
+class StreamMetrics:
+    """
+    Counters of one stream. The stream loop calls frame() once per frame,
+    any thread may call snapshot().
+    """
+
+    def __init__(self, rate_window_second=5, stale_second=5):
+        """
+        Frame rates are averaged over the last rate_window_second. The
+        stream is not healthy if no frame arrived for stale_second.
+        """
+        self.__lock = threading.Lock()
+        self.__start_time = time.monotonic()
+        self.__stale_second = stale_second
+
+        self.__frame_count = 0
+        self.__node_count = {}
+        self.__last_seen = {}
+        self.__names = {}
+
+        self.__decode_ns = 0
+        self.__decode_max_ns = 0
+        self.__decode_count = 0
+
+        # Frame counts every SampleSecond, for the frame rates.
+        self.__samples = collections.deque(
+            maxlen=max(1, int(round(rate_window_second / SampleSecond))) + 1)
+        self.__next_sample_time = self.__start_time
+
+        self.__gauges = []
+
+    def setNames(self, names):
+        """
+        Set the map from node key to node name, used to label the per
+        node metrics.
+        """
+        with self.__lock:
+            self.__names = dict(names)
+
+    def addGauge(self, name, function, help=""):
+        """
+        Add a value that is read when the metrics are read. Parameter
+        function takes no arguments and returns a number, or None if the
+        value is not available.
+        """
+        with self.__lock:
+            self.__gauges.append((name, function, help))
+
+    def frame(self, keys, decode_ns=None):
+        """
+        Count one frame with the given node keys, for example a
+        Format.Configurable container. Parameter decode_ns is the time
+        spent decoding the frame in nanoseconds.
+        """
+        now = time.monotonic()
+        with self.__lock:
+            self.__frame_count += 1
+            node_count = self.__node_count
+            last_seen = self.__last_seen
+            for key in keys:
+                node_count[key] = node_count.get(key, 0) + 1
+                last_seen[key] = now
+
+            if None != decode_ns:
+                self.__decode_ns += decode_ns
+                self.__decode_count += 1
+                if decode_ns > self.__decode_max_ns:
+                    self.__decode_max_ns = decode_ns
+
+            if now >= self.__next_sample_time:
+                self.__samples.append(
+                    (now, self.__frame_count, dict(node_count)))
+                self.__next_sample_time = now + SampleSecond
+
+    def snapshot(self):
+        """
+        Return a map with the current values of all metrics.
+        """
+        now = time.monotonic()
+        wall = time.time()
+
+        with self.__lock:
+            frame_count = self.__frame_count
+            node_count = dict(self.__node_count)
+            last_seen = dict(self.__last_seen)
+            names = dict(self.__names)
+            decode = (self.__decode_ns, self.__decode_max_ns,
+                      self.__decode_count)
+            oldest = self.__samples[0] if len(self.__samples) else None
+            gauges = list(self.__gauges)
+
+        frame_rate = 0.0
+        node_rate = dict((key, 0.0) for key in node_count)
+        if (None != oldest) and (now - oldest[0] > 0):
+            elapsed = now - oldest[0]
+            frame_rate = (frame_count - oldest[1]) / elapsed
+            for key, count in node_count.items():
+                node_rate[key] = (count - oldest[2].get(key, 0)) / elapsed
+
+        nodes = []
+        for key in sorted(node_count):
+            nodes.append({
+                "key": key,
+                "name": names.get(key, str(key)),
+                "frames": node_count[key],
+                "frame_rate": node_rate[key],
+                "last_seen": wall - (now - last_seen[key]),
+                "age_second": now - last_seen[key],
+            })
+
+        last_frame = max(last_seen.values()) if len(last_seen) else None
+
+        result = {
+            "uptime_second": now - self.__start_time,
+            "frames": frame_count,
+            "frame_rate": frame_rate,
+            "decode_second": decode[0] * 1e-9,
+            "decode_max_second": decode[1] * 1e-9,
+            "decode_count": decode[2],
+            "healthy": (None != last_frame) and
+                       (now - last_frame <= self.__stale_second),
+            "nodes": nodes,
+            "gauges": [],
+        }
+
+        for name, function, help in gauges:
+            try:
+                value = function()
+            except Exception:
+                value = None
+            result["gauges"].append((name, value, help))
+
+        return result
+
+    def prometheus(self):
+        """
+        Return the metrics in the Prometheus text exposition format.
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def add(name, kind, help, samples):
+            lines.append("# HELP {}{} {}".format(Prefix, name, help))
+            lines.append("# TYPE {}{} {}".format(Prefix, name, kind))
+            for labels, value in samples:
+                lines.append("{}{}{} {}".format(
+                    Prefix, name, labels, format_value(value)))
+
+        add("uptime_seconds", "gauge", "Time since the metrics started.",
+            [("", snapshot["uptime_second"])])
+        add("frames_total", "counter", "Frames read from the stream.",
+            [("", snapshot["frames"])])
+        add("frame_rate", "gauge", "Frames per second, recent average.",
+            [("", snapshot["frame_rate"])])
+        add("decode_seconds", "summary", "Time spent decoding frames.", [
+            ("_sum", snapshot["decode_second"]),
+            ("_count", snapshot["decode_count"]),
+        ])
+        add("decode_max_seconds", "gauge", "Longest frame decode time.",
+            [("", snapshot["decode_max_second"])])
+
+        nodes = snapshot["nodes"]
+        labels = [
+            '{{key="{}",node="{}"}}'.format(
+                node["key"], escape_label(node["name"]))
+            for node in nodes
+        ]
+        add("node_frames_total", "counter", "Frames of each node.",
+            [(label, node["frames"]) for label, node in zip(labels, nodes)])
+        add("node_frame_rate", "gauge",
+            "Frames per second of each node, recent average.",
+            [(label, node["frame_rate"])
+             for label, node in zip(labels, nodes)])
+        add("node_last_seen_timestamp_seconds", "gauge",
+            "Time of the last frame of each node, seconds since the epoch.",
+            [(label, node["last_seen"])
+             for label, node in zip(labels, nodes)])
+
+        for name, value, help in snapshot["gauges"]:
+            if None != value:
+                add(name, "gauge", help or name, [("", value)])
+
+        return "\n".join(lines) + "\n"
+
+    def health(self):
+        """
+        Return the healthy flag and a short JSON status.
+        """
+        snapshot = self.snapshot()
+        status = {
+            "healthy": snapshot["healthy"],
+            "uptime_second": round(snapshot["uptime_second"], 3),
+            "frames": snapshot["frames"],
+            "frame_rate": round(snapshot["frame_rate"], 3),
+            "nodes": dict(
+                (node["name"], round(node["age_second"], 3))
+                for node in snapshot["nodes"]),
+        }
+        for name, value, _ in snapshot["gauges"]:
+            status[name] = value
+
+        return snapshot["healthy"], json.dumps(status)
+
+#
+# END class StreamMetrics
+#
+
+
+class MetricsServer:
+    """
+    Serve a StreamMetrics object over HTTP from a background thread.
+    """
+
+    def __init__(self, metrics, address=("127.0.0.1", 9108)):
+        """
+        Start serving on address, a (host, port) pair. Port 0 picks a free
+        port, see address(). Throws the socket error if the port is in use.
+        """
+        self.__server = ThreadingHTTPServer(address, MetricsHandler)
+        self.__server.daemon_threads = True
+        self.__server.metrics = metrics
+
+        self.__thread = threading.Thread(
+            target=self.__server.serve_forever, args=(0.5,), daemon=True)
+        self.__thread.start()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if None != self.__server:
+            self.__server.shutdown()
+            self.__thread.join()
+            self.__server.server_close()
+            self.__server = None
+
+    def address(self):
+        return self.__server.server_address
+
+#
+# END class MetricsServer
+#
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """
+    Request handler of MetricsServer.
+    """
+
+    def do_GET(self):
+        metrics = self.server.metrics
+        path = self.path.split("?")[0]
+
+        if "/metrics" == path:
+            self.__reply(
+                200, "text/plain; version=0.0.4", metrics.prometheus())
+        elif "/health" == path:
+            healthy, text = metrics.health()
+            self.__reply(200 if healthy else 503, "application/json", text)
+        else:
+            self.__reply(404, "text/plain", "not found\n")
+
+    def log_message(self, format, *args):
+        # Do not write a line to stderr for every scrape.
+        pass
+
+    def __reply(self, code, content_type, text):
+        body = text.encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+#
+# END class MetricsHandler
+#
+
+
+def format_value(value):
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    return repr(float(value))
+
+
+def escape_label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace(
+        "\n", "\\n")
@@ -0,0 +1,465 @@
+"""
+MotionMonitor module: Online sensor fault detection.
+
+Monitor checks every frame of the Configurable stream for common sensor
+faults, for all nodes at once:
+
+    stuck       a channel repeats the same value for stuck_second
+    clipping    an accelerometer axis is at the accel_range (gselect) limit
+    nan         a channel value is NaN or infinite
+    gyro_bias   the gyroscope mean is above gyro_bias_limit while the node
+                is at rest
+    magnetic    the magnetometer magnitude moves away from its running
+                reference, a magnetic disturbance
+    rate        the node frame rate is below its sampling_rate
+
+Per node state is kept in arrays, so the cost of a frame does not depend
+much on the number of nodes. An Event is created when a fault starts and
+when it clears, not for every frame, so a faulty node does not flood the
+output.
+
+The checks take about 0.2 ms per frame for 40 nodes. MonitorThread runs
+them in a background thread fed by a bounded queue, so the stream loop
+only queues the decoded frame.
+
+The channel layout defaults to the <a/><m/><g/><r/> request of
+example_stream.py. Set a channel group to None to disable its checks.
+
+Example usage:
+
+is_node_reading, node_list = scan_and_start_reading(args, host)
+monitor = Monitor(node_list)
+while True:
+    data = client.readData()
+    for event in monitor.updateContainer(MotionSDK.Format.Configurable(data)):
+        print(event)
+
+# or off the stream loop
+thread = MonitorThread(Monitor(node_list))
+while True:
+    data = client.readData()
+    for event in thread.updateContainer(MotionSDK.Format.Configurable(data)):
+        print(event)
+thread.close()
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import collections
+import threading
+import time
+
+import numpy as np
+
+Kinds = ["stuck", "clipping", "nan", "gyro_bias", "magnetic", "rate"]
+
+
+class Event:
+    """
+    A fault that started (active is True) or cleared (active is False) on
+    one node, and one channel for channel level faults.
+    """
+
+    def __init__(self, timestamp, key, name, kind, active, channel=None,
+                 value=None):
+        self.timestamp = timestamp
+        self.key = key
+        self.name = name
+        self.kind = kind
+        self.active = active
+        self.channel = channel
+        self.value = value
+
+    def __str__(self):
+        result = "{} {} {}".format(
+            self.name, self.kind, "started" if self.active else "cleared")
+        if None != self.channel:
+            result += " channel {}".format(self.channel)
+        if None != self.value:
+            result += " value {:.4g}".format(self.value)
+        return result
+
+    def __repr__(self):
+        return "Event({})".format(self)
+
+#
+# END class Event
+#
+
+
+class Monitor:
+    """
+    Check a stream of frames for sensor faults. Configure with the node
+    list from scan_and_start_reading, a list of dictionaries with the key,
+    name, sampling_rate, and accel_range of each node.
+    """
+
+    def __init__(self, node_list, num_channels=12, accelerometer=(0, 1, 2),
+                 magnetometer=(3, 4, 5), gyroscope=(6, 7, 8),
+                 stuck_second=0.5, clip_fraction=0.98, gyro_bias_limit=2.0,
+                 gyro_bias_second=5.0, magnetic_tolerance=0.25,
+                 rate_tolerance=0.2, rate_window_second=1.0, callback=None):
+        """
+        Parameters accelerometer, magnetometer, and gyroscope are the
+        channel indices of each sensor, or None. An accelerometer value
+        at clip_fraction of the accel_range is clipped. Parameter
+        gyro_bias_limit is in the gyroscope units (degrees per second),
+        averaged over gyro_bias_second. The magnetometer is disturbed if
+        its magnitude is off by more than magnetic_tolerance of the
+        reference. The rate is checked every rate_window_second.
+        Parameter callback is an optional function called with each
+        Event.
+        """
+        if 0 == len(node_list):
+            raise RuntimeError("empty node list")
+
+        self.__keys = [node["key"] for node in node_list]
+        self.__names = [node.get("name", str(node["key"])) for node in node_list]
+        self.__node_index = dict(
+            (key, i) for i, key in enumerate(self.__keys))
+        self.__num_channels = num_channels
+
+        self.__accelerometer = accelerometer
+        self.__magnetometer = magnetometer
+        self.__gyroscope = gyroscope
+        self.__callback = callback
+
+        num_nodes = len(node_list)
+        rate = np.array(
+            [node.get("sampling_rate", 100) for node in node_list],
+            np.float64)
+        self.__sampling_rate = rate
+        self.__accel_limit = clip_fraction * np.array(
+            [node.get("accel_range", 2) for node in node_list], np.float64)
+
+        self.__stuck_frames = np.maximum(
+            np.round(stuck_second * rate), 2).astype(np.int64)[:, np.newaxis]
+        self.__gyro_bias_limit = gyro_bias_limit
+        self.__gyro_alpha = 1.0 / np.maximum(gyro_bias_second * rate, 1)
+        self.__magnetic_tolerance = magnetic_tolerance
+        self.__rate_tolerance = rate_tolerance
+        self.__rate_window_second = rate_window_second
+
+        shape = (num_nodes, num_channels)
+        self.__previous = np.full(shape, np.nan, np.float32)
+        self.__stuck_count = np.zeros(shape, np.int64)
+        self.__gyro_mean = np.zeros((num_nodes, 3), np.float64)
+        self.__gyro_count = np.zeros(num_nodes, np.int64)
+        self.__magnetic_reference = np.full(num_nodes, np.nan, np.float64)
+
+        self.__window_start = None
+        self.__window_count = np.zeros(num_nodes, np.int64)
+
+        self.__active = {
+            "stuck": np.zeros(shape, bool),
+            "clipping": np.zeros((num_nodes, 3), bool),
+            "nan": np.zeros(num_nodes, bool),
+            "gyro_bias": np.zeros(num_nodes, bool),
+            "magnetic": np.zeros(num_nodes, bool),
+            "rate": np.zeros(num_nodes, bool),
+        }
+        self.__event_count = dict((kind, 0) for kind in Kinds)
+
+    def nodeIndex(self):
+        """
+        Return the map from node key to node row in the frame arrays.
+        """
+        return self.__node_index
+
+    def active(self, kind):
+        """
+        Return the current fault flags of one kind, an array of shape
+        [node, channel] for stuck, [node, axis] for clipping, and [node]
+        for the others.
+        """
+        return self.__active[kind].copy()
+
+    def eventCount(self):
+        """
+        Return the number of faults started, by kind.
+        """
+        return dict(self.__event_count)
+
+    def updateContainer(self, container, timestamp=None, count=1):
+        """
+        Check one frame from Format.Configurable. Nodes not in the node
+        list are ignored, nodes missing from the frame are not checked.
+        Returns the list of new Events.
+        """
+        frame = np.full(
+            (len(self.__keys), self.__num_channels), np.nan, np.float32)
+        present = np.zeros(len(self.__keys), bool)
+        for key in container:
+            row = self.__node_index.get(key)
+            if None == row:
+                continue
+
+            element = container[key]
+            if element.size() != self.__num_channels:
+                continue
+
+            frame[row] = element.access()
+            present[row] = True
+
+        return self.update(frame, present, timestamp, count)
+
+    def update(self, frame, present=None, timestamp=None, count=1):
+        """
+        Check one frame of shape [node, channel], rows in nodeIndex()
+        order. Parameter present is an optional [node] mask of the nodes
+        in this frame. Parameter count is the number of frames this frame
+        stands for in the rate check, more than 1 if frames were skipped.
+        Returns the list of new Events.
+        """
+        if None == timestamp:
+            timestamp = time.monotonic()
+
+        frame = np.asarray(frame, np.float32)
+        if present is None:
+            present = np.ones(len(self.__keys), bool)
+
+        events = []
+        column = present[:, np.newaxis]
+
+        finite = np.isfinite(frame)
+        self.__set("nan", np.where(present, ~np.all(finite, axis=1),
+                                   self.__active["nan"]),
+                   timestamp, events)
+
+        # Stuck, exactly the same value as the previous frame.
+        same = (frame == self.__previous) & column
+        self.__stuck_count = np.where(
+            same, self.__stuck_count + 1,
+            np.where(column, 0, self.__stuck_count))
+        self.__previous = np.where(column, frame, self.__previous)
+        self.__set("stuck", self.__stuck_count >= self.__stuck_frames,
+                   timestamp, events, frame)
+
+        at_rest = present.copy()
+        if None != self.__accelerometer:
+            accel = frame[:, self.__accelerometer]
+            self.__set(
+                "clipping",
+                np.where(column,
+                         np.abs(accel) >= self.__accel_limit[:, np.newaxis],
+                         self.__active["clipping"]),
+                timestamp, events, accel, self.__accelerometer)
+
+            # Only gravity, within 5 percent.
+            magnitude = np.linalg.norm(accel, axis=1)
+            at_rest &= np.abs(magnitude - 1.0) < 0.05
+
+        if None != self.__gyroscope:
+            self.__check_gyroscope(
+                frame[:, self.__gyroscope], at_rest, timestamp, events)
+
+        if None != self.__magnetometer:
+            self.__check_magnetometer(
+                frame[:, self.__magnetometer], present, timestamp, events)
+
+        self.__check_rate(present * count, timestamp, events)
+
+        if None != self.__callback:
+            for event in events:
+                self.__callback(event)
+
+        return events
+
+    def __check_gyroscope(self, gyro, at_rest, timestamp, events):
+        """
+        Average the gyroscope while at rest. The mean of a node at rest is
+        its bias.
+        """
+        at_rest = at_rest & np.all(np.isfinite(gyro), axis=1)
+        alpha = np.where(at_rest, self.__gyro_alpha, 0)[:, np.newaxis]
+        self.__gyro_mean += alpha * (
+            np.nan_to_num(gyro).astype(np.float64) - self.__gyro_mean)
+        self.__gyro_count += at_rest
+
+        # Wait for one averaging time constant before checking.
+        bias = np.max(np.abs(self.__gyro_mean), axis=1)
+        ready = self.__gyro_count * self.__gyro_alpha >= 1
+        self.__set("gyro_bias", ready & (bias > self.__gyro_bias_limit),
+                   timestamp, events, bias)
+
+    def __check_magnetometer(self, mag, present, timestamp, events):
+        """
+        Compare the field magnitude to a slow running reference. The
+        reference is not updated while disturbed.
+        """
+        magnitude = np.linalg.norm(mag.astype(np.float64), axis=1)
+        valid = present & np.isfinite(magnitude) & (magnitude > 0)
+
+        reference = self.__magnetic_reference
+        start = valid & np.isnan(reference)
+        reference[start] = magnitude[start]
+
+        ratio = np.where(valid, magnitude / reference, 1.0)
+        disturbed = valid & (np.abs(ratio - 1.0) > self.__magnetic_tolerance)
+
+        track = valid & ~disturbed
+        reference[track] += self.__gyro_alpha[track] * (
+            magnitude[track] - reference[track])
+
+        self.__set("magnetic", np.where(valid, disturbed,
+                                        self.__active["magnetic"]),
+                   timestamp, events, ratio)
+
+    def __check_rate(self, frame_count, timestamp, events):
+        """
+        Count the frames of each node over a fixed window and compare the
+        rate to the configured sampling rate. The first window starts one
+        frame period before the first frame, so that frame is counted.
+        """
+        if None == self.__window_start:
+            self.__window_start = \
+                timestamp - 1.0 / max(self.__sampling_rate.max(), 1.0)
+
+        self.__window_count += frame_count
+
+        elapsed = timestamp - self.__window_start
+        if elapsed < self.__rate_window_second:
+            return
+
+        rate = self.__window_count / elapsed
+        self.__set(
+            "rate",
+            rate < (1.0 - self.__rate_tolerance) * self.__sampling_rate,
+            timestamp, events, rate)
+
+        self.__window_start = timestamp
+        self.__window_count[:] = 0
+
+    def __set(self, kind, flags, timestamp, events, values=None,
+              channels=None):
+        """
+        Store the new fault flags of one kind, and add an Event for every
+        flag that changed.
+        """
+        active = self.__active[kind]
+        changed = flags != active
+        if not changed.any():
+            return
+
+        for index in zip(*np.nonzero(changed)):
+            row = index[0]
+            channel = None
+            if len(index) > 1:
+                channel = index[1]
+                if None != channels:
+                    channel = channels[channel]
+
+            value = None
+            if values is not None:
+                value = float(values[index])
+
+            is_active = bool(flags[index])
+            if is_active:
+                self.__event_count[kind] += 1
+
+            events.append(Event(
+                timestamp, self.__keys[row], self.__names[row], kind,
+                is_active, None if None == channel else int(channel),
+                value))
+
+        active[...] = flags
+
+#
+# END class Monitor
+#
+
+
+class MonitorThread:
+    """
+    Run a Monitor in a background thread. The stream loop queues each
+    frame and collects the Events found so far. If the checks fall behind
+    the oldest queued frame is skipped, and counted toward the frame rate
+    of the next one.
+    """
+
+    def __init__(self, monitor, queue_frames=256):
+        self.__monitor = monitor
+        self.__queue = collections.deque()
+        self.__queue_frames = queue_frames
+        self.__events = []
+        self.__condition = threading.Condition()
+        self.__closed = False
+        self.__skip_count = 0
+
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """
+        Stop the thread after the queued frames are checked.
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+
+        if self.__thread.is_alive():
+            self.__thread.join()
+
+    def monitor(self):
+        return self.__monitor
+
+    def skipCount(self):
+        """
+        Return the number of frames skipped because the queue was full.
+        """
+        return self.__skip_count
+
+    def updateContainer(self, container, timestamp=None):
+        """
+        Queue one frame from Format.Configurable for checking. Returns the
+        list of Events found since the previous call.
+        """
+        if None == timestamp:
+            timestamp = time.monotonic()
+
+        with self.__condition:
+            count = 1
+            if len(self.__queue) >= self.__queue_frames:
+                count += self.__queue.popleft()[2]
+                self.__skip_count += 1
+            self.__queue.append((container, timestamp, count))
+            self.__condition.notify()
+
+            return self.takeEvents()
+
+    def takeEvents(self):
+        """
+        Return the list of Events found since the previous call.
+        """
+        with self.__condition:
+            events = self.__events
+            self.__events = []
+
+        return events
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while (0 == len(self.__queue)) and (not self.__closed):
+                    self.__condition.wait()
+
+                if 0 == len(self.__queue):
+                    break
+
+                container, timestamp, count = self.__queue.popleft()
+
+            # Check outside of the lock so updateContainer never waits on
+            # the checks.
+            events = self.__monitor.updateContainer(
+                container, timestamp, count)
+            if len(events):
+                with self.__condition:
+                    self.__events.extend(events)
+
+#
+# END class MonitorThread
+#
@@ -0,0 +1,349 @@
+"""
+MotionParallel module: Per node processing on a pool of worker processes.
+
+NodeProcessPool splits the nodes of a stream into contiguous shards, one
+per worker process, so per node work such as filtering, fusion, or
+feature extraction scales with the number of cores.
+
+Frames are written into blocks of shared memory, [frame, node, channel],
+and each worker reads and writes its own node rows in place. Only the
+block number is sent to the workers, the node arrays are never pickled.
+Several blocks are in flight at once, and results are returned in the
+order the frames were submitted.
+
+The per node work is created in each worker by a factory, called with
+the range of node rows of the worker. It returns a function that takes
+a block of shape [frame, node, channel] for those nodes and returns the
+output block, [frame, node, out_channels]. The function may keep state
+between blocks, for example filter state. The factory must be
+picklable, a module level function or class.
+
+Example usage:
+
+class Lowpass:
+    def __init__(self, frequency_hz, sampling_rate):
+        self.frequency_hz = frequency_hz
+        self.sampling_rate = sampling_rate
+
+    def __call__(self, nodes):
+        bank = MotionFilter.FilterBank(12, self.sampling_rate)
+        bank.setFilter("lowpass", self.frequency_hz)
+        return bank.processBatch
+
+pool = NodeProcessPool(Lowpass(20, 1000), num_nodes=48, num_channels=12)
+while True:
+    container = MotionSDK.Format.Configurable(client.readData())
+    for block in pool.submitContainer(container):
+        # Filtered frames, [frame, node, channel] in submit order.
+        pass
+pool.close()
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import collections
+import multiprocessing
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def attach_shared_memory(name):
+    """
+    Open an existing shared memory block. The creating process owns the
+    block, so do not register it for clean up in this process.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python 3.12 and older.
+        return shared_memory.SharedMemory(name=name)
+
+
+def run_worker(conn, names, input_shape, output_shape, dtype, nodes,
+               factory):
+    """
+    Worker process main loop. Receive (slot, count) messages, process
+    the node rows of the worker in place, and reply (slot, error).
+    """
+    input_memory = attach_shared_memory(names[0])
+    output_memory = attach_shared_memory(names[1])
+    x = np.ndarray(input_shape, dtype, buffer=input_memory.buf)
+    y = np.ndarray(output_shape, dtype, buffer=output_memory.buf)
+
+    try:
+        process = factory(range(nodes.start, nodes.stop))
+        while True:
+            message = conn.recv()
+            if None == message:
+                break
+
+            slot, count = message
+            try:
+                y[slot, :count, nodes] = process(x[slot, :count, nodes])
+                conn.send((slot, None))
+            except Exception as e:
+                conn.send((slot, "{}: {}".format(type(e).__name__, e)))
+    except (EOFError, KeyboardInterrupt):
+        pass
+    finally:
+        del x, y
+        input_memory.close()
+        output_memory.close()
+
+
+class NodeProcessPool:
+    """
+    Process blocks of frames on a pool of worker processes, each worker
+    handles a contiguous range of node rows.
+    """
+
+    def __init__(self, factory, num_nodes, num_channels, out_channels=None,
+                 workers=None, block_frames=256, slots=4, dtype=np.float32):
+        """
+        Parameter factory creates the per node function in each worker.
+        Frames are processed in blocks of up to block_frames frames, with
+        up to slots blocks in flight. Parameter workers defaults to the
+        number of CPUs, set it to 0 to process in this process, for
+        example for debugging.
+        """
+        if None == out_channels:
+            out_channels = num_channels
+        if None == workers:
+            workers = multiprocessing.cpu_count()
+
+        self.__num_nodes = num_nodes
+        self.__num_channels = num_channels
+        self.__block_frames = block_frames
+        self.__dtype = np.dtype(dtype)
+
+        self.__node_index = {}
+        self.__memory = []
+        self.__processes = []
+        self.__connections = []
+
+        # Serial mode, no shared memory.
+        self.__serial = workers <= 0
+        self.__process = None
+        if self.__serial:
+            slots = 1
+
+        input_shape = (slots, block_frames, num_nodes, num_channels)
+        output_shape = (slots, block_frames, num_nodes, out_channels)
+        self.__x = self.__allocate(input_shape)
+        self.__y = self.__allocate(output_shape)
+
+        self.__free = collections.deque(range(slots))
+        self.__pending = collections.deque()
+        self.__fill_slot = None
+        self.__fill_count = 0
+
+        if self.__serial:
+            self.__process = factory(range(num_nodes))
+            return
+
+        # Contiguous node ranges, at most one worker per node.
+        bounds = np.linspace(0, num_nodes, min(workers, num_nodes) + 1)
+        bounds = np.round(bounds).astype(int)
+        names = [memory.name for memory in self.__memory]
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(
+                target=run_worker,
+                args=(child, names, input_shape, output_shape,
+                      self.__dtype.str, slice(int(start), int(stop)),
+                      factory),
+                daemon=True)
+            process.start()
+            child.close()
+
+            self.__processes.append(process)
+            self.__connections.append(parent)
+
+    def __del__(self):
+        self.close()
+
+    def numWorkers(self):
+        return len(self.__processes)
+
+    def nodeIndex(self):
+        """
+        Return the map from node key to node row, for submitContainer.
+        """
+        return self.__node_index
+
+    def submit(self, frames):
+        """
+        Add a block of frames, shape [frame, node, channel]. Returns the
+        list of finished output blocks, in submit order. Any partial block
+        from submitFrame is sent first.
+        """
+        frames = np.asarray(frames)
+        self.__dispatch_fill()
+
+        results = []
+        for start in range(0, frames.shape[0], self.__block_frames):
+            chunk = frames[start:start + self.__block_frames]
+            slot = self.__acquire(results)
+            self.__x[slot, :chunk.shape[0]] = chunk
+            self.__dispatch(slot, chunk.shape[0])
+
+        return results + self.__collect(False)
+
+    def submitFrame(self, frame):
+        """
+        Add one frame, shape [node, channel]. The frame is written
+        directly into shared memory, and the block is sent when it holds
+        block_frames frames. Returns the list of finished output blocks.
+        """
+        results = []
+        self.__fill_row(results)[:] = frame
+        return results + self.__finish_row()
+
+    def submitContainer(self, container):
+        """
+        Add one frame from Format.Configurable. Node rows are assigned in
+        the order keys are first seen, nodes that do not have
+        num_channels values are skipped, and rows of nodes missing from
+        this frame are zero. Returns the list of finished output blocks.
+        """
+        results = []
+        row = self.__fill_row(results)
+        row[:] = 0
+        for key in container:
+            element = container[key]
+            if element.size() != self.__num_channels:
+                continue
+
+            index = self.__node_index.get(key)
+            if None == index:
+                index = len(self.__node_index)
+                if index >= self.__num_nodes:
+                    raise RuntimeError(
+                        "more than {} nodes in stream".format(
+                            self.__num_nodes))
+                self.__node_index[key] = index
+
+            row[index] = element.access()
+
+        return results + self.__finish_row()
+
+    def flush(self):
+        """
+        Send any partial block, wait for all blocks in flight, and return
+        their output blocks in submit order.
+        """
+        self.__dispatch_fill()
+        return self.__collect(True)
+
+    def close(self):
+        """
+        Stop the worker processes and free the shared memory. Blocks still
+        in flight are discarded, call flush() first to keep them.
+        """
+        for conn in self.__connections:
+            try:
+                conn.send(None)
+            except (OSError, ValueError):
+                pass
+        for process in self.__processes:
+            process.join()
+        for conn in self.__connections:
+            conn.close()
+        self.__processes = []
+        self.__connections = []
+
+        self.__x = None
+        self.__y = None
+        for memory in self.__memory:
+            memory.close()
+            memory.unlink()
+        self.__memory = []
+
+    def __allocate(self, shape):
+        if self.__serial:
+            return np.zeros(shape, self.__dtype)
+
+        size = int(np.prod(shape)) * self.__dtype.itemsize
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self.__memory.append(memory)
+        return np.ndarray(shape, self.__dtype, buffer=memory.buf)
+
+    def __fill_row(self, results):
+        if None == self.__fill_slot:
+            self.__fill_slot = self.__acquire(results)
+            self.__fill_count = 0
+
+        return self.__x[self.__fill_slot, self.__fill_count]
+
+    def __finish_row(self):
+        self.__fill_count += 1
+        if self.__fill_count == self.__block_frames:
+            self.__dispatch_fill()
+
+        return self.__collect(False)
+
+    def __dispatch_fill(self):
+        if (None != self.__fill_slot) and (self.__fill_count > 0):
+            self.__dispatch(self.__fill_slot, self.__fill_count)
+            self.__fill_slot = None
+
+    def __dispatch(self, slot, count):
+        self.__pending.append((slot, count))
+
+        if self.__serial:
+            self.__y[slot, :count] = self.__process(self.__x[slot, :count])
+            return
+
+        for conn in self.__connections:
+            conn.send((slot, count))
+
+    def __acquire(self, results):
+        """
+        Return a free slot. If all slots are in flight, wait for the
+        oldest and add its output block to results.
+        """
+        if 0 == len(self.__free):
+            results.append(self.__wait_oldest())
+
+        return self.__free.popleft()
+
+    def __collect(self, wait):
+        """
+        Return the output blocks that are finished, in order. Wait for all
+        blocks in flight if wait is True.
+        """
+        results = []
+        while len(self.__pending) > 0:
+            if not wait and \
+                    not all(conn.poll() for conn in self.__connections):
+                break
+            results.append(self.__wait_oldest())
+
+        return results
+
+    def __wait_oldest(self):
+        slot, count = self.__pending.popleft()
+
+        # Workers process blocks in order, so the next reply from every
+        # worker is for the oldest block.
+        error = None
+        for conn in self.__connections:
+            reply_slot, reply_error = conn.recv()
+            if reply_slot != slot:
+                raise RuntimeError("worker reply out of order")
+            if None != reply_error:
+                error = reply_error
+
+        result = self.__y[slot, :count].copy()
+        self.__free.append(slot)
+
+        if None != error:
+            raise RuntimeError("worker failed: {}".format(error))
+
+        return result
+
+#
+# END class NodeProcessPool
+#
@@ -0,0 +1,341 @@
+"""
+MotionQuantize module: Compact encoding of Configurable messages.
+
+A Configurable message stores every channel value as a 32 bit float. Most
+sensor channels do not need that precision, so a quantized message stores
+each value in 16 bits, half the size of the original values:
+
+    float16  IEEE half precision, about 3 significant digits, no scale
+    int16    scaled integer per channel, value = integer * scale, with
+             the scale taken from the full scale range of the channel
+
+The int16 codec has a fixed resolution over the whole range of a channel,
+for example 0.00024 g for an 8 g accelerometer or 0.015 degrees/second
+for the gyroscope. Values outside the range saturate at the limit, and
+Encoder counts them.
+
+Message layout, little-endian:
+
+    magic "MTQ", codec (u8), node count N (u16), channel count M (u16),
+    N node keys (u32),
+    M channel scales (f32), int16 codec only,
+    N * M channel values (f16 or i16), node major
+
+Every node in a message has the same number of channels. Nodes with a
+different number of channels, for example empty "Bus" nodes, are not
+encoded. A quantized message never starts with "<?xml", so it is stored
+and relayed exactly like a binary Configurable message.
+
+The full scale ranges of the channels come from the channel list of the
+Configurable request and the device configuration, see channel_scales.
+The scales travel in every message, so the decoder needs no
+configuration. Encoding requires numpy, decoding only for decode_array.
+
+Example usage:
+
+# accel_range is the gselect of the device, the gyroscope is set to
+# 2000 degrees/second
+full_scale = channel_scales(request, accel_range=8, ranges={"g": 2000})
+encoder = Encoder(Int16, full_scale)
+compact = encoder.encode(client.readData())
+print(encoder.saturatedCount())
+
+data = decode_message(compact)
+container = MotionSDK.Format.Configurable(data)
+
+# all nodes at once, requires numpy
+keys, values = decode_array(compact)
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import math
+import struct
+from xml.etree.ElementTree import XML
+
+Magic = b"MTQ"
+Header = struct.Struct("<3sBHH")
+ElementHeader = struct.Struct("<II")
+
+Float16 = 1
+Int16 = 2
+
+# Command line and request names of the codecs.
+Codecs = {"float16": Float16, "int16": Int16}
+
+IntegerLimit = 32767
+
+# Default full scale range of the Configurable channels, by channel tag.
+# The accelerometer range depends on the device configuration, the others
+# may be set per device, see channel_scales.
+ChannelRange = {
+    # Accelerometer, g.
+    "a": (3, None),
+    # Magnetometer, uT (microtesla).
+    "m": (3, 60.0),
+    # Gyroscope, degrees/second.
+    "g": (3, 500.0),
+    # Euler angles, radians.
+    "r": (3, math.pi),
+}
+
+
+def channel_scales(request, accel_range=8, ranges=None):
+    """
+    Return the list of full scale ranges, one per channel, of the channel
+    list in a Configurable request, for example
+    <configurable><a/><m/><g/><r/></configurable>. Parameter accel_range
+    is the accelerometer range (gselect) in g, for example the
+    accel_range of the node list from scan_and_start_reading. Parameter
+    ranges is an optional map from channel tag to full scale range that
+    replaces the defaults in ChannelRange. A range attribute of a channel
+    element, <g range="2000"/>, is used first. Throws RuntimeError if a
+    channel has no known range.
+    """
+    if None == ranges:
+        ranges = {}
+
+    result = []
+    for element in XML(request):
+        if element.tag not in ChannelRange:
+            raise RuntimeError(
+                "no full scale range for channel \"{}\"".format(element.tag))
+
+        count, value = ChannelRange[element.tag]
+        if None == value:
+            value = accel_range
+        value = element.get("range", ranges.get(element.tag, value))
+        result.extend([float(value)] * count)
+
+    return result
+
+
+def is_quantized(data):
+    """
+    Return True if data is a quantized message.
+    """
+    return data[:len(Magic)] == Magic
+
+
+def encode_message(data, codec=Float16, full_scale=None):
+    """
+    Convert a binary Configurable message into a quantized message.
+    Parameter full_scale is the list of channel ranges for the int16
+    codec. Returns None if the message has no nodes. Use an Encoder to
+    count saturated values.
+    """
+    return Encoder(codec, full_scale).encode(data)
+
+
+class Encoder:
+    """
+    Convert binary Configurable messages into quantized messages with one
+    codec. All values of a message are converted with a few numpy vector
+    operations. Counts the values that saturate at the limit of the
+    codec.
+    """
+
+    def __init__(self, codec=Float16, full_scale=None):
+        """
+        Parameter full_scale is the list of channel ranges for the int16
+        codec, see channel_scales.
+        """
+        if codec not in (Float16, Int16):
+            raise RuntimeError("unknown codec {}".format(codec))
+
+        self.__codec = codec
+        self.__full_scale = full_scale
+        self.__value_count = 0
+        self.__saturated_count = 0
+
+    def codec(self):
+        return self.__codec
+
+    def valueCount(self):
+        """
+        Return the number of values encoded.
+        """
+        return self.__value_count
+
+    def saturatedCount(self):
+        """
+        Return the number of values outside the range of the codec, stored
+        at the limit.
+        """
+        return self.__saturated_count
+
+    def encode(self, data):
+        """
+        Convert one binary Configurable message. Returns None if the
+        message has no nodes. Throws RuntimeError if the int16 codec has
+        fewer channel ranges than the message has channels.
+        """
+        import numpy as np
+
+        keys = []
+        values = []
+        num_channels = 0
+
+        itr = 0
+        while itr + ElementHeader.size <= len(data):
+            key, length = ElementHeader.unpack_from(data, itr)
+            begin = itr + ElementHeader.size
+            itr = begin + 4 * length
+
+            if 0 == length:
+                continue
+            if 0 == num_channels:
+                num_channels = length
+            if num_channels != length:
+                continue
+
+            keys.append(key)
+            values.append(data[begin:itr])
+
+        if 0 == len(keys):
+            return None
+
+        values = np.frombuffer(b"".join(values), "<f4").reshape(
+            len(keys), num_channels)
+
+        result = [
+            Header.pack(Magic, self.__codec, len(keys), num_channels),
+            struct.pack("<{}I".format(len(keys)), *keys),
+        ]
+
+        if Float16 == self.__codec:
+            # Out of range values are infinite in half precision.
+            with np.errstate(over="ignore"):
+                encoded = values.astype("<f2")
+            saturated = np.count_nonzero(
+                np.isinf(encoded) & np.isfinite(values))
+        else:
+            full_scale = self.__full_scale
+            if (None == full_scale) or (len(full_scale) < num_channels):
+                raise RuntimeError(
+                    "int16 codec requires {} channel ranges".format(
+                        num_channels))
+
+            scales = np.asarray(
+                full_scale[:num_channels], np.float64) / IntegerLimit
+            result.append(scales.astype("<f4").tobytes())
+
+            # Round half up. Saturate out of range values, NaN is 0.
+            x = values * (1.0 / scales)
+            saturated = np.count_nonzero(np.abs(x) > IntegerLimit)
+            x = np.floor(x + 0.5)
+            np.clip(x, -IntegerLimit, IntegerLimit, out=x)
+            x[np.isnan(x)] = 0
+            encoded = x.astype("<i2")
+
+        result.append(encoded.tobytes())
+
+        self.__value_count += values.size
+        self.__saturated_count += int(saturated)
+
+        return b"".join(result)
+
+#
+# END class Encoder
+#
+
+
+def decode_values(data):
+    """
+    Expand a quantized message. Returns the list of node keys, the number
+    of channels, and the flat list of values in node major order. Returns
+    None if data is not a valid quantized message.
+    """
+    layout = parse_layout(data)
+    if None == layout:
+        return None
+
+    codec, keys, num_channels, offset = layout
+    num_values = len(keys) * num_channels
+
+    if Float16 == codec:
+        values = struct.unpack_from("<{}e".format(num_values), data, offset)
+        return keys, num_channels, list(values)
+
+    scales = struct.unpack_from("<{}f".format(num_channels), data, offset)
+    integers = struct.unpack_from(
+        "<{}h".format(num_values), data, offset + 4 * num_channels)
+
+    return keys, num_channels, [
+        v * s for v, s in zip(integers, scales * len(keys))]
+
+
+def decode_message(data):
+    """
+    Convert a quantized message back into a binary Configurable message,
+    for Format.Configurable. Any other message is returned unchanged.
+    """
+    if not is_quantized(data):
+        return data
+
+    result = decode_values(data)
+    if None == result:
+        return None
+
+    keys, num_channels, values = result
+    values = struct.pack("<{}f".format(len(values)), *values)
+    size = 4 * num_channels
+    return b"".join(
+        ElementHeader.pack(key, num_channels) + values[i * size:(i + 1) * size]
+        for i, key in enumerate(keys))
+
+
+def decode_array(data, dtype="float32"):
+    """
+    Expand a quantized message into a numpy array of shape [node, channel]
+    with a few vector operations. Returns the list of node keys and the
+    array, or None if data is not a valid quantized message.
+    """
+    import numpy as np
+
+    layout = parse_layout(data)
+    if None == layout:
+        return None
+
+    codec, keys, num_channels, offset = layout
+    shape = (len(keys), num_channels)
+
+    if Float16 == codec:
+        values = np.frombuffer(
+            data, "<f2", shape[0] * shape[1], offset).reshape(shape)
+        return keys, values.astype(dtype)
+
+    scales = np.frombuffer(data, "<f4", num_channels, offset)
+    values = np.frombuffer(
+        data, "<i2", shape[0] * shape[1],
+        offset + 4 * num_channels).reshape(shape)
+
+    return keys, (values * scales).astype(dtype)
+
+
+def parse_layout(data):
+    """
+    Read the header of a quantized message. Returns the codec, the list
+    of node keys, the number of channels, and the offset of the scales or
+    values. Returns None if data is not a valid quantized message.
+    """
+    if len(data) < Header.size:
+        return None
+
+    magic, codec, num_nodes, num_channels = Header.unpack_from(data)
+    if Magic != magic:
+        return None
+
+    size = Header.size + 4 * num_nodes + 2 * num_nodes * num_channels
+    if Int16 == codec:
+        size += 4 * num_channels
+    elif Float16 != codec:
+        return None
+
+    if len(data) != size:
+        return None
+
+    keys = list(struct.unpack_from("<{}I".format(num_nodes), data, Header.size))
+
+    return codec, keys, num_channels, Header.size + 4 * num_nodes
@@ -0,0 +1,266 @@
+"""
+MotionReduce module: Per-window summaries of the Configurable stream.
+
+Monitoring jobs often only need a summary of each channel per second,
+not the full rate stream. A reducer returns one summary record per
+window. Each record has the same form regardless of where the reduction
+runs:
+
+{
+    "count": 100,
+    "nodes": {
+        2: {"count": 100, "mean": [...], "rms": [...], "min": [...],
+            "max": [...]},
+        ...
+    }
+}
+
+The top level count is the number of frames in the window, the node
+count is the number of those frames that held the node. A node that is
+missing from some frames is summarized over its own frames only, a node
+missing from the whole window is not in the record.
+
+StreamReducer computes the records locally from a Configurable data
+stream. The full rate stream still crosses the network, the reduction
+saves client storage and processing only. This is what open_reducer
+returns by default.
+
+ConsoleReducer is an extension point for a Lua aggregation script that
+you supply. No aggregation script ships with this module, the script
+depends on the service. If open_reducer is given a script and the
+service accepts it, the script is installed using the console
+(LuaConsole.SendChunk) and polled for summaries, and only the reduced
+records cross the network.
+
+Example usage:
+
+reducer = open_reducer(host, sampling_rate=1000)
+while True:
+    summary = reducer.readSummary()
+    print(summary["nodes"])
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import json
+import time
+
+import numpy as np
+
+import MotionSDK
+
+PortConsole = 32075
+PortConfigurable = 32076
+
+# Default channel request for the data stream, accelerometer and gyroscope.
+ChannelRequest = (
+    '<?xml version="1.0"?>'
+    '<configurable inactive="1">'
+    "<a/>"
+    "<g/>"
+    "</configurable>"
+)
+
+
+class StreamReducer:
+    """
+    Compute per-window summaries locally from the Configurable stream.
+
+    Frames are copied into a preallocated block per node and each window
+    is reduced with one vectorized pass, so the per-frame cost is a
+    single array assignment per node.
+    """
+
+    def __init__(self, client=None, window_second=1.0, sampling_rate=100):
+        """
+        Parameter client is an open Client connection to the Configurable
+        service that has already sent its channel request. It may be None
+        if frames are pushed in with update(). The window length is
+        window_second * sampling_rate frames.
+        """
+        self.__client = client
+        self.__window = max(1, int(round(window_second * sampling_rate)))
+        self.__blocks = {}
+        # Number of rows of each block written in the current window.
+        self.__rows = {}
+        self.__count = 0
+
+    def windowFrames(self):
+        return self.__window
+
+    def update(self, container):
+        """
+        Add one frame, as returned by Format.Configurable. Returns the
+        summary record if this frame completes a window, otherwise None.
+        """
+        for key in container:
+            values = container[key].access()
+            block = self.__blocks.get(key)
+            if (block is None) or (block.shape[1] != len(values)):
+                block = np.zeros((self.__window, len(values)), np.float64)
+                self.__blocks[key] = block
+                self.__rows[key] = 0
+
+            row = self.__rows[key]
+            block[row] = values
+            self.__rows[key] = row + 1
+
+        self.__count += 1
+        if self.__count < self.__window:
+            return None
+
+        return self.flush()
+
+    def flush(self):
+        """
+        Return the summary of the frames in the current, possibly partial,
+        window and start a new one. Returns None if the window is empty.
+        """
+        count = self.__count
+        if 0 == count:
+            return None
+
+        nodes = {}
+        for key, block in self.__blocks.items():
+            rows = self.__rows[key]
+            if 0 == rows:
+                continue
+
+            data = block[:rows]
+            nodes[key] = {
+                "count": rows,
+                "mean": data.mean(axis=0).tolist(),
+                "rms": np.sqrt(np.square(data).mean(axis=0)).tolist(),
+                "min": data.min(axis=0).tolist(),
+                "max": data.max(axis=0).tolist(),
+            }
+
+        self.__count = 0
+        for key in self.__rows:
+            self.__rows[key] = 0
+
+        return {"count": count, "nodes": nodes}
+
+    def readSummary(self, time_out_second=5):
+        """
+        Read frames from the client connection until a window is complete
+        and return its summary. Returns None if the stream times out.
+        """
+        while True:
+            data = self.__client.readData(time_out_second)
+            if None == data:
+                return None
+
+            # Skip the XML name map messages.
+            if data.startswith(b"<?xml"):
+                continue
+
+            summary = self.update(MotionSDK.Format.Configurable(data))
+            if None != summary:
+                return summary
+
+    def close(self):
+        if None != self.__client:
+            self.__client.close()
+            self.__client = None
+
+#
+# END class StreamReducer
+#
+
+
+class ConsoleReducer:
+    """
+    Run the reduction on the Motion Service. The aggregation script is
+    sent once over the console connection. It must define a global Lua
+    function motion_reduce_poll() that returns the summary record of the
+    last complete window as a JSON string, or nil if no new window is
+    ready. Each readSummary() call is one small console round trip.
+    """
+
+    PollFunction = "motion_reduce_poll"
+
+    def __init__(self, client, script, window_second=1.0):
+        """
+        Install the aggregation script using the open console client.
+        Throws a RuntimeError if the service rejects the script or the
+        poll function is not defined afterwards.
+        """
+        self.__client = client
+        self.__window_second = window_second
+        self.__console = MotionSDK.LuaConsole(client)
+
+        self.__console.send_chunk_checked(script, 5)
+
+        result = self.__console.send_chunk_checked(
+            "print(type({}))".format(self.PollFunction), 5)
+        if "function" != str(result).strip():
+            raise RuntimeError(
+                "aggregation script did not define {}".format(
+                    self.PollFunction))
+
+        self.__next_poll = time.monotonic()
+
+    def readSummary(self, time_out_second=5):
+        """
+        Wait for the next window and return its summary record. Returns
+        None if no summary is ready within time_out_second.
+        """
+        deadline = time.monotonic() + time_out_second
+        while True:
+            delay = self.__next_poll - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+
+            result = self.__console.send_chunk_checked(
+                "print({}())".format(self.PollFunction), 5)
+            result = str(result).strip()
+            if len(result) > 0 and "nil" != result:
+                self.__next_poll = time.monotonic() + self.__window_second
+                summary = json.loads(result)
+                # JSON object keys are strings, use integer node keys to
+                # match Format.Configurable.
+                summary["nodes"] = dict(
+                    (int(key), value)
+                    for key, value in summary["nodes"].items())
+                return summary
+
+            if time.monotonic() >= deadline:
+                return None
+
+            # Not ready yet. Poll again in a fraction of a window.
+            self.__next_poll = time.monotonic() + 0.1 * self.__window_second
+
+    def close(self):
+        if None != self.__client:
+            self.__client.close()
+            self.__client = None
+
+#
+# END class ConsoleReducer
+#
+
+
+def open_reducer(host="", window_second=1.0, sampling_rate=100, script=None,
+                 channel_request=ChannelRequest):
+    """
+    Return a reducer for the Motion Service on host. By default, or if
+    the service rejects the script, return a StreamReducer on the
+    Configurable stream with the given channel request. The reduction
+    only runs on the service if an aggregation script is given, see
+    ConsoleReducer.
+    """
+    if None != script:
+        console_client = MotionSDK.Client(host, PortConsole)
+        try:
+            return ConsoleReducer(console_client, script, window_second)
+        except RuntimeError:
+            console_client.close()
+
+    client = MotionSDK.Client(host, PortConfigurable)
+    if not client.writeData(channel_request):
+        raise RuntimeError(
+            "failed to send channel list request to Configurable service")
+
+    return StreamReducer(client, window_second, sampling_rate)
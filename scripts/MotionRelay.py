@@ -0,0 +1,767 @@
+#!/usr/bin/env python
+
+"""
+MotionRelay module: Re-serve one Motion Service data stream to many clients.
+
+The Relay holds a single upstream connection to the Configurable data
+service of a device, and re-serves every message to any number of
+downstream subscribers. Visualization and logging clients connect to the
+relay host instead of the device, so the device only ever sends one
+stream.
+
+Downstream TCP clients use the same framing as the Motion Service, so a
+MotionSDK.Client connects to the relay exactly like it connects to the
+service. The client receives the most recent XML name map and then every
+frame. A client may send a filter request to select node keys and
+channel indices, any other request (for example a Configurable channel
+list) is ignored:
+
+    <?xml version="1.0"?><relay nodes="2 4" channels="0 1 2"/>
+
+Add codec="float16" or codec="int16" to the request to receive compact
+MotionQuantize messages instead, half the size of the channel values.
+Decode them with MotionQuantize.decode_message. Each frame is filtered and
+encoded once for all subscribers with the same request.
+
+UDP subscribers are added by address and receive one message per
+datagram, without the length header.
+
+Every subscriber has its own bounded queue and sender thread. A slow
+subscriber drops its own oldest frames and is disconnected if a single
+send blocks for longer than the send time out. It never stalls the
+upstream connection or the other subscribers.
+
+Example usage:
+
+# relay the device at 192.168.1.50 to clients on port 32086
+python MotionRelay.py --host 192.168.1.50 --listen-port 32086
+
+# send int16 frames to a UDP host, for a 16 g accelerometer and a
+# 2000 degrees/second gyroscope
+python MotionRelay.py --host 192.168.1.50 --udp 192.168.1.20:9000 \
+    --codec int16 --accel-range 16 --channel-range g=2000
+
+# then connect any number of clients to the relay host
+python example_stream.py --host 127.0.0.1 --port 32086 --frames 1000
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import argparse
+import collections
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+from xml.etree.ElementTree import XML
+
+import MotionQuantize
+import MotionSDK
+
+LengthHeader = struct.Struct("!I")
+ElementHeader = struct.Struct("<II")
+
+# Same channel request as example_stream.py, accelerometer (a),
+# magnetometer (m), gyro (g), and Euler angles (r).
+DefaultRequest = (
+    '<?xml version="1.0"?>'
+    '<configurable inactive="1">'
+    "<a/>"
+    "<m/>"
+    "<g/>"
+    "<r/>"
+    "</configurable>"
+)
+
+# Upstream read time out. A silent stream for longer than this reconnects.
+ReadTimeOutSecond = 5
+
+# Time to wait for the first request of a TCP subscriber.
+RequestTimeOutSecond = 2
+
+# Longest wait in close() for the upstream thread, one read time out plus
+# one connect time out of the HighThroughput options.
+CloseTimeOutSecond = ReadTimeOutSecond + 5
+
+Description = '<?xml version="1.0"?><service name="MotionRelay"/>'
+
+
+def filter_message(data, nodes=None, channels=None):
+    """
+    Return a Configurable message with only the node keys in nodes and the
+    channel indices in channels. None selects all nodes or all channels.
+    Values are copied as bytes, they are not decoded.
+    """
+    if (None == nodes) and (None == channels):
+        return data
+
+    result = []
+    itr = 0
+    while itr + ElementHeader.size <= len(data):
+        key, length = ElementHeader.unpack_from(data, itr)
+        begin = itr + ElementHeader.size
+        itr = begin + 4 * length
+
+        if (None != nodes) and (key not in nodes):
+            continue
+
+        if None == channels:
+            result.append(data[begin - ElementHeader.size:itr])
+            continue
+
+        index = [i for i in channels if i < length]
+        result.append(ElementHeader.pack(key, len(index)))
+        result.extend(data[begin + 4 * i:begin + 4 * i + 4] for i in index)
+
+    return b"".join(result)
+
+
+def parse_filter(data):
+    """
+    Parse a <relay nodes="..." channels="..." codec="..."/> request.
+    Returns a (nodes, channels, codec) tuple, or None if data is not a
+    filter request.
+    """
+    try:
+        root = XML(data)
+    except Exception:
+        return None
+
+    if "relay" != root.tag:
+        return None
+
+    def parse_list(name):
+        value = root.get(name)
+        if None == value:
+            return None
+        return [int(v) for v in value.replace(",", " ").split()]
+
+    nodes = parse_list("nodes")
+    if None != nodes:
+        nodes = set(nodes)
+
+    codec = root.get("codec")
+    if None != codec:
+        codec = MotionQuantize.Codecs.get(codec)
+
+    return nodes, parse_list("channels"), codec
+
+
+class Message:
+    """
+    One upstream frame, and its filtered and encoded forms. Subscribers
+    with the same filter and codec share one form, so a frame is encoded
+    once however many subscribers receive it.
+    """
+
+    def __init__(self, data):
+        self.data = data
+        self.__forms = {}
+
+    def encode(self, nodes=None, channels=None, encoder=None):
+        """
+        Return the frame with the node keys in nodes and the channel
+        indices in channels, encoded with a MotionQuantize.Encoder if
+        encoder is not None. Throws RuntimeError if the encoder fails.
+        """
+        if (None == nodes) and (None == channels) and (None == encoder):
+            return self.data
+
+        key = (None if None == nodes else frozenset(nodes),
+               None if None == channels else tuple(channels), encoder)
+        if key in self.__forms:
+            return self.__forms[key]
+
+        # Two sender threads may both encode a new form, the results are
+        # the same.
+        data = filter_message(self.data, nodes, channels)
+        if None != encoder:
+            data = encoder.encode(data)
+
+        self.__forms[key] = data
+        return data
+
+#
+# END class Message
+#
+
+
+class Subscriber:
+    """
+    One downstream client. The relay thread calls push() and never
+    blocks, the sender thread writes queued messages to the socket.
+    """
+
+    def __init__(self, relay, sock, address, udp=False, nodes=None,
+                 channels=None, queue_frames=256, send_time_out_second=2,
+                 codec=None):
+        self.address = address
+
+        self.__relay = relay
+        self.__socket = sock
+        self.__udp = udp
+        self.__nodes = nodes
+        self.__channels = channels
+        self.__codec = codec
+        self.__send_time_out_second = send_time_out_second
+
+        self.__queue = collections.deque()
+        self.__queue_frames = queue_frames
+        self.__name_map = None
+        self.__condition = threading.Condition()
+        self.__closed = False
+
+        self.__sent_count = 0
+        self.__drop_count = 0
+
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+
+    def start(self, name_map=None):
+        self.__name_map = name_map
+        self.__thread.start()
+
+    def close(self):
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify()
+
+    def isClosed(self):
+        return self.__closed
+
+    def stats(self):
+        return {
+            "address": "{}:{}".format(*self.address[:2]),
+            "transport": "udp" if self.__udp else "tcp",
+            "sent": self.__sent_count,
+            "dropped": self.__drop_count,
+            "queued": len(self.__queue),
+        }
+
+    def push(self, message):
+        """
+        Queue a Message. If the queue is full drop the oldest frame.
+        """
+        with self.__condition:
+            if len(self.__queue) >= self.__queue_frames:
+                self.__queue.popleft()
+                self.__drop_count += 1
+            self.__queue.append(message)
+            self.__condition.notify()
+
+    def pushNameMap(self, data):
+        """
+        Queue a new name map. Frames queued before it belong to the old
+        name map and are dropped.
+        """
+        with self.__condition:
+            self.__drop_count += len(self.__queue)
+            self.__queue.clear()
+            self.__name_map = data
+            self.__condition.notify()
+
+    def __run(self):
+        try:
+            if not self.__udp:
+                self.__socket.settimeout(self.__send_time_out_second)
+                self.__send(Description.encode("utf-8"))
+                self.__wait_for_request()
+
+            while True:
+                with self.__condition:
+                    if (0 == len(self.__queue)) and \
+                            (None == self.__name_map) and \
+                            (not self.__closed):
+                        self.__condition.wait(0.5)
+
+                    if self.__closed:
+                        break
+
+                    name_map = self.__name_map
+                    self.__name_map = None
+                    frames = list(self.__queue)
+                    self.__queue.clear()
+
+                # Send outside of the lock so push() never waits on the
+                # socket.
+                if None != name_map:
+                    self.__send(name_map)
+
+                for message in frames:
+                    data = self.__encode(message)
+                    if None == data:
+                        continue
+                    self.__send(data)
+                    self.__sent_count += 1
+
+                if not self.__receive_requests():
+                    break
+        except (socket.error, OSError):
+            # Includes the send time out, the subscriber is too slow.
+            pass
+        finally:
+            self.__closed = True
+            self.__relay.removeSubscriber(self)
+            # UDP subscribers share the relay socket.
+            if not self.__udp:
+                self.__socket.close()
+
+    def __encode(self, message):
+        encoder = None
+        if None != self.__codec:
+            encoder = self.__relay.encoder(self.__codec, self.__channels)
+
+        try:
+            return message.encode(self.__nodes, self.__channels, encoder)
+        except RuntimeError:
+            # Channel ranges are not known, no scale for int16.
+            return message.encode(
+                self.__nodes, self.__channels,
+                self.__relay.encoder(MotionQuantize.Float16, self.__channels))
+
+    def __send(self, data):
+        if self.__udp:
+            self.__socket.sendto(data, self.address)
+        else:
+            self.__socket.sendall(LengthHeader.pack(len(data)) + data)
+
+    def __wait_for_request(self):
+        """
+        Like the Motion Service, wait for the client request before
+        sending the stream. Start anyway after RequestTimeOutSecond, for
+        clients that only listen.
+        """
+        readable, _, _ = select.select(
+            [self.__socket], [], [], RequestTimeOutSecond)
+        if len(readable) > 0:
+            data = self.__receive()
+            if None == data:
+                raise socket.error("subscriber closed before request")
+
+            result = parse_filter(data)
+            if None != result:
+                self.__nodes, self.__channels, self.__codec = result
+
+        # Frames queued while waiting are stale.
+        with self.__condition:
+            self.__queue.clear()
+
+    def __receive_requests(self):
+        """
+        Read any requests sent by a TCP subscriber, without blocking.
+        Returns False if the subscriber closed the connection.
+        """
+        if self.__udp:
+            return True
+
+        while True:
+            readable, _, _ = select.select([self.__socket], [], [], 0)
+            if 0 == len(readable):
+                return True
+
+            data = self.__receive()
+            if None == data:
+                return False
+
+            result = parse_filter(data)
+            if None != result:
+                self.__nodes, self.__channels, self.__codec = result
+
+    def __receive(self):
+        header = self.__receive_bytes(LengthHeader.size)
+        if None == header:
+            return None
+
+        return self.__receive_bytes(LengthHeader.unpack(header)[0])
+
+    def __receive_bytes(self, length):
+        data = b""
+        while len(data) < length:
+            message = self.__socket.recv(length - len(data))
+            if not message:
+                return None
+            data += message
+
+        return data
+
+#
+# END class Subscriber
+#
+
+
+class Relay:
+    """
+    Read one upstream data stream and re-serve it to TCP and UDP
+    subscribers. The upstream connection reconnects with backoff, and
+    subscribers receive the new name map after a reconnect.
+    """
+
+    def __init__(self, host, port=32076, request=DefaultRequest,
+                 listen_address=("", 32086), queue_frames=256,
+                 send_time_out_second=2,
+                 options=MotionSDK.SocketOptions.HighThroughput,
+                 accel_range=8, channel_range=None):
+        """
+        Parameter request is the channel request sent to the upstream
+        service. Set listen_address to None to only serve UDP subscribers.
+        Parameter queue_frames is the number of frames held for each
+        subscriber before the oldest frames are dropped. Parameters
+        accel_range and channel_range set the channel ranges of the int16
+        codec, see MotionQuantize.channel_scales.
+        """
+        self.__host = host
+        self.__port = port
+        self.__request = request
+        self.__listen_address = listen_address
+        self.__queue_frames = queue_frames
+        self.__send_time_out_second = send_time_out_second
+        self.__options = options
+
+        # Channel ranges of the int16 codec, from the channel request.
+        try:
+            self.__full_scale = MotionQuantize.channel_scales(
+                request, accel_range, channel_range)
+        except Exception:
+            self.__full_scale = None
+        self.__encoders = {}
+
+        self.__client = None
+        self.__server = None
+        self.__udp_socket = None
+        self.__name_map = None
+        self.__subscribers = []
+        self.__lock = threading.Lock()
+        self.__closed = False
+        self.__threads = []
+        self.__upstream_thread = None
+
+        self.__frame_count = 0
+
+    def __del__(self):
+        self.close()
+
+    def start(self):
+        """
+        Connect to the upstream service, open the listening socket, and
+        start the relay threads. Throws the socket error if either fails.
+        """
+        self.__client = MotionSDK.ReconnectClient(
+            self.__host, self.__port, self.__request, self.__options)
+
+        if None != self.__listen_address:
+            self.__server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.__server.setsockopt(
+                socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            self.__server.bind(self.__listen_address)
+            self.__server.listen(16)
+            self.__server.settimeout(0.5)
+            self.__threads.append(
+                threading.Thread(target=self.__accept, daemon=True))
+
+        self.__upstream_thread = threading.Thread(
+            target=self.__read_upstream, daemon=True)
+        self.__threads.append(self.__upstream_thread)
+
+        for thread in self.__threads:
+            thread.start()
+
+    def close(self):
+        """
+        Stop the relay threads and close all connections. Stops any
+        upstream reconnect attempts and waits for the current upstream
+        read or connect attempt, at most CloseTimeOutSecond. The relay
+        threads are daemon threads, a thread still blocked after that
+        ends with the process.
+        """
+        self.__closed = True
+        if None != self.__client:
+            self.__client.cancel()
+
+        deadline = time.monotonic() + CloseTimeOutSecond
+        for thread in self.__threads:
+            if thread is not threading.current_thread():
+                thread.join(max(0, deadline - time.monotonic()))
+        self.__threads = []
+
+        for subscriber in self.subscriberList():
+            subscriber.close()
+
+        for s in (self.__server, self.__udp_socket):
+            if None != s:
+                s.close()
+        self.__server = None
+        self.__udp_socket = None
+
+    def isRunning(self):
+        """
+        Return True while the upstream thread is reading. The relay stops
+        when the upstream reconnect attempts are exhausted or on an
+        upstream error.
+        """
+        return (None != self.__upstream_thread) and \
+            self.__upstream_thread.is_alive()
+
+    def address(self):
+        """
+        Return the (host, port) the relay listens on.
+        """
+        if None == self.__server:
+            return None
+
+        return self.__server.getsockname()
+
+    def frameCount(self):
+        """
+        Return the number of frames read from the upstream service.
+        """
+        return self.__frame_count
+
+    def reconnectCount(self):
+        if None == self.__client:
+            return 0
+
+        return self.__client.reconnectCount()
+
+    def saturatedCount(self):
+        """
+        Return the number of values sent at the limit of their codec.
+        """
+        with self.__lock:
+            encoders = list(self.__encoders.values())
+
+        return sum(encoder.saturatedCount() for encoder in encoders)
+
+    def encoder(self, codec, channels=None):
+        """
+        Return the shared MotionQuantize.Encoder of a codec and channel
+        selection. The int16 codec falls back to float16 if the channel
+        ranges are not known.
+        """
+        full_scale = self.__full_scale
+        if None == full_scale:
+            codec = MotionQuantize.Float16
+        elif None != channels:
+            full_scale = [full_scale[i] for i in channels
+                          if i < len(full_scale)]
+
+        key = (codec, None if None == channels else tuple(channels))
+        with self.__lock:
+            encoder = self.__encoders.get(key)
+            if None == encoder:
+                encoder = MotionQuantize.Encoder(codec, full_scale)
+                self.__encoders[key] = encoder
+
+        return encoder
+
+    def subscriberList(self):
+        with self.__lock:
+            return list(self.__subscribers)
+
+    def stats(self):
+        """
+        Return a list with the sent, dropped, and queued frame counts of
+        each subscriber.
+        """
+        return [subscriber.stats() for subscriber in self.subscriberList()]
+
+    def addUdpSubscriber(self, address, nodes=None, channels=None,
+                         codec=None):
+        """
+        Send every message to a UDP address, a (host, port) pair. Optional
+        nodes and channels select node keys and channel indices. Set codec
+        to MotionQuantize.Float16 or Int16 to send compact messages.
+        """
+        if None == self.__udp_socket:
+            self.__udp_socket = socket.socket(
+                socket.AF_INET, socket.SOCK_DGRAM)
+
+        subscriber = Subscriber(
+            self, self.__udp_socket, address, True,
+            None if None == nodes else set(nodes), channels,
+            self.__queue_frames, self.__send_time_out_second, codec)
+        self.__add_subscriber(subscriber)
+        return subscriber
+
+    def removeSubscriber(self, subscriber):
+        with self.__lock:
+            if subscriber in self.__subscribers:
+                self.__subscribers.remove(subscriber)
+
+    def __add_subscriber(self, subscriber):
+        with self.__lock:
+            self.__subscribers.append(subscriber)
+            name_map = self.__name_map
+        subscriber.start(name_map)
+
+    def __accept(self):
+        while not self.__closed:
+            try:
+                s, address = self.__server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.__add_subscriber(Subscriber(
+                self, s, address, False, None, None, self.__queue_frames,
+                self.__send_time_out_second))
+
+    def __read_upstream(self):
+        try:
+            while not self.__closed:
+                self.__relay_message(
+                    self.__client.readData(ReadTimeOutSecond))
+        except StopIteration:
+            pass
+        except (socket.error, OSError) as e:
+            # ReconnectClient handles read errors, this is a write error or
+            # a bug. Report it, the subscribers are closed below.
+            print("Relay upstream error: {}".format(e), file=sys.stderr)
+        finally:
+            self.__client.close()
+            # Stop accepting, subscribers would wait for frames that never
+            # come.
+            self.__closed = True
+            for subscriber in self.subscriberList():
+                subscriber.close()
+
+    def __relay_message(self, data):
+        if None == data:
+            # Reconnect attempts exhausted.
+            raise StopIteration
+
+        if data.startswith(b"<?xml"):
+            with self.__lock:
+                self.__name_map = data
+                subscribers = list(self.__subscribers)
+            for subscriber in subscribers:
+                subscriber.pushNameMap(data)
+            return
+
+        self.__frame_count += 1
+        with self.__lock:
+            subscribers = list(self.__subscribers)
+        message = Message(data)
+        for subscriber in subscribers:
+            subscriber.push(message)
+
+#
+# END class Relay
+#
+
+
+def parse_address(value):
+    host, _, port = value.rpartition(":")
+    return host, int(port)
+
+
+def parse_range(value):
+    tag, _, full_scale = value.partition("=")
+    return tag, float(full_scale)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="")
+
+    parser.add_argument(
+        "--host", help="IP address of the Motion Service", default="127.0.0.1"
+    )
+    parser.add_argument(
+        "--port",
+        help="port number address of the Motion Service",
+        type=int,
+        default=32076,
+    )
+    parser.add_argument(
+        "--listen-port",
+        help="port number for downstream TCP clients",
+        type=int,
+        default=32086,
+    )
+    parser.add_argument(
+        "--udp",
+        help="send every frame to a UDP host:port, may be repeated",
+        action="append",
+        default=[],
+    )
+    parser.add_argument(
+        "--codec",
+        help="compact encoding of the UDP messages, float16 or int16",
+        choices=sorted(MotionQuantize.Codecs),
+        default=None,
+    )
+    parser.add_argument(
+        "--accel-range",
+        help="accelerometer range in g of the int16 codec",
+        type=int,
+        default=8,
+    )
+    parser.add_argument(
+        "--channel-range",
+        help="full scale range of a channel of the int16 codec, tag=value, for "
+        "example g=2000, may be repeated",
+        action="append",
+        default=[],
+    )
+    parser.add_argument(
+        "--queue-frames",
+        help="frames held for each subscriber before dropping the oldest",
+        type=int,
+        default=256,
+    )
+    parser.add_argument(
+        "--stats-interval",
+        help="print subscriber statistics every N seconds",
+        type=float,
+        default=0,
+    )
+
+    args = parser.parse_args()
+
+    relay = Relay(
+        args.host,
+        args.port,
+        listen_address=("", args.listen_port),
+        queue_frames=args.queue_frames,
+        accel_range=args.accel_range,
+        channel_range=dict(parse_range(value) for value in args.channel_range),
+    )
+    relay.start()
+    for value in args.udp:
+        relay.addUdpSubscriber(
+            parse_address(value), codec=MotionQuantize.Codecs.get(args.codec))
+
+    print("Relay {}:{} on port {}".format(args.host, args.port, args.listen_port))
+
+    try:
+        last_time = time.monotonic()
+        while relay.isRunning():
+            time.sleep(0.5)
+            if args.stats_interval > 0 and \
+                    time.monotonic() - last_time >= args.stats_interval:
+                last_time = time.monotonic()
+                print(
+                    "frames {}  reconnects {}  saturated {}".format(
+                        relay.frameCount(),
+                        relay.reconnectCount(),
+                        relay.saturatedCount(),
+                    )
+                )
+                for item in relay.stats():
+                    print(
+                        "  {address} {transport} sent {sent} dropped "
+                        "{dropped} queued {queued}".format(**item)
+                    )
+    except KeyboardInterrupt:
+        pass
+    finally:
+        relay.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -0,0 +1,520 @@
+#!/usr/bin/env python
+
+"""
+MotionReplay module: Play recorded takes through the Client interface.
+
+A replay source reads a recording and produces the same binary messages
+that the Motion Service sends, so downstream code that uses
+Client.readData and the Format classes runs unchanged on recorded data.
+
+    StreamSource  a recorded Configurable stream, MotionTake.StreamFile
+    TakeSource    binary take files, one MotionTake.TakeFile per node
+
+Messages are played at the original timing, at a multiple of it, or as
+fast as possible (speed 0), either in process or over a local socket.
+Recordings do not store timestamps, the timing is the nominal sampling
+rate of the source, for example --sampling-rate, one frame every
+1 / rate seconds:
+
+    ReplayClient  has the Client methods readData, writeData, close
+    ReplayServer  listens like the Motion Service, sends the description,
+                  waits for the channel request, then sends the name map
+                  and frames. Each connection plays from the start.
+
+Example usage:
+
+stream = MotionTake.StreamFile("capture.stream", 1000)
+client = ReplayClient(StreamSource(stream), speed=4)
+while True:
+    data = client.readData()
+    if None == data:
+        break
+    container = MotionSDK.Format.Configurable(data)
+
+# serve a recording at the original rate, read it with example_stream.py
+# without the device scan, the replay server has no console
+python MotionReplay.py --stream capture.stream --sampling-rate 1000 --port 32076
+python example_stream.py --port 32076 --no-scan --header --file replay.csv
+
+# serve take files, one per node, as Configurable messages. Add --native
+# for the fixed size Sensor format
+python MotionReplay.py --take Node01.take --take Node02.take --length 12
+
+# throughput benchmark, as fast as possible
+python MotionReplay.py --stream capture.stream --speed 0 --port 32076
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import argparse
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+
+import MotionTake
+
+LengthHeader = struct.Struct("!I")
+
+Description = '<?xml version="1.0"?><service name="MotionReplay"/>'
+
+# Time to wait for the client request before playing anyway.
+RequestTimeOutSecond = 2
+
+# Number of messages read from the source at once.
+BlockFrames = 256
+
+
+class StreamSource:
+    """
+    Messages of a recorded Configurable stream, MotionTake.StreamFile.
+    """
+
+    def __init__(self, stream):
+        self.__stream = stream
+
+    def __len__(self):
+        return len(self.__stream)
+
+    def samplingRate(self):
+        return self.__stream.samplingRate()
+
+    def nameMap(self):
+        return self.__stream.nameMap()
+
+    def read(self, start, count):
+        return self.__stream.read(slice(start, start + count))
+
+#
+# END class StreamSource
+#
+
+
+class TakeSource:
+    """
+    Messages built from binary take files, one MotionTake.TakeFile per
+    node. Each message holds one frame of every node. All takes must use
+    the same sampling rate, the shortest take sets the length.
+    """
+
+    def __init__(self, takes, keys=None, configurable=False, names=None):
+        """
+        Parameter keys is the node key of each take, default 1 to N. Set
+        configurable to True to send Configurable messages, float values
+        with the element length field, as read by example_stream.py.
+        Short integer takes are converted to float. Otherwise the
+        elements are sent as stored, with the fixed size of the Preview,
+        Sensor, and Raw formats. Parameter names adds an XML name map
+        with one name per take.
+        """
+        if 0 == len(takes):
+            raise RuntimeError("no take files")
+
+        if None == keys:
+            keys = range(1, len(takes) + 1)
+
+        self.__takes = list(takes)
+        self.__keys = list(keys)
+        self.__configurable = configurable
+        self.__headers = [struct.pack("<I", key) for key in self.__keys]
+
+        self.__name_map = None
+        if None != names:
+            self.__name_map = (
+                '<?xml version="1.0"?><node_list>' + "".join(
+                    '<node key="{}" id="{}"/>'.format(key, name)
+                    for key, name in zip(keys, names)) +
+                "</node_list>").encode("utf-8")
+
+    def __len__(self):
+        return min(len(take) for take in self.__takes)
+
+    def samplingRate(self):
+        return self.__takes[0].samplingRate()
+
+    def nameMap(self):
+        return self.__name_map
+
+    def read(self, start, count):
+        count = max(0, min(count, len(self) - start))
+        if self.__configurable:
+            return self.__read_configurable(start, count)
+
+        buffers = [take.readBuffer(start, count) for take in self.__takes]
+        sizes = [take.frameSize() for take in self.__takes]
+
+        return [
+            b"".join(
+                header + buffer[i * size:(i + 1) * size]
+                for header, buffer, size in zip(
+                    self.__headers, buffers, sizes))
+            for i in range(count)
+        ]
+
+    def __read_configurable(self, start, count):
+        frames = [
+            take.read(slice(start, start + count)) for take in self.__takes]
+
+        return [
+            b"".join(
+                struct.pack(
+                    "<II{}f".format(len(values[i])), key, len(values[i]),
+                    *values[i])
+                for key, values in zip(self.__keys, frames))
+            for i in range(count)
+        ]
+
+#
+# END class TakeSource
+#
+
+
+class Player:
+    """
+    Read messages from a source in order, and wait until each one is due.
+    The name map, if any, is returned first. If the consumer falls
+    behind, messages are returned without waiting until it catches up,
+    no message is dropped.
+    """
+
+    def __init__(self, source, speed=1.0, start_frame=0, end_frame=None,
+                 loop=False):
+        """
+        Parameter speed scales the playback rate, 1 for the original
+        timing, 0 for as fast as possible. Frames [start_frame, end_frame)
+        are played, repeated forever if loop is True.
+        """
+        if None == end_frame:
+            end_frame = len(source)
+
+        self.__source = source
+        self.__start_frame = max(0, start_frame)
+        self.__end_frame = min(end_frame, len(source))
+        self.__loop = loop
+
+        self.__period = 0
+        if speed > 0:
+            self.__period = 1.0 / (source.samplingRate() * speed)
+
+        self.__name_map = source.nameMap()
+        self.__position = self.__start_frame
+        self.__block = []
+        self.__start_time = None
+        self.__count = 0
+        self.__max_lag_second = 0.0
+
+    def frameCount(self):
+        """
+        Return the number of frames played.
+        """
+        return self.__count
+
+    def maxLag(self):
+        """
+        Return the largest delay in seconds of a frame behind its
+        scheduled time, caused by a slow consumer.
+        """
+        return self.__max_lag_second
+
+    def next(self):
+        """
+        Return the next message when it is due, or None at the end.
+        """
+        if None != self.__name_map:
+            name_map = self.__name_map
+            self.__name_map = None
+            return name_map
+
+        if 0 == len(self.__block):
+            if self.__position >= self.__end_frame:
+                if not self.__loop or \
+                        self.__start_frame >= self.__end_frame:
+                    return None
+                self.__position = self.__start_frame
+
+            count = min(BlockFrames, self.__end_frame - self.__position)
+            self.__block = self.__source.read(self.__position, count)
+            self.__block.reverse()
+            self.__position += count
+
+            if 0 == len(self.__block):
+                return None
+
+        if self.__period > 0:
+            now = time.perf_counter()
+            if None == self.__start_time:
+                self.__start_time = now
+
+            due = self.__start_time + self.__count * self.__period
+            if due > now:
+                time.sleep(due - now)
+            else:
+                self.__max_lag_second = max(self.__max_lag_second, now - due)
+
+        self.__count += 1
+        return self.__block.pop()
+
+#
+# END class Player
+#
+
+
+class ReplayClient:
+    """
+    In process replacement for Client. readData returns the recorded
+    messages at the playback rate, and None at the end of the recording.
+    """
+
+    def __init__(self, source, speed=1.0, start_frame=0, end_frame=None,
+                 loop=False):
+        self.__player = Player(source, speed, start_frame, end_frame, loop)
+        self.__connected = True
+
+    def close(self):
+        self.__connected = False
+
+    def isConnected(self):
+        return self.__connected
+
+    def player(self):
+        return self.__player
+
+    def waitForData(self, time_out_second=None):
+        return self.__connected
+
+    def readData(self, time_out_second=None):
+        """
+        Return the next message, waiting until it is due. The time out is
+        ignored, the recording never stalls.
+        """
+        if not self.__connected:
+            return None
+
+        data = self.__player.next()
+        if None == data:
+            self.__connected = False
+        return data
+
+    def writeData(self, data, time_out_second=None):
+        """
+        Accept and ignore requests, the recording already holds the
+        selected channels.
+        """
+        return self.__connected and (len(data) > 0)
+
+#
+# END class ReplayClient
+#
+
+
+class ReplayServer:
+    """
+    Serve a recording on a local TCP port with the Motion Service framing.
+    Each connection gets its own Player from the start of the recording.
+    """
+
+    def __init__(self, source, speed=1.0, address=("127.0.0.1", 32076),
+                 start_frame=0, end_frame=None, loop=False):
+        self.__source = source
+        self.__arguments = (speed, start_frame, end_frame, loop)
+        self.__lock = threading.Lock()
+        self.__closed = False
+        self.__players = []
+
+        self.__server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.__server.bind(address)
+        self.__server.listen(16)
+        self.__server.settimeout(0.5)
+
+        self.__thread = threading.Thread(target=self.__accept, daemon=True)
+        self.__thread.start()
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        self.__closed = True
+        if None != self.__server:
+            self.__thread.join()
+            self.__server.close()
+            self.__server = None
+
+    def address(self):
+        return self.__server.getsockname()
+
+    def players(self):
+        """
+        Return the Player of every connection so far.
+        """
+        with self.__lock:
+            return list(self.__players)
+
+    def __accept(self):
+        while not self.__closed:
+            try:
+                s, _ = self.__server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+
+            threading.Thread(
+                target=self.__serve, args=(s,), daemon=True).start()
+
+    def __serve(self, s):
+        # The source reads from a file, one connection at a time.
+        player = Player(LockedSource(self.__source, self.__lock),
+                        *self.__arguments)
+        with self.__lock:
+            self.__players.append(player)
+
+        try:
+            s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            send_message(s, Description.encode("utf-8"))
+
+            # Like the Motion Service, wait for the channel request.
+            readable, _, _ = select.select([s], [], [], RequestTimeOutSecond)
+            if len(readable) > 0:
+                header = s.recv(LengthHeader.size, socket.MSG_WAITALL)
+                if LengthHeader.size != len(header):
+                    return
+                s.recv(LengthHeader.unpack(header)[0], socket.MSG_WAITALL)
+
+            while not self.__closed:
+                data = player.next()
+                if None == data:
+                    break
+                send_message(s, data)
+        except OSError:
+            # Client disconnected.
+            pass
+        finally:
+            s.close()
+
+#
+# END class ReplayServer
+#
+
+
+class LockedSource:
+    """
+    Serialize reads of a source shared by several connections.
+    """
+
+    def __init__(self, source, lock):
+        self.__source = source
+        self.__lock = lock
+
+    def __len__(self):
+        return len(self.__source)
+
+    def samplingRate(self):
+        return self.__source.samplingRate()
+
+    def nameMap(self):
+        with self.__lock:
+            return self.__source.nameMap()
+
+    def read(self, start, count):
+        with self.__lock:
+            return self.__source.read(start, count)
+
+#
+# END class LockedSource
+#
+
+
+def send_message(s, data):
+    s.sendall(LengthHeader.pack(len(data)) + data)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="")
+
+    parser.add_argument("--stream", help="recorded stream file", default="")
+    parser.add_argument(
+        "--take", help="binary take file, may be repeated", action="append",
+        default=[]
+    )
+    parser.add_argument(
+        "--length",
+        help="number of values per frame in each take, 14 for Preview, 9 for "
+        "Sensor and Raw",
+        type=int,
+        default=9,
+    )
+    parser.add_argument(
+        "--raw", help="take values are short integers", action="store_true"
+    )
+    parser.add_argument(
+        "--native",
+        help="serve take elements as stored, in the fixed size Preview, Sensor, "
+        "or Raw format, instead of the Configurable format",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--sampling-rate", help="recording rate in Hz", type=float, default=100
+    )
+    parser.add_argument(
+        "--speed",
+        help="playback speed, 1 for real time, 0 for as fast as possible",
+        type=float,
+        default=1.0,
+    )
+    parser.add_argument(
+        "--loop", help="repeat the recording forever", action="store_true"
+    )
+    parser.add_argument(
+        "--port", help="port number to serve on", type=int, default=32076
+    )
+
+    args = parser.parse_args()
+
+    if args.stream:
+        source = StreamSource(
+            MotionTake.StreamFile(args.stream, args.sampling_rate))
+    elif len(args.take):
+        # Configurable by default, with a name map from the file names, so
+        # example_stream.py --no-scan reads the replay.
+        source = TakeSource(
+            [
+                MotionTake.TakeFile(
+                    pathname, args.length, not args.raw, args.sampling_rate)
+                for pathname in args.take
+            ],
+            configurable=not args.native,
+            names=[
+                os.path.splitext(os.path.basename(pathname))[0]
+                for pathname in args.take
+            ],
+        )
+    else:
+        print("Error, --stream or --take must be specified.")
+        return 1
+
+    server = ReplayServer(
+        source, args.speed, ("127.0.0.1", args.port), loop=args.loop)
+    print(
+        "Replay {} frames at {}x on port {}".format(
+            len(source), args.speed, args.port
+        )
+    )
+
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -27,11 +27,14 @@
 # ARISING IN ANY WAY OUT OF THE USE OF THIS SOFTWARE, EVEN IF ADVISED OF THE
 # POSSIBILITY OF SUCH DAMAGE.
 #
+import bisect
 import functools
 import select
 import socket
 import struct
 import sys
+import threading
+import time
 
 #
 # Only load functools in Python version 2.5 or newer.
@@ -47,10 +50,17 @@ class Client:
     Format methods to convert a binary message into the associated object.
     """
 
-    def __init__(self, host, port):
+    # Maximum number of bytes examined at once by readLatest().
+    DrainSize = 256 * 1024
+
+    def __init__(self, host, port, options=None):
         """
         Create client socket connection to the Motion Service data stream
         on host:port.
+
+        Set parameter options to a SocketOptions profile to tune the
+        socket, for example SocketOptions.LowLatency for console
+        connections or SocketOptions.HighThroughput for data streams.
         """
         self.__socket = None
         self.__recv_flags = 0
@@ -58,13 +68,28 @@ class Client:
         self.__description = None
         self.__time_out_second = None
         self.__time_out_second_send = None
+        self.__skip_count = 0
+        self.__last_skip_count = 0
+        self.__message_count = 0
+        self.__byte_count = 0
+        self.__last_receive_time = None
 
         # Set the default host name to the local host.
         if (None == host) or (0 == len(host)):
             host = "127.0.0.1"
 
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.connect((host, port))
+        if None != options:
+            try:
+                options.apply(s)
+                s.settimeout(options.connect_time_out_second)
+                s.connect((host, port))
+                s.settimeout(None)
+            except Exception:
+                s.close()
+                raise
+        else:
+            s.connect((host, port))
 
         self.__socket = s
 
@@ -83,7 +108,11 @@ class Client:
         Close the socket connection if it exists.
         """
         if None != self.__socket:
-            self.__socket.shutdown(2)
+            try:
+                self.__socket.shutdown(2)
+            except socket.error:
+                # Already disconnected by the remote end.
+                pass
             self.__socket.close()
 
             self.__socket = None
@@ -97,6 +126,24 @@ class Client:
         else:
             return False
 
+    def isAlive(self):
+        """
+        Return True if the connection is open and the remote end has not
+        closed it. Does not block.
+        """
+        if None == self.__socket:
+            return False
+
+        try:
+            readable, _, _ = select.select([self.__socket.fileno()], [], [], 0)
+            if len(readable) > 0:
+                # Readable with no data means the remote end closed.
+                return len(self.__socket.recv(1, socket.MSG_PEEK)) > 0
+        except (socket.error, ValueError):
+            return False
+
+        return True
+
     def waitForData(self, time_out_second=None):
         """
         Wait until there is incoming data on this client
@@ -136,6 +183,90 @@ class Client:
 
         return self.__receive()
 
+    def readLatest(self, time_out_second=None):
+        """
+        Read the most recent sample of data from the open connection.
+        Wait for at least one sample, then skip over all complete samples
+        already queued on the socket except the newest one. Skipped
+        samples are discarded without copying them into messages.
+
+        XML messages, like the Configurable name map, are never skipped.
+        They are returned in order.
+
+        Returns the newest sample, or None if the incoming data is
+        invalid. Use lastSkipCount() for the number of samples skipped.
+        """
+        self.__last_skip_count = 0
+
+        data = self.readData(time_out_second)
+        while (None != data) and (not data.startswith(b"<?xml")):
+            count, length, is_next = self.__scan_queued()
+            if not is_next:
+                break
+
+            if length > 0:
+                self.__discard(length)
+
+            data = self.__receive()
+            self.__last_skip_count += count + 1
+
+        self.__skip_count += self.__last_skip_count
+        return data
+
+    def skipCount(self):
+        """
+        Return the total number of samples skipped by readLatest().
+        """
+        return self.__skip_count
+
+    def lastSkipCount(self):
+        """
+        Return the number of samples skipped by the last readLatest().
+        """
+        return self.__last_skip_count
+
+    def messageCount(self):
+        """
+        Return the number of messages received, including the service
+        description and XML messages. Samples skipped by readLatest() are
+        not counted.
+        """
+        return self.__message_count
+
+    def bytesReceived(self):
+        """
+        Return the number of bytes received, including the length headers
+        and the samples skipped by readLatest().
+        """
+        return self.__byte_count
+
+    def lastReceiveTime(self):
+        """
+        Return the time.monotonic() time of the most recent message, or
+        None if no message was received.
+        """
+        return self.__last_receive_time
+
+    def queuedBytes(self):
+        """
+        Return the number of bytes received by the operating system and
+        not yet read, the depth of the socket receive queue. Returns None
+        if the platform does not support the query.
+        """
+        if None == self.__socket:
+            return None
+
+        try:
+            import fcntl
+            import termios
+
+            buffer = struct.pack("i", 0)
+            buffer = fcntl.ioctl(
+                self.__socket.fileno(), termios.FIONREAD, buffer)
+            return struct.unpack("i", buffer)[0]
+        except (ImportError, AttributeError, OSError):
+            return None
+
     def writeData(self, data, time_out_second=None):
         """
         Write a single sample of data to the open connection.
@@ -195,6 +326,10 @@ class Client:
                 elif len(data) > length:
                     return None
 
+            self.__message_count += 1
+            self.__byte_count += header_size + length
+            self.__last_receive_time = time.monotonic()
+
             return data
         except socket.timeout:
             pass
@@ -231,6 +366,57 @@ class Client:
 
         return False
 
+    def __scan_queued(self):
+        """
+        Look at the data queued on the socket without reading it. Returns
+        the number and total length of the complete messages that can be
+        skipped, and True if a complete message follows them.
+        """
+        readable, _, _ = select.select([self.__socket.fileno()], [], [], 0)
+        if 0 == len(readable):
+            return 0, 0, False
+
+        try:
+            data = self.__socket.recv(self.DrainSize, socket.MSG_PEEK)
+        except socket.error:
+            return 0, 0, False
+
+        header = struct.Struct("!I")
+        count = 0
+        itr = 0
+        last = None
+        while itr + header.size <= len(data):
+            end = itr + header.size + header.unpack_from(data, itr)[0]
+            if end > len(data):
+                break
+
+            # Stop at an XML message, skip everything before it.
+            if data.startswith(b"<?xml", itr + header.size):
+                return count, itr, True
+
+            last = itr
+            count += 1
+            itr = end
+
+        # Keep the newest complete message.
+        if None == last:
+            return 0, 0, False
+
+        return count - 1, last, True
+
+    def __discard(self, length):
+        """
+        Read and drop length bytes from the socket.
+        """
+        buffer = bytearray(min(length, self.DrainSize))
+        while length > 0:
+            n = self.__socket.recv_into(
+                buffer, min(length, len(buffer)), self.__recv_flags)
+            if 0 == n:
+                break
+            length -= n
+            self.__byte_count += n
+
     def __select_receive(self):
         """
         Use the select function to wait until there is data available to read
@@ -273,6 +459,316 @@ class Client:
 #
 
 
+class SocketOptions:
+    """
+    Socket tuning profile for a Client connection. Options left as None
+    keep the operating system default. Keep alive interval options are
+    only applied on platforms that support them.
+
+    Example usage:
+
+    client = Client("", 32076, SocketOptions.HighThroughput)
+
+    options = SocketOptions(receive_buffer_size=4 * 1024 * 1024)
+    client = Client("", 32076, options)
+    """
+
+    def __init__(self, receive_buffer_size=None, send_buffer_size=None,
+                 no_delay=None, keep_alive=None, keep_alive_idle_second=None,
+                 keep_alive_interval_second=None, keep_alive_count=None,
+                 connect_time_out_second=None):
+        """
+        Parameters receive_buffer_size and send_buffer_size set SO_RCVBUF
+        and SO_SNDBUF in bytes. Set no_delay to True to disable Nagle's
+        algorithm (TCP_NODELAY). Set keep_alive to True to detect dead
+        connections, with the optional idle time, probe interval and
+        probe count. Parameter connect_time_out_second limits the
+        blocking connect call.
+        """
+        self.receive_buffer_size = receive_buffer_size
+        self.send_buffer_size = send_buffer_size
+        self.no_delay = no_delay
+        self.keep_alive = keep_alive
+        self.keep_alive_idle_second = keep_alive_idle_second
+        self.keep_alive_interval_second = keep_alive_interval_second
+        self.keep_alive_count = keep_alive_count
+        self.connect_time_out_second = connect_time_out_second
+
+    def apply(self, s):
+        """
+        Set the options on socket s. Call before connect so that the
+        buffer sizes are used for the TCP window negotiation.
+        """
+        if None != self.receive_buffer_size:
+            s.setsockopt(
+                socket.SOL_SOCKET, socket.SO_RCVBUF,
+                self.receive_buffer_size)
+        if None != self.send_buffer_size:
+            s.setsockopt(
+                socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer_size)
+        if None != self.no_delay:
+            s.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_NODELAY, int(self.no_delay))
+        if None != self.keep_alive:
+            s.setsockopt(
+                socket.SOL_SOCKET, socket.SO_KEEPALIVE, int(self.keep_alive))
+
+        if self.keep_alive:
+            # TCP_KEEPIDLE is named TCP_KEEPALIVE on macOS.
+            idle = getattr(socket, "TCP_KEEPIDLE", None)
+            if None == idle:
+                idle = getattr(socket, "TCP_KEEPALIVE", None)
+            for name, value in (
+                    (idle, self.keep_alive_idle_second),
+                    (getattr(socket, "TCP_KEEPINTVL", None),
+                     self.keep_alive_interval_second),
+                    (getattr(socket, "TCP_KEEPCNT", None),
+                     self.keep_alive_count)):
+                if (None != name) and (None != value):
+                    s.setsockopt(socket.IPPROTO_TCP, name, int(value))
+
+#
+# END class SocketOptions
+#
+
+
+# Console and control connections. Small messages sent immediately,
+# fail fast if the service is unreachable.
+SocketOptions.LowLatency = SocketOptions(
+    no_delay=True, keep_alive=True, keep_alive_idle_second=10,
+    keep_alive_interval_second=2, keep_alive_count=3,
+    connect_time_out_second=2)
+
+# Multiple node data streams. Large receive buffer to absorb bursts of
+# frames, keep alive to detect a dead link during long captures.
+SocketOptions.HighThroughput = SocketOptions(
+    receive_buffer_size=4 * 1024 * 1024, no_delay=True, keep_alive=True,
+    keep_alive_idle_second=30, keep_alive_interval_second=5,
+    keep_alive_count=3, connect_time_out_second=5)
+
+
+class ReconnectClient:
+    """
+    Client connection that survives network interruptions. If a read
+    fails, times out, or raises a socket error such as a connection reset
+    by the peer, close the connection, reconnect with exponential
+    backoff, and send the saved channel request again. The stream then
+    continues with the next message from the service, starting with a new
+    XML name map on the Configurable service.
+
+    Each reconnect leaves a gap in the data. Call takeGap() after every
+    readData() to find out if the returned message is the first one after
+    a gap.
+
+    Example usage:
+
+    client = ReconnectClient(host, 32076, xml_string)
+    while True:
+        data = client.readData()
+        gap_second = client.takeGap()
+        if None != gap_second:
+            # Mark the gap in the output.
+            pass
+    """
+
+    def __init__(self, host, port, request=None, options=None,
+                 max_attempts=None, initial_delay_second=0.5,
+                 max_delay_second=30):
+        """
+        Create the first connection. Throws the socket error if the
+        service is not reachable, so that configuration problems are
+        reported immediately.
+
+        Parameter request is the message sent after every connect, for
+        example the Configurable channel list. Set max_attempts to limit
+        the number of consecutive reconnect attempts, None to retry
+        forever.
+        """
+        self.__host = host
+        self.__port = port
+        self.__request = request
+        self.__options = options
+        self.__max_attempts = max_attempts
+        self.__initial_delay_second = initial_delay_second
+        self.__max_delay_second = max_delay_second
+
+        self.__reconnect_count = 0
+        self.__gap_second = None
+        self.__skip_count = 0
+
+        # Set by cancel() from another thread to end the reconnect loop.
+        self.__cancel = threading.Event()
+
+        # Totals of the closed connections.
+        self.__message_count = 0
+        self.__byte_count = 0
+        self.__last_receive_time = None
+
+        self.__client = None
+        self.__client = self.__connect()
+
+    def close(self):
+        if None != self.__client:
+            self.__message_count += self.__client.messageCount()
+            self.__byte_count += self.__client.bytesReceived()
+            if None != self.__client.lastReceiveTime():
+                self.__last_receive_time = self.__client.lastReceiveTime()
+            self.__client.close()
+            self.__client = None
+
+    def isConnected(self):
+        return (None != self.__client) and self.__client.isConnected()
+
+    def cancel(self):
+        """
+        Stop reconnecting. May be called from another thread, a reader
+        waiting in the reconnect loop returns None after the current
+        connect attempt. The current read is not interrupted, it returns
+        after its time out.
+        """
+        self.__cancel.set()
+
+    def reconnectCount(self):
+        """
+        Return the total number of successful reconnects.
+        """
+        return self.__reconnect_count
+
+    def takeGap(self):
+        """
+        Return the length in seconds of the interruption just before the
+        most recent message, or None if there was no interruption. The gap
+        starts at the last message of the old connection, so it includes
+        the read time out. Clears the gap so the next call returns None.
+        """
+        gap_second = self.__gap_second
+        self.__gap_second = None
+        return gap_second
+
+    def readData(self, time_out_second=None):
+        """
+        Read a single message. Reconnects as needed. Returns None only if
+        the reconnect attempts are exhausted.
+        """
+        while True:
+            if None != self.__client:
+                try:
+                    data = self.__client.readData(time_out_second)
+                except (socket.error, OSError):
+                    # Connection reset or aborted by the peer.
+                    data = None
+                if None != data:
+                    return data
+
+            if not self.reconnect():
+                return None
+
+    def readLatest(self, time_out_second=None):
+        """
+        Read the most recent message, see Client.readLatest(). Reconnects
+        as needed.
+        """
+        while True:
+            if None != self.__client:
+                try:
+                    data = self.__client.readLatest(time_out_second)
+                except (socket.error, OSError):
+                    data = None
+                self.__skip_count += self.__client.lastSkipCount()
+                if None != data:
+                    return data
+
+            if not self.reconnect():
+                return None
+
+    def skipCount(self):
+        """
+        Return the total number of samples skipped by readLatest(), over
+        all connections.
+        """
+        return self.__skip_count
+
+    def messageCount(self):
+        """
+        Return the number of messages received over all connections.
+        """
+        client = self.__client
+        if None == client:
+            return self.__message_count
+
+        return self.__message_count + client.messageCount()
+
+    def bytesReceived(self):
+        """
+        Return the number of bytes received over all connections.
+        """
+        client = self.__client
+        if None == client:
+            return self.__byte_count
+
+        return self.__byte_count + client.bytesReceived()
+
+    def queuedBytes(self):
+        """
+        Return the depth of the socket receive queue of the current
+        connection, see Client.queuedBytes().
+        """
+        client = self.__client
+        if None == client:
+            return None
+
+        return client.queuedBytes()
+
+    def writeData(self, data, time_out_second=None):
+        if None == self.__client:
+            return False
+
+        return self.__client.writeData(data, time_out_second)
+
+    def reconnect(self):
+        """
+        Close the current connection and connect again, waiting longer
+        after each failed attempt. Returns True once connected, False if
+        the attempts are exhausted or cancel() was called.
+        """
+        self.close()
+        start = self.__last_receive_time
+        if None == start:
+            start = time.monotonic()
+
+        delay = self.__initial_delay_second
+        attempt = 0
+        while (None == self.__max_attempts) or \
+                (attempt < self.__max_attempts):
+            attempt += 1
+            if self.__cancel.wait(delay):
+                return False
+            try:
+                self.__client = self.__connect()
+            except (socket.error, RuntimeError):
+                delay = min(2 * delay, self.__max_delay_second)
+                continue
+
+            self.__reconnect_count += 1
+            self.__gap_second = time.monotonic() - start
+            return True
+
+        return False
+
+    def __connect(self):
+        client = Client(self.__host, self.__port, self.__options)
+        if (None != self.__request) and \
+                (not client.writeData(self.__request)):
+            client.close()
+            raise RuntimeError("failed to send request after connect")
+
+        return client
+
+#
+# END class ReconnectClient
+#
+
+
 class File:
     """
     Implements a file input stream interface for reading Motion Service
@@ -289,10 +785,18 @@ class File:
         Open a Motion take data file for reading.
 
         Set parameter pathname to the file to open as the input stream.
+        Compressed take files written by the CompressedFileWriter class
+        are detected and decompressed transparently.
         """
         self.__input = None
         self.__input = open(pathname, "rb")
 
+        if CompressedFileReader.Magic == self.__input.read(
+                len(CompressedFileReader.Magic)):
+            self.__input = CompressedFileReader(self.__input)
+        else:
+            self.__input.seek(0)
+
     def __del__(self):
         """
         Destrucutor. Close the input file stream.
@@ -351,6 +855,441 @@ class File:
 #
 
 
+class CompressedFileReader:
+    """
+    Read a chunked, compressed Motion take data file. The file holds the
+    same frames as a binary take file, split into chunks of up to a fixed
+    number of frames. Each chunk is compressed independently, so any chunk
+    can be decoded without reading the chunks before it. Every chunk header
+    holds its own number of frames, a chunk written by flush() may be
+    shorter than the others.
+
+    File layout, all little-endian:
+        header  [magic, version, value format, codec, length,
+                 frames per chunk]
+        chunk   [number of frames, compressed size, payload] ...
+        table   [chunk offset] ...
+        trailer [table offset, number of chunks, end magic]
+
+    Before compression each chunk is XOR delta encoded frame to frame, so
+    slowly changing channels become runs of zero bits, and then the bytes
+    of each value are split into planes. Both steps are lossless for
+    float and short valued takes.
+
+    A file without a trailer, for example from an interrupted recording,
+    is still readable. The chunk headers are scanned on open.
+    """
+
+    Magic = b"MTKZ"
+    EndMagic = b"MTKE"
+    Version = 1
+
+    Header = struct.Struct("<BcBxII")
+    ChunkHeader = struct.Struct("<II")
+    Trailer = struct.Struct("<QI4s")
+
+    CodecZlib = 0
+    CodecLzma = 1
+
+    def __init__(self, input):
+        """
+        Wrap an open binary file object. The read position must be just
+        past the magic bytes, or at the start of the file.
+        """
+        if 0 == input.tell():
+            if self.Magic != input.read(len(self.Magic)):
+                raise RuntimeError("not a compressed take file")
+
+        version, value_format, codec, length, frames_per_chunk = \
+            self.Header.unpack(input.read(self.Header.size))
+        if self.Version != version:
+            raise RuntimeError(
+                "unsupported compressed take version {}".format(version))
+
+        self.__input = input
+        self.__value_format = value_format.decode("ascii")
+        self.__codec = codec
+        self.__length = length
+        self.__frames_per_chunk = frames_per_chunk
+        self.__frame_size = length * struct.calcsize(
+            "<" + self.__value_format)
+
+        self.__offsets, self.__chunk_frames = self.__read_table()
+
+        # Index of the first frame of each chunk, for readFrames().
+        self.__chunk_start = []
+        self.__num_frames = 0
+        for num_frames in self.__chunk_frames:
+            self.__chunk_start.append(self.__num_frames)
+            self.__num_frames += num_frames
+
+        # Sequential read state for the file like read() interface.
+        self.__chunk_index = 0
+        self.__buffer = b""
+        self.__buffer_position = 0
+
+        # Most recently decoded chunk, for random access.
+        self.__cache_index = -1
+        self.__cache = None
+
+    def close(self):
+        if None != self.__input:
+            self.__input.close()
+            self.__input = None
+
+    def valueFormat(self):
+        """
+        Return the struct format character of each value, "f" or "h".
+        """
+        return self.__value_format
+
+    def length(self):
+        """
+        Return the number of typed elements in one frame.
+        """
+        return self.__length
+
+    def frameCount(self):
+        return self.__num_frames
+
+    def framesPerChunk(self):
+        return self.__frames_per_chunk
+
+    def chunkCount(self):
+        return len(self.__offsets)
+
+    def read(self, size):
+        """
+        File like sequential read of the decompressed frame data. Returns
+        fewer than size bytes at the end of the take.
+        """
+        result = []
+        remaining = size
+        while remaining > 0:
+            available = len(self.__buffer) - self.__buffer_position
+            if 0 == available:
+                if self.__chunk_index >= len(self.__offsets):
+                    break
+                self.__buffer = self.readChunk(self.__chunk_index)
+                self.__buffer_position = 0
+                self.__chunk_index += 1
+                continue
+
+            n = min(available, remaining)
+            result.append(self.__buffer[
+                self.__buffer_position:self.__buffer_position + n])
+            self.__buffer_position += n
+            remaining -= n
+
+        return b"".join(result)
+
+    def readFrames(self, start, count):
+        """
+        Return the decompressed bytes of count frames starting at frame
+        index start. Only the chunks that hold those frames are decoded.
+        """
+        start = max(0, start)
+        count = max(0, min(count, self.__num_frames - start))
+        result = []
+        while count > 0:
+            chunk_index = bisect.bisect_right(self.__chunk_start, start) - 1
+            if chunk_index != self.__cache_index:
+                self.__cache = self.readChunk(chunk_index)
+                self.__cache_index = chunk_index
+
+            first = start - self.__chunk_start[chunk_index]
+            n = min(count, self.__chunk_frames[chunk_index] - first)
+            result.append(self.__cache[
+                first * self.__frame_size:(first + n) * self.__frame_size])
+
+            start += n
+            count -= n
+
+        return b"".join(result)
+
+    def readChunk(self, index):
+        """
+        Read and decode a single chunk. Returns the raw frame bytes.
+        """
+        return self.decodeChunk(self.readChunkData(index))
+
+    def readChunkData(self, index):
+        """
+        Read the compressed payload of a single chunk without decoding it.
+        """
+        self.__input.seek(self.__offsets[index])
+        num_frames, size = self.ChunkHeader.unpack(
+            self.__input.read(self.ChunkHeader.size))
+        return num_frames, self.__input.read(size)
+
+    def readChunks(self, indices, max_workers=None):
+        """
+        Decode several chunks in parallel. The zlib and lzma decoders run
+        without the interpreter lock, so threads scale with cores. Returns
+        a list of raw frame bytes in the order of indices.
+        """
+        import concurrent.futures
+
+        payloads = [self.readChunkData(i) for i in indices]
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            return list(executor.map(self.decodeChunk, payloads))
+
+    def decodeChunk(self, chunk_data):
+        """
+        Decode the (number of frames, payload) pair from readChunkData.
+        """
+        num_frames, payload = chunk_data
+        data = _decompress(self.__codec, payload)
+        if len(data) != num_frames * self.__frame_size:
+            raise RuntimeError("corrupt chunk in compressed take file")
+
+        item_size = struct.calcsize("<" + self.__value_format)
+        return _xor_delta_decode(
+            _byte_unshuffle(data, item_size), self.__frame_size)
+
+    def __read_table(self):
+        """
+        Read the chunk offset table from the trailer, or scan the chunk
+        headers if the file has no trailer. Returns the list of chunk
+        offsets and the list of the number of frames in each chunk.
+        """
+        f = self.__input
+        data_start = f.tell()
+
+        f.seek(0, 2)
+        file_size = f.tell()
+        if file_size - data_start >= self.Trailer.size:
+            f.seek(file_size - self.Trailer.size)
+            table_offset, num_chunks, magic = self.Trailer.unpack(
+                f.read(self.Trailer.size))
+            if self.EndMagic == magic:
+                f.seek(table_offset)
+                offsets = list(struct.unpack(
+                    "<" + str(num_chunks) + "Q", f.read(8 * num_chunks)))
+
+                frames = []
+                for offset in offsets:
+                    f.seek(offset)
+                    num_frames, _ = self.ChunkHeader.unpack(
+                        f.read(self.ChunkHeader.size))
+                    frames.append(num_frames)
+
+                return offsets, frames
+
+        offsets = []
+        frames = []
+        offset = data_start
+        while offset + self.ChunkHeader.size <= file_size:
+            f.seek(offset)
+            num_frames, size = self.ChunkHeader.unpack(
+                f.read(self.ChunkHeader.size))
+            if offset + self.ChunkHeader.size + size > file_size:
+                break
+            # Part of a chunk table, not a chunk header.
+            if (0 == num_frames) or (num_frames > self.__frames_per_chunk):
+                break
+            offsets.append(offset)
+            frames.append(num_frames)
+            offset += self.ChunkHeader.size + size
+
+        return offsets, frames
+
+#
+# END class CompressedFileReader
+#
+
+
+class CompressedFileWriter:
+    """
+    Write Motion take data in the chunked, compressed format read by the
+    CompressedFileReader and File classes.
+
+    Example usage:
+
+    writer = CompressedFileWriter("sensor.mtkz", 9, True)
+    while True:
+        data = raw_file.readData(9, True)
+        if None == data:
+            break
+        writer.writeData(data)
+    writer.close()
+    """
+
+    def __init__(self, pathname, length, real_valued, frames_per_chunk=1000,
+                 codec=CompressedFileReader.CodecZlib, level=6):
+        """
+        Create a compressed take file.
+
+        Parameter length is the number of typed elements in one frame. Set
+        real_valued to False for short integer takes. Larger chunks
+        compress better, smaller chunks make random access cheaper.
+        """
+        if length <= 0 or frames_per_chunk <= 0:
+            raise RuntimeError("invalid compressed take parameters")
+
+        self.__value_format = "f"
+        if False == real_valued:
+            self.__value_format = "h"
+
+        self.__codec = codec
+        self.__level = level
+        self.__frames_per_chunk = frames_per_chunk
+        self.__frame = struct.Struct(
+            "<" + str(length) + self.__value_format)
+        self.__pending = []
+        self.__offsets = []
+
+        self.__output = None
+        self.__output = open(pathname, "wb")
+        self.__output.write(CompressedFileReader.Magic)
+        self.__output.write(CompressedFileReader.Header.pack(
+            CompressedFileReader.Version,
+            self.__value_format.encode("ascii"), codec, length,
+            frames_per_chunk))
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def writeData(self, data):
+        """
+        Append one frame. Parameter data is a sequence of length typed
+        values, or the packed little-endian bytes of one frame.
+        """
+        if None == self.__output:
+            return False
+
+        if isinstance(data, bytes):
+            if len(data) != self.__frame.size:
+                return False
+            self.__pending.append(data)
+        else:
+            self.__pending.append(self.__frame.pack(*data))
+
+        if len(self.__pending) >= self.__frames_per_chunk:
+            self.flush()
+
+        return True
+
+    def flush(self):
+        """
+        Compress and write any buffered frames as a chunk. The chunk may
+        hold fewer than frames_per_chunk frames, for example to make the
+        frames so far readable during a long recording.
+        """
+        if None == self.__output or 0 == len(self.__pending):
+            return
+
+        data = _xor_delta_encode(b"".join(self.__pending), self.__frame.size)
+        payload = _compress(
+            self.__codec, self.__level,
+            _byte_shuffle(data, struct.calcsize("<" + self.__value_format)))
+
+        self.__offsets.append(self.__output.tell())
+        self.__output.write(CompressedFileReader.ChunkHeader.pack(
+            len(self.__pending), len(payload)))
+        self.__output.write(payload)
+        self.__pending = []
+
+    def close(self):
+        """
+        Write the last chunk and the chunk table, and close the file.
+        """
+        if None == self.__output:
+            return
+
+        self.flush()
+
+        table_offset = self.__output.tell()
+        self.__output.write(struct.pack(
+            "<" + str(len(self.__offsets)) + "Q", *self.__offsets))
+        self.__output.write(CompressedFileReader.Trailer.pack(
+            table_offset, len(self.__offsets), CompressedFileReader.EndMagic))
+
+        self.__output.close()
+        self.__output = None
+
+#
+# END class CompressedFileWriter
+#
+
+
+def _compress(codec, level, data):
+    if CompressedFileReader.CodecLzma == codec:
+        import lzma
+        return lzma.compress(data, preset=level)
+    else:
+        import zlib
+        return zlib.compress(data, level)
+
+
+def _decompress(codec, data):
+    if CompressedFileReader.CodecLzma == codec:
+        import lzma
+        return lzma.decompress(data)
+    else:
+        import zlib
+        return zlib.decompress(data)
+
+
+def _xor_delta_encode(data, frame_size):
+    """
+    Replace every frame after the first with the XOR of that frame and the
+    previous one. One big integer operation for the whole chunk.
+    """
+    if len(data) <= frame_size:
+        return data
+
+    value = int.from_bytes(data, "little")
+    value ^= value << (8 * frame_size)
+    return (value & ((1 << (8 * len(data))) - 1)).to_bytes(
+        len(data), "little")
+
+
+def _xor_delta_decode(data, frame_size):
+    """
+    Inverse of _xor_delta_encode. A prefix XOR over frames, computed with
+    log2(number of frames) big integer operations.
+    """
+    num_frames = len(data) // frame_size
+    if num_frames <= 1:
+        return data
+
+    value = int.from_bytes(data, "little")
+    mask = (1 << (8 * len(data))) - 1
+    shift = 1
+    while shift < num_frames:
+        value ^= (value << (8 * frame_size * shift)) & mask
+        shift *= 2
+
+    return value.to_bytes(len(data), "little")
+
+
+def _byte_shuffle(data, item_size):
+    """
+    Group byte k of every value together. The high order bytes of a
+    delta encoded signal are mostly zero and compress well as a block.
+    """
+    if item_size <= 1:
+        return data
+
+    return b"".join(data[i::item_size] for i in range(item_size))
+
+
+def _byte_unshuffle(data, item_size):
+    if item_size <= 1:
+        return data
+
+    count = len(data) // item_size
+    result = bytearray(len(data))
+    for i in range(item_size):
+        result[i::item_size] = data[i * count:(i + 1) * count]
+
+    return bytes(result)
+
+
 class Format:
     """
     Motion Service streams send a list of data elements. The static Format
@@ -859,26 +1798,37 @@ class LuaConsole:
 
         return result_code, result_string
 
-    def __SendChunk(client, chunk, time_out_second=None):
+    def send_chunk_checked(self, chunk, time_out_second=None):
         """
-        A more Python friendly version of the SendChunk method.
-        This will throw an exception if there is an error in the
-        scripting command. Otherwise, this will only return the
-        printed results.
+        Write a Lua chunk and return the printed results. Throws a
+        RuntimeError if the chunk is incomplete or failed.
         """
-        lua_console = LuaConsole(client)
-        result_code, result_string = lua_console.send_chunk(
-            chunk, time_out_second)
+        result_code, result_string = self.send_chunk(chunk, time_out_second)
 
-        if lua_console.Success == result_code:
+        if self.Success == result_code:
             return result_string
-        elif lua_console.Continue == result_code:
+        elif self.Continue == result_code:
             raise RuntimeError(
                 "Lua chunk incomplete: " + str(result_string))
         else:
             raise RuntimeError(
                 "Lua command chunk failed: " + str(result_string))
 
+    def __SendChunk(client, chunk, time_out_second=None):
+        """
+        A more Python friendly version of the SendChunk method.
+        This will throw an exception if there is an error in the
+        scripting command. Otherwise, this will only return the
+        printed results.
+
+        Parameter client is an open Client connection to the console, or
+        a LuaConsole, for example a pooled console from ConsolePool.
+        """
+        if not isinstance(client, LuaConsole):
+            client = LuaConsole(client)
+
+        return client.send_chunk_checked(chunk, time_out_second)
+
     SendChunk = staticmethod(__SendChunk)
 
     class Node:
@@ -904,19 +1854,76 @@ class LuaConsole:
             # Failure. There are no configured devices or the
             # hardware is not available.
             print message
+
+        Use a pooled console to share connections between Node objects:
+
+        node = LuaConsole.Node(ConsolePool.Default.console(""))
+
+        Use multi to evaluate several node.* methods in a single
+        round trip:
+
+        (reading, _), count = node.multi(["is_reading", "num_reading"])
         """
+
+        # Printed between results in a multi call. ASCII record separator,
+        # "\30" in a Lua string literal.
+        RecordSeparator = "\x1e"
+
         def __init__(self, client):
-            self.__client = client
+            if not isinstance(client, LuaConsole):
+                client = LuaConsole(client)
+
+            self.__console = client
 
         def __getattr__(self, name):
+            # Only called for names that are not already attributes. Store
+            # the dispatch function on the instance so that every later
+            # access to the same name is a plain attribute lookup.
+            if name.startswith("__"):
+                raise AttributeError(name)
+
             if sys.version_info >= (2, 5):
-                return functools.partial(self.__dispatch, name)
+                method = functools.partial(self.__dispatch, name)
+                self.__dict__[name] = method
+                return method
             else:
                 return None
 
+        def multi(self, call_list):
+            """
+            Call several node.* methods in one Lua chunk. Each entry of
+            call_list is a method name or a tuple of a method name and
+            its arguments, for example ("set_gselect", 8).
+
+            Returns a list of results in the same order. Each result has
+            the same form and text as a single dispatched call, including
+            the trailing newline printed by the console.
+            """
+            lua_call = []
+            for item in call_list:
+                if isinstance(item, str):
+                    name, arg_list = item, ()
+                else:
+                    name, arg_list = item[0], item[1:]
+
+                lua_call.append("print(")
+                LuaConsole.Node.__format_call(lua_call, name, arg_list)
+                lua_call.append(") print('\\30')\n")
+
+            result = self.__console.send_chunk_checked("".join(lua_call), 5)
+
+            # Each result is printed as "value\n" followed by the separator
+            # line, the same text as "=node.name()" in a single call.
+            result_list = str(result).split(self.RecordSeparator + "\n")
+            return [
+                self.__parse_result(item)
+                for item in result_list[:len(call_list)]
+            ]
+
         def __dispatch(self, name, *arg_list):
-            result = self.__string_call(name, *arg_list)
+            return self.__parse_result(self.__string_call(name, *arg_list))
 
+        def __parse_result(result):
             if result.startswith("true"):
                 return True, result[4:]
             elif result.startswith("false"):
@@ -924,24 +1931,40 @@ class LuaConsole:
             else:
                 return str(result)
 
+        __parse_result = staticmethod(__parse_result)
+
         def __string_call(self, name, *arg_list):
-            lua_call = "=node.%s(" % name
+            lua_call = ["="]
+            LuaConsole.Node.__format_call(lua_call, name, arg_list)
+
+            return self.__console.send_chunk_checked("".join(lua_call), 5)
+
+        def __format_call(lua_call, name, arg_list):
+            """
+            Append the parts of the Lua call "node.name(arg, ...)" to the
+            list lua_call.
+            """
+            lua_call.append("node.")
+            lua_call.append(name)
+            lua_call.append("(")
 
             # Create a string valued argument list from a variable
             # length list of arguments. Note that this only supports
             # String and Float valued arguments.
             sep = ""
             for item in arg_list:
+                lua_call.append(sep)
                 if isinstance(item, str):
-                    lua_call += "%s%s" % (sep, "".join(
-                        ["'", ("\\'").join(i for i in item.split("'")), "'"]))
+                    lua_call.append("'")
+                    lua_call.append(item.replace("'", "\\'"))
+                    lua_call.append("'")
                 else:
-                    lua_call += "%s%s" % (sep, float(item))
+                    lua_call.append(str(float(item)))
                 sep = ", "
 
-            lua_call += ")"
+            lua_call.append(")")
 
-            return LuaConsole.SendChunk(self.__client, lua_call, 5)
+        __format_call = staticmethod(__format_call)
         #
         # END class Node
         #
@@ -952,6 +1975,146 @@ class LuaConsole:
 #
 
 
+class ConsolePool:
+    """
+    Keep open console connections per host and reuse them. Opening a
+    Client connection costs a TCP connect and a read of the service
+    description, which is often more than the commands themselves.
+
+    Connections are checked before reuse and closed when they have been
+    idle longer than the idle time out. A connection is only used by one
+    thread at a time.
+
+    Example usage:
+
+    pool = ConsolePool()
+    console = pool.console("192.168.1.50")
+    print(LuaConsole.SendChunk(console, "print(node.is_reading())"))
+
+    node = LuaConsole.Node(console)
+    print(node.is_reading())
+    """
+
+    def __init__(self, port=32075, options=None, max_idle=4,
+                 idle_time_out_second=60):
+        """
+        Parameter max_idle is the number of idle connections kept per
+        host. Connections use SocketOptions.LowLatency by default.
+        """
+        if None == options:
+            options = SocketOptions.LowLatency
+
+        self.__port = port
+        self.__options = options
+        self.__max_idle = max_idle
+        self.__idle_time_out_second = idle_time_out_second
+        self.__lock = threading.Lock()
+        # Map from host to a list of (client, last used time) pairs.
+        self.__idle = {}
+
+    def console(self, host):
+        """
+        Return a LuaConsole for host that borrows a pooled connection for
+        each chunk. Use it anywhere a LuaConsole or console Client is
+        accepted.
+        """
+        return PooledConsole(self, host)
+
+    def acquire(self, host):
+        """
+        Return an open console Client for host. Reuse an idle connection
+        if there is a healthy one, otherwise connect.
+        """
+        now = time.monotonic()
+        while True:
+            with self.__lock:
+                idle = self.__idle.get(host)
+                if not idle:
+                    break
+                client, last_used = idle.pop()
+
+            if (now - last_used <= self.__idle_time_out_second) and \
+                    client.isAlive():
+                return client
+
+            client.close()
+
+        return Client(host, self.__port, self.__options)
+
+    def release(self, host, client):
+        """
+        Return a healthy client to the pool for reuse.
+        """
+        with self.__lock:
+            idle = self.__idle.setdefault(host, [])
+            if len(idle) < self.__max_idle:
+                idle.append((client, time.monotonic()))
+                return
+
+        client.close()
+
+    def discard(self, client):
+        """
+        Close a client that is no longer usable, for example after a time
+        out left a response pending.
+        """
+        client.close()
+
+    def close(self):
+        """
+        Close all idle connections.
+        """
+        with self.__lock:
+            idle = self.__idle
+            self.__idle = {}
+
+        for client_list in idle.values():
+            for client, _ in client_list:
+                client.close()
+
+#
+# END class ConsolePool
+#
+
+
+class PooledConsole(LuaConsole):
+    """
+    LuaConsole that borrows a connection from a ConsolePool for each
+    chunk. Create with ConsolePool.console(host).
+    """
+
+    def __init__(self, pool, host):
+        LuaConsole.__init__(self, None)
+        self.__pool = pool
+        self.__host = host
+
+    def send_chunk(self, chunk, time_out_second=None):
+        client = self.__pool.acquire(self.__host)
+        try:
+            result_code, result_string = LuaConsole(client).send_chunk(
+                chunk, time_out_second)
+        except Exception:
+            self.__pool.discard(client)
+            raise
+
+        # No response at all means a time out or a broken connection. The
+        # late response would be read by the next chunk, so do not reuse.
+        if (self.Failure == result_code) and (None == result_string):
+            self.__pool.discard(client)
+        else:
+            self.__pool.release(self.__host, client)
+
+        return result_code, result_string
+
+#
+# END class PooledConsole
+#
+
+
+# Shared pool of console connections on the default port.
+ConsolePool.Default = ConsolePool()
+
+
 def main():
     """
     Example usage and test function for the Client, File, Format, and
@@ -0,0 +1,534 @@
+"""
+MotionTake module: Random access to recorded Motion take data.
+
+TakeFile reads the fixed size binary take formats (Preview, Sensor, Raw,
+or any other fixed number of elements per frame). Frame offsets are
+computed directly, so seeking to any frame is O(1). Compressed takes from
+MotionSDK.CompressedFileWriter are read one chunk at a time.
+
+StreamFile reads a recorded Configurable stream, the same length prefixed
+messages that the Client class receives from the Motion Service. Messages
+are variable length so StreamFile builds an index of frame offsets on
+first open and stores it in a sidecar file next to the recording. Later
+opens load the index and seek directly.
+
+StreamRecorder writes a recorded stream file in the format that
+StreamFile reads. Frames may be stored as compact MotionQuantize
+messages, StreamFile expands them back to Configurable messages.
+
+Example usage:
+
+take = TakeFile("sensor.bin", 9, True, 100)
+take.seek(45 * 60 * 100)
+data = take.read()
+gyroscope = MotionSDK.Format.SensorElement(data).getGyroscope()
+
+stream = StreamFile("configurable.stream", 100)
+for data in stream.readTime(60, 61):
+    container = MotionSDK.Format.Configurable(data)
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import array
+import os
+import struct
+import zlib
+
+import MotionQuantize
+import MotionSDK
+
+
+class TakeFile:
+    """
+    Seekable reader for a binary take file with a fixed number of typed
+    elements per frame. Frames are addressed by integer index or by time
+    in seconds from the start of the take.
+    """
+
+    def __init__(self, pathname, length, real_valued, sampling_rate=100):
+        """
+        Open a Motion take data file for random access reads.
+
+        Parameter length is the number of typed elements in one frame, for
+        example 9 for a single node Sensor take. Set real_valued to True for
+        float elements and False for short integers. Parameter sampling_rate
+        is the take rate in Hz, used for time based queries.
+        """
+        if length <= 0:
+            raise RuntimeError("invalid frame length for take file")
+
+        # "f" == float and "h" == short, little-endian.
+        value_format = "f"
+        if False == real_valued:
+            value_format = "h"
+
+        self.__length = length
+        self.__sampling_rate = float(sampling_rate)
+        self.__frame = struct.Struct("<" + str(length) + value_format)
+        self.__position = 0
+
+        self.__input = None
+        self.__input = open(pathname, "rb")
+
+        # Compressed takes seek by chunk, only the chunks that hold the
+        # requested frames are decoded.
+        self.__compressed = None
+        if MotionSDK.CompressedFileReader.Magic == self.__input.read(
+                len(MotionSDK.CompressedFileReader.Magic)):
+            self.__compressed = MotionSDK.CompressedFileReader(self.__input)
+            if (self.__compressed.length() != length) or \
+                    (self.__compressed.valueFormat() != value_format):
+                raise RuntimeError("compressed take frame format mismatch")
+            self.__num_frames = self.__compressed.frameCount()
+        else:
+            self.__input.seek(0, os.SEEK_END)
+            self.__num_frames = self.__input.tell() // self.__frame.size
+            self.__input.seek(0)
+
+    def __del__(self):
+        self.close()
+
+    def __len__(self):
+        return self.__num_frames
+
+    def __getitem__(self, index):
+        return self.read(index)
+
+    def close(self):
+        """
+        Close the input file stream if it is open.
+        """
+        if None != self.__input:
+            self.__input.close()
+            self.__input = None
+
+    def seek(self, frame):
+        """
+        Move the read position to the frame at the given index. Negative
+        values count back from the end of the take.
+        """
+        if frame < 0:
+            frame += self.__num_frames
+        if frame < 0 or frame > self.__num_frames:
+            raise IndexError("frame index out of range")
+
+        self.__position = frame
+
+    def tell(self):
+        """
+        Return the index of the next frame that read() will return.
+        """
+        return self.__position
+
+    def read(self, index=None):
+        """
+        Read frame data from the take.
+
+        With no argument, read the frame at the current position and
+        advance. Returns None at the end of the take.
+
+        With an integer index, return that frame. With a slice, return a
+        list of frames. Contiguous frames are read with a single file read
+        regardless of the slice step.
+        """
+        if None == self.__input:
+            return None
+
+        if None == index:
+            if self.__position >= self.__num_frames:
+                return None
+            result = self.__read_block(self.__position, 1)[0]
+            self.__position += 1
+            return result
+
+        if isinstance(index, slice):
+            frames = range(*index.indices(self.__num_frames))
+            if 0 == len(frames):
+                return []
+            first = min(frames[0], frames[-1])
+            block = self.__read_block(
+                first, abs(frames[-1] - frames[0]) + 1)
+            return [block[i - first] for i in frames]
+
+        if index < 0:
+            index += self.__num_frames
+        if index < 0 or index >= self.__num_frames:
+            raise IndexError("frame index out of range")
+
+        return self.__read_block(index, 1)[0]
+
+    def readBuffer(self, start, count):
+        """
+        Return the binary data of count consecutive frames starting at
+        frame index start, without unpacking the values. The result is
+        shorter at the end of the take.
+        """
+        start = min(max(start, 0), self.__num_frames)
+        count = min(max(count, 0), self.__num_frames - start)
+
+        size = self.__frame.size
+        if None != self.__compressed:
+            return self.__compressed.readFrames(start, count)
+
+        self.__input.seek(start * size)
+        return self.__input.read(count * size)
+
+    def readTime(self, start_second, end_second):
+        """
+        Return the list of frames in the time range [start, end) seconds
+        from the start of the take.
+        """
+        return self.read(slice(
+            self.frameAt(start_second), self.frameAt(end_second)))
+
+    def frameAt(self, second):
+        """
+        Convert a time in seconds to a frame index.
+        """
+        frame = int(round(second * self.__sampling_rate))
+        return min(max(frame, 0), self.__num_frames)
+
+    def samplingRate(self):
+        return self.__sampling_rate
+
+    def frameSize(self):
+        """
+        Return the size of one frame in bytes.
+        """
+        return self.__frame.size
+
+    def __read_block(self, start, count):
+        """
+        Read count consecutive frames starting at frame index start.
+        """
+        size = self.__frame.size
+        buffer = self.readBuffer(start, count)
+
+        return [
+            self.__frame.unpack_from(buffer, i * size)
+            for i in range(len(buffer) // size)
+        ]
+
+#
+# END class TakeFile
+#
+
+
+class StreamFile:
+    """
+    Seekable reader for a recorded Configurable stream. Each message in the
+    file is a 4 byte network order length followed by the binary payload,
+    exactly as sent by the Motion Service. XML name map messages are not
+    counted as frames. The most recent one is available from nameMap().
+
+    The frame index is stored in pathname + ".idx". It is rebuilt when the
+    recording has changed since the index was written, and extended
+    in place when the recording has only grown. A grown recording is
+    only extended if the last indexed message is unchanged, checked with
+    its CRC-32.
+    """
+
+    # Sidecar index header. Magic, version, indexed source size, source
+    # modification time in ns, byte offset of the last XML message, CRC-32
+    # of the last indexed message.
+    IndexHeader = struct.Struct("<4sIQqqI")
+    IndexMagic = b"MTIX"
+    IndexVersion = 2
+
+    LengthHeader = struct.Struct("!I")
+
+    def __init__(self, pathname, sampling_rate=100, index_pathname=None):
+        """
+        Open a recorded stream file and load or build its frame index.
+
+        Parameter sampling_rate is the stream rate in Hz, used for time
+        based queries. Set index_pathname to store the index somewhere
+        other than next to the recording.
+        """
+        self.__sampling_rate = float(sampling_rate)
+        self.__offsets = array.array("Q")
+        self.__xml_offset = -1
+        self.__position = 0
+
+        if None == index_pathname:
+            index_pathname = pathname + ".idx"
+        self.__index_pathname = index_pathname
+
+        self.__input = None
+        self.__input = open(pathname, "rb")
+
+        self.__load_index()
+
+    def __del__(self):
+        self.close()
+
+    def __len__(self):
+        return len(self.__offsets)
+
+    def __getitem__(self, index):
+        return self.read(index)
+
+    def close(self):
+        """
+        Close the input file stream if it is open.
+        """
+        if None != self.__input:
+            self.__input.close()
+            self.__input = None
+
+    def seek(self, frame):
+        """
+        Move the read position to the frame at the given index. Negative
+        values count back from the end of the recording.
+        """
+        if frame < 0:
+            frame += len(self.__offsets)
+        if frame < 0 or frame > len(self.__offsets):
+            raise IndexError("frame index out of range")
+
+        self.__position = frame
+
+    def tell(self):
+        """
+        Return the index of the next frame that read() will return.
+        """
+        return self.__position
+
+    def read(self, index=None):
+        """
+        Read raw binary messages from the recording. Pass the result to
+        Format.Configurable to decode.
+
+        With no argument, read the message at the current position and
+        advance. Returns None at the end of the recording. With an integer
+        index return that message, with a slice return a list of messages.
+        """
+        if None == self.__input:
+            return None
+
+        if None == index:
+            if self.__position >= len(self.__offsets):
+                return None
+            result = self.__read_message(self.__offsets[self.__position])
+            self.__position += 1
+            return result
+
+        if isinstance(index, slice):
+            return [
+                self.__read_message(self.__offsets[i])
+                for i in range(*index.indices(len(self.__offsets)))
+            ]
+
+        return self.__read_message(self.__offsets[index])
+
+    def readTime(self, start_second, end_second):
+        """
+        Return the list of messages in the time range [start, end) seconds
+        from the start of the recording.
+        """
+        return self.read(slice(
+            self.frameAt(start_second), self.frameAt(end_second)))
+
+    def frameAt(self, second):
+        """
+        Convert a time in seconds to a frame index.
+        """
+        frame = int(round(second * self.__sampling_rate))
+        return min(max(frame, 0), len(self.__offsets))
+
+    def samplingRate(self):
+        return self.__sampling_rate
+
+    def nameMap(self):
+        """
+        Return the raw XML name map message stored in the recording, or
+        None if there is not one.
+        """
+        if self.__xml_offset < 0:
+            return None
+
+        return self.__read_message(self.__xml_offset)
+
+    def __read_message(self, offset):
+        size = self.LengthHeader.size
+        self.__input.seek(offset)
+        length = self.LengthHeader.unpack(self.__input.read(size))[0]
+        return MotionQuantize.decode_message(self.__input.read(length))
+
+    def __load_index(self):
+        """
+        Load the sidecar index if it matches the recording, otherwise scan
+        the recording and write a new index.
+        """
+        stat = os.fstat(self.__input.fileno())
+
+        indexed_size = 0
+        try:
+            with open(self.__index_pathname, "rb") as f:
+                magic, version, size, mtime_ns, xml_offset, crc = \
+                    self.IndexHeader.unpack(f.read(self.IndexHeader.size))
+                if (self.IndexMagic == magic) and \
+                        (self.IndexVersion == version) and \
+                        (size <= stat.st_size):
+                    # Same file, or the recording has only been appended
+                    # to since we indexed it.
+                    if (size == stat.st_size) and \
+                            (mtime_ns != stat.st_mtime_ns):
+                        raise ValueError("stale index")
+                    self.__offsets.frombytes(f.read())
+                    self.__xml_offset = xml_offset
+                    # A rewritten file may be longer than the old one.
+                    if (mtime_ns != stat.st_mtime_ns) and \
+                            (crc != self.__last_message_crc(size)):
+                        raise ValueError("stale index")
+                    indexed_size = size
+        except (OSError, ValueError, struct.error):
+            self.__offsets = array.array("Q")
+            self.__xml_offset = -1
+            indexed_size = 0
+
+        if indexed_size == stat.st_size and indexed_size > 0:
+            return
+
+        indexed_size = self.__scan(indexed_size, stat.st_size)
+        self.__save_index(indexed_size, stat.st_mtime_ns)
+
+    def __scan(self, offset, file_size):
+        """
+        Read only the length headers from offset to the end of the file
+        and append each frame offset to the index. Returns the offset of
+        the end of the last complete message.
+        """
+        size = self.LengthHeader.size
+        f = self.__input
+
+        while offset + size <= file_size:
+            f.seek(offset)
+            header = f.read(size)
+            length = self.LengthHeader.unpack(header)[0]
+            if offset + size + length > file_size:
+                # Partial message at the end of a live recording.
+                break
+
+            # Peek at the payload to skip XML name map messages.
+            if f.read(5) == b"<?xml":
+                self.__xml_offset = offset
+            else:
+                self.__offsets.append(offset)
+
+            offset += size + length
+
+        return offset
+
+    def __last_message_crc(self, indexed_size):
+        """
+        Return the CRC-32 of the last indexed message, with its length
+        header, or None if there is no complete message that ends at
+        indexed_size.
+        """
+        offset = self.__xml_offset
+        if len(self.__offsets):
+            offset = max(offset, self.__offsets[-1])
+        if offset < 0:
+            return 0 if 0 == indexed_size else None
+        if offset >= indexed_size:
+            return None
+
+        self.__input.seek(offset)
+        data = self.__input.read(indexed_size - offset)
+        size = self.LengthHeader.size
+        if (len(data) < size) or \
+                (size + self.LengthHeader.unpack_from(data)[0] != len(data)):
+            return None
+
+        return zlib.crc32(data)
+
+    def __save_index(self, indexed_size, mtime_ns):
+        crc = self.__last_message_crc(indexed_size)
+        try:
+            with open(self.__index_pathname, "wb") as f:
+                f.write(self.IndexHeader.pack(
+                    self.IndexMagic, self.IndexVersion, indexed_size,
+                    mtime_ns, self.__xml_offset,
+                    0 if None == crc else crc))
+                f.write(self.__offsets.tobytes())
+        except OSError:
+            # Read only location. Keep the in memory index.
+            pass
+
+#
+# END class StreamFile
+#
+
+
+class StreamRecorder:
+    """
+    Write raw Motion Service messages to a recorded stream file that the
+    StreamFile class can read.
+    """
+
+    def __init__(self, pathname, append=False, codec=None, full_scale=None):
+        """
+        Set codec to MotionQuantize.Float16 or Int16 to store frames as
+        compact messages. Parameter full_scale is the list of channel
+        ranges for the int16 codec, see MotionQuantize.channel_scales.
+        """
+        self.__encoder = None
+        if None != codec:
+            self.__encoder = MotionQuantize.Encoder(codec, full_scale)
+
+        mode = "wb"
+        if append:
+            mode = "ab"
+
+        self.__output = None
+        self.__output = open(pathname, mode)
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        """
+        Close the output file stream if it is open.
+        """
+        if None != self.__output:
+            self.__output.close()
+            self.__output = None
+
+    def writeData(self, data):
+        """
+        Append a single binary message, as returned by Client.readData.
+        """
+        if None == self.__output or None == data:
+            return False
+
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        elif (None != self.__encoder) and not data.startswith(b"<?xml"):
+            data = self.__encoder.encode(data)
+            if None == data:
+                return False
+
+        self.__output.write(StreamFile.LengthHeader.pack(len(data)))
+        self.__output.write(data)
+
+        return True
+
+    def flush(self):
+        if None != self.__output:
+            self.__output.flush()
+
+    def saturatedCount(self):
+        """
+        Return the number of values stored at the limit of the codec.
+        """
+        if None == self.__encoder:
+            return 0
+
+        return self.__encoder.saturatedCount()
+
+#
+# END class StreamRecorder
+#
@@ -0,0 +1,501 @@
+#!/usr/bin/env python
+
+"""
+MotionUDP module: Low latency UDP and multicast output of the Configurable
+stream.
+
+The Bridge reads the Configurable data service over TCP on the local
+network link to the device, and republishes every frame as one fixed
+layout UDP datagram, to a single host or to a multicast group. The
+Receiver reads the datagrams. A lost or late datagram is never
+retransmitted, so a consumer always gets the freshest sample without the
+head of line blocking of the TCP stream.
+
+Datagram layout, little-endian:
+
+    magic "MTUD", version (u8), flags (u8), node count N (u16),
+    channel count M (u16), session id (u16), sequence number (u32),
+    sender time in ns since the epoch (u64),
+    N node keys (u32),
+    N * M channel values (f32), node major
+
+Each Bridge picks a random non zero session id. A restarted Bridge counts
+its sequence from 0 again, the Receiver starts over when the session id
+changes, or when the sequence jumps back by more than ReorderWindow.
+
+Every node in a datagram has the same number of channels. Nodes with a
+different number of channels, for example empty "Bus" nodes, are not
+sent.
+
+Example usage:
+
+# bridge the device at 192.168.1.50 to a multicast group
+python MotionUDP.py --host 192.168.1.50 --target 239.255.0.1:32090
+
+# print the newest frame from the group
+python MotionUDP.py --receive 239.255.0.1:32090
+
+receiver = Receiver(("239.255.0.1", 32090))
+while True:
+    frame = receiver.readLatest()
+    if None != frame:
+        container = frame.container()
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import argparse
+import random
+import socket
+import struct
+import sys
+import time
+
+import MotionSDK
+
+Magic = b"MTUD"
+Version = 1
+Header = struct.Struct("<4sBBHHHIQ")
+ElementHeader = struct.Struct("<II")
+
+# Largest UDP payload over IPv4.
+MaxDatagramSize = 65507
+
+# Largest backward sequence jump treated as a late datagram. A larger jump
+# is a restarted sender.
+ReorderWindow = 1024
+
+# Same channel request as example_stream.py, accelerometer (a),
+# magnetometer (m), gyro (g), and Euler angles (r).
+DefaultRequest = (
+    '<?xml version="1.0"?>'
+    '<configurable inactive="1">'
+    "<a/>"
+    "<m/>"
+    "<g/>"
+    "<r/>"
+    "</configurable>"
+)
+
+
+def is_multicast(host):
+    try:
+        return 224 <= int(host.split(".")[0]) <= 239
+    except ValueError:
+        return False
+
+
+def encode_frame(sequence, timestamp_ns, data, session=0):
+    """
+    Convert a binary Configurable message into a datagram. The channel
+    values are copied as bytes, they are not decoded. Returns None if
+    the message has no nodes.
+    """
+    keys = []
+    values = []
+    num_channels = 0
+
+    itr = 0
+    while itr + ElementHeader.size <= len(data):
+        key, length = ElementHeader.unpack_from(data, itr)
+        begin = itr + ElementHeader.size
+        itr = begin + 4 * length
+
+        if 0 == length:
+            continue
+        if 0 == num_channels:
+            num_channels = length
+        if num_channels != length:
+            continue
+
+        keys.append(key)
+        values.append(data[begin:itr])
+
+    if 0 == len(keys):
+        return None
+
+    return b"".join([
+        Header.pack(
+            Magic, Version, 0, len(keys), num_channels, session & 0xFFFF,
+            sequence & 0xFFFFFFFF, timestamp_ns),
+        struct.pack("<{}I".format(len(keys)), *keys),
+    ] + values)
+
+
+def decode_frame(data):
+    """
+    Convert a datagram into a Frame. Returns None if the datagram is not
+    a valid frame.
+    """
+    if len(data) < Header.size:
+        return None
+
+    magic, version, _, num_nodes, num_channels, session, sequence, \
+        timestamp_ns = Header.unpack_from(data)
+    if (Magic != magic) or (Version != version):
+        return None
+
+    num_values = num_nodes * num_channels
+    if len(data) != Header.size + 4 * (num_nodes + num_values):
+        return None
+
+    keys = struct.unpack_from("<{}I".format(num_nodes), data, Header.size)
+    values = struct.unpack_from(
+        "<{}f".format(num_values), data, Header.size + 4 * num_nodes)
+
+    return Frame(sequence, timestamp_ns, keys, num_channels, values, session)
+
+
+class Frame:
+    """
+    One decoded datagram. Values are a flat tuple in node major order.
+    """
+
+    def __init__(self, sequence, timestamp_ns, keys, num_channels, values,
+                 session=0):
+        self.session = session
+        self.sequence = sequence
+        self.timestamp_ns = timestamp_ns
+        self.keys = keys
+        self.num_channels = num_channels
+        self.values = values
+
+    def node(self, key):
+        """
+        Return the channel values of one node.
+        """
+        i = self.keys.index(key) * self.num_channels
+        return self.values[i:i + self.num_channels]
+
+    def container(self):
+        """
+        Return the same map from key to ConfigurableElement that
+        Format.Configurable returns for the original message.
+        """
+        return dict(
+            (key, MotionSDK.Format.ConfigurableElement(self.node(key)))
+            for key in self.keys)
+
+    def age(self):
+        """
+        Return the time in seconds since the frame was sent. Only
+        meaningful if the sender and receiver clocks are synchronized.
+        """
+        return (time.time_ns() - self.timestamp_ns) * 1e-9
+
+#
+# END class Frame
+#
+
+
+class Bridge:
+    """
+    Read the Configurable stream and send each frame as one datagram.
+    The upstream connection reconnects after a time out or a socket
+    error, see MotionSDK.ReconnectClient. A failed send drops that one
+    datagram.
+    """
+
+    def __init__(self, host, port=32076, target=("239.255.0.1", 32090),
+                 request=DefaultRequest, ttl=1, interface=None):
+        """
+        Parameter target is the (host, port) datagram destination, a
+        unicast or multicast address. For multicast, parameter ttl limits
+        the number of router hops and interface selects the local
+        interface address to send on.
+        """
+        self.__target = target
+        self.__sequence = 0
+        self.__session = random.randint(1, 0xFFFF)
+        self.__send_error_count = 0
+
+        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if is_multicast(target[0]):
+            self.__socket.setsockopt(
+                socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, ttl)
+            if None != interface:
+                self.__socket.setsockopt(
+                    socket.IPPROTO_IP, socket.IP_MULTICAST_IF,
+                    socket.inet_aton(interface))
+
+        self.__client = MotionSDK.ReconnectClient(
+            host, port, request, MotionSDK.SocketOptions.HighThroughput)
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if None != self.__client:
+            self.__client.close()
+            self.__client = None
+        if None != self.__socket:
+            self.__socket.close()
+            self.__socket = None
+
+    def sequence(self):
+        """
+        Return the number of datagrams sent.
+        """
+        return self.__sequence
+
+    def sendErrorCount(self):
+        """
+        Return the number of datagrams dropped by a send error, for
+        example while the network is down.
+        """
+        return self.__send_error_count
+
+    def step(self, time_out_second=None):
+        """
+        Read one message and send it if it is a frame. Returns False if
+        the stream ended.
+        """
+        data = self.__client.readData(time_out_second)
+        if None == data:
+            return False
+
+        if data.startswith(b"<?xml"):
+            return True
+
+        datagram = encode_frame(
+            self.__sequence, time.time_ns(), data, self.__session)
+        if None == datagram:
+            return True
+
+        if len(datagram) > MaxDatagramSize:
+            raise RuntimeError(
+                "frame of {} bytes does not fit in a datagram".format(
+                    len(datagram)))
+
+        try:
+            self.__socket.sendto(datagram, self.__target)
+        except (socket.error, OSError):
+            # Like a lost datagram, the sequence gap tells the receiver.
+            self.__send_error_count += 1
+        self.__sequence += 1
+        return True
+
+    def run(self, frames=0):
+        """
+        Forward frames until the stream ends, or for a number of frames.
+        """
+        while self.step(5):
+            if (frames > 0) and (self.__sequence >= frames):
+                break
+
+#
+# END class Bridge
+#
+
+
+class Receiver:
+    """
+    Read frame datagrams from a unicast port or a multicast group. Frames
+    older than the last frame returned are dropped, so results are always
+    in sequence order. A new sender session starts the order over.
+    """
+
+    def __init__(self, address=("239.255.0.1", 32090), interface="0.0.0.0"):
+        """
+        Parameter address is the (host, port) to receive on, a multicast
+        group or a local address. Parameter interface selects the local
+        interface to join the multicast group on.
+        """
+        self.__socket = None
+        self.__last_sequence = None
+        self.__last_session = None
+        self.__restart_count = 0
+
+        self.__received_count = 0
+        self.__skip_count = 0
+        self.__lost_count = 0
+        self.__late_count = 0
+
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if is_multicast(address[0]):
+            s.bind(("", address[1]))
+            s.setsockopt(
+                socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP,
+                socket.inet_aton(address[0]) + socket.inet_aton(interface))
+        else:
+            s.bind(address)
+
+        self.__socket = s
+
+    def __del__(self):
+        self.close()
+
+    def close(self):
+        if None != self.__socket:
+            self.__socket.close()
+            self.__socket = None
+
+    def address(self):
+        return self.__socket.getsockname()
+
+    def stats(self):
+        """
+        Return the counts of frames received, skipped by readLatest, lost
+        on the network (sequence gaps), and dropped as late (out of
+        order), and the number of sender restarts.
+        """
+        return {
+            "received": self.__received_count,
+            "skipped": self.__skip_count,
+            "lost": self.__lost_count,
+            "late": self.__late_count,
+            "restarts": self.__restart_count,
+        }
+
+    def readData(self, time_out_second=None):
+        """
+        Return the next frame in arrival order, or None on time out.
+        """
+        deadline = None
+        if None != time_out_second:
+            deadline = time.monotonic() + time_out_second
+
+        while True:
+            remaining = None
+            if None != deadline:
+                remaining = max(0, deadline - time.monotonic())
+
+            frame = self.__receive(remaining)
+            if None == frame:
+                return None
+            if self.__accept(frame):
+                return frame
+
+    def readLatest(self, time_out_second=None):
+        """
+        Wait for at least one frame, then read every queued datagram and
+        return only the newest frame. Older frames are counted as
+        skipped. Returns None on time out.
+        """
+        latest = self.readData(time_out_second)
+        if None == latest:
+            return None
+
+        while True:
+            frame = self.__receive(0)
+            if None == frame:
+                return latest
+            if self.__accept(frame):
+                latest = frame
+                self.__skip_count += 1
+
+    def __receive(self, time_out_second):
+        """
+        Read one valid datagram. Invalid datagrams are ignored.
+        """
+        self.__socket.settimeout(time_out_second)
+        while True:
+            try:
+                data = self.__socket.recv(MaxDatagramSize)
+            except (socket.timeout, BlockingIOError):
+                return None
+
+            frame = decode_frame(data)
+            if None != frame:
+                self.__received_count += 1
+                return frame
+
+    def __accept(self, frame):
+        """
+        Return True if frame is newer than the last frame accepted. Start
+        over if the sender restarted, a new session id or a backward jump
+        larger than ReorderWindow.
+        """
+        if None != self.__last_sequence:
+            delta = (frame.sequence - self.__last_sequence) & 0xFFFFFFFF
+            if (frame.session != self.__last_session) or \
+                    (0x100000000 - delta > ReorderWindow and
+                     delta >= 0x80000000):
+                self.__restart_count += 1
+            elif (0 == delta) or (delta >= 0x80000000):
+                self.__late_count += 1
+                return False
+            else:
+                self.__lost_count += delta - 1
+
+        self.__last_sequence = frame.sequence
+        self.__last_session = frame.session
+        return True
+
+#
+# END class Receiver
+#
+
+
+def parse_address(value):
+    host, _, port = value.rpartition(":")
+    return host, int(port)
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="")
+
+    parser.add_argument(
+        "--host", help="IP address of the Motion Service", default="127.0.0.1"
+    )
+    parser.add_argument(
+        "--port",
+        help="port number address of the Motion Service",
+        type=int,
+        default=32076,
+    )
+    parser.add_argument(
+        "--target",
+        help="datagram destination host:port, unicast or multicast",
+        default="239.255.0.1:32090",
+    )
+    parser.add_argument(
+        "--ttl", help="multicast time to live (router hops)", type=int, default=1
+    )
+    parser.add_argument(
+        "--receive",
+        help="receive on host:port and print the newest frame",
+        default="",
+    )
+    parser.add_argument("--frames", help="read N frames", type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.receive:
+        receiver = Receiver(parse_address(args.receive))
+        num_frames = 0
+        while (0 == args.frames) or (num_frames < args.frames):
+            frame = receiver.readLatest(5)
+            if None == frame:
+                print("Error: no frames received")
+                return 1
+
+            num_frames += 1
+            print(
+                "{} {:.1f} ms {}".format(
+                    frame.sequence,
+                    1000 * frame.age(),
+                    ",".join("{}".format(round(v, 8)) for v in frame.values),
+                )
+            )
+
+        print(receiver.stats(), file=sys.stderr)
+        return 0
+
+    bridge = Bridge(
+        args.host, args.port, parse_address(args.target), ttl=args.ttl
+    )
+    try:
+        bridge.run(args.frames)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        bridge.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
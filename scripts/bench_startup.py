@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+
+"""
+bench_startup.py:  Measure the import time of the SDK and scripts, and
+check that optional dependencies are not loaded at startup.
+
+Each module is imported in a fresh Python interpreter, several times, and
+the median time is reported. The script exits with an error if a module
+imports one of the heavy optional dependencies (zeroconf, geopy,
+requests) at load time, or if the median time is over --budget-ms.
+
+Example usage:
+
+python bench_startup.py
+python bench_startup.py --repeat 20 --budget-ms 150
+
+
+Copyright (c) 2026, Motion Workshop
+All rights reserved.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Modules that must import without loading the optional dependencies.
+Modules = ["MotionSDK", "example_stream", "set_location"]
+
+# Only needed by --search, --address and similar options.
+Deferred = ["zeroconf", "geopy", "requests"]
+
+# Run in the child interpreter. Print the import time in ms and the
+# deferred modules that were loaded.
+Child = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = 1000 * (time.perf_counter() - start)
+loaded = [m for m in {deferred!r} if m in sys.modules]
+print(json.dumps([elapsed, loaded]))
+"""
+
+
+"""
+Import a module in a fresh interpreter.
+
+Args:
+    module: module name, found in the scripts directory
+
+Returns:
+    tuple of the import time in ms and the list of loaded deferred modules
+"""
+def time_import(module):
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    result = subprocess.run(
+        [sys.executable, "-c", Child.format(module=module, deferred=Deferred)],
+        cwd=script_dir,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return elapsed, loaded
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="")
+
+    parser.add_argument(
+        "--repeat", help="number of runs per module", type=int, default=10
+    )
+    parser.add_argument(
+        "--budget-ms",
+        help="maximum median import time in milliseconds",
+        type=float,
+        default=0,
+    )
+
+    args = parser.parse_args()
+
+    failed = False
+    for module in Modules:
+        times = []
+        loaded = []
+        for _ in range(args.repeat):
+            elapsed, loaded = time_import(module)
+            times.append(elapsed)
+
+        median = statistics.median(times)
+        print(
+            "{:<16} median {:7.2f} ms  min {:7.2f} ms  max {:7.2f} ms".format(
+                module, median, min(times), max(times)
+            )
+        )
+
+        if len(loaded):
+            print("  Error: imports {} at startup".format(", ".join(loaded)))
+            failed = True
+
+        if args.budget_ms > 0 and median > args.budget_ms:
+            print("  Error: over budget of {} ms".format(args.budget_ms))
+            failed = True
+
+    if failed:
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
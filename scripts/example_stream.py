@@ -24,6 +24,15 @@ python example_stream.py --search
 # ip address 192.168.1.50
 python example_stream.py --host 192.168.1.50
 
+# stream to a columnar file for analysis, with per row group statistics
+python example_stream.py --frames 10000 --columnar take.mtcf
+
+# serve health and metrics at http://127.0.0.1:9108/metrics while streaming
+python example_stream.py --host 192.168.1.50 --file take.csv --metrics-port 9108
+
+# print the time spent in each stage of the loop every 10 seconds
+python example_stream.py --file take.csv --profile --profile-interval 10
+
 
 Copyright (c) 2026, Motion Workshop
 All rights reserved.
@@ -31,13 +40,21 @@ All rights reserved.
 
 import argparse
 import sys
+import time
 from xml.etree.ElementTree import XML
 import json
 import MotionSDK
-from MotionNodePOEBrowser import *
+from MotionCSV import CSVWriter
 
 PortConsole = 32075
 
+# Reuse console connections for every command sent to a host.
+console_pool = MotionSDK.ConsolePool(PortConsole)
+
+# Channel names of the <a/><m/><g/><r/> channel request, used for the
+# header row and the columnar export.
+ChannelName = ["ax", "ay", "az", "mx", "my", "mz", "gx", "gy", "gz", "rx", "ry", "rz"]
+
 
 """
 Parse the name map and get each connected node's key/id pairs.
@@ -79,7 +96,7 @@ def scan_and_start_reading(args, node_ip_addr):
     node_list = []
 
     # Use the Lua scripting interface to remove current node list, and rescan
-    lua_client = MotionSDK.Client(node_ip_addr, PortConsole)
+    lua_client = console_pool.console(node_ip_addr)
     lua_chunk = " node.close()" " node.erase()" " node.scan()"
     MotionSDK.LuaConsole.SendChunk(lua_client, lua_chunk, 5)
 
@@ -169,7 +186,6 @@ def scan_and_start_reading(args, node_ip_addr):
         " end"
     )
     console_result = MotionSDK.LuaConsole.SendChunk(lua_client, lua_chunk, 5)
-    lua_client.close()
     if "Failed" in console_result:
         print("Error in start reading.")
         return False, node_list
@@ -195,6 +211,9 @@ def stream_data_to_csv(args, out):
 
     # if no host ip address is specified on the command line, then scan.
     if args.search:
+        # Only load zeroconf when searching.
+        from MotionNodePOEBrowser import MotionNodePOEBrowser
+
         # Find any MotionNode POE devices on the network using
         # zeroconf, waiting up to 2 seconds for scanning.
         wait_duration = 2
@@ -215,11 +234,17 @@ def stream_data_to_csv(args, out):
             node_ip_addr = args.host
     # scan and attempt to start reading from any connected
     # MotionNode device(s)
-    is_node_reading, node_list = scan_and_start_reading(args, node_ip_addr)
-    if not is_node_reading:
-        return False
+    node_list = []
+    if args.no_scan:
+        # The data service is already streaming, for example a relay or a
+        # replay server without a console. The nodes come from the name map.
+        print("Reading without scan, the nodes are listed in the name map.")
+    else:
+        is_node_reading, node_list = scan_and_start_reading(args, node_ip_addr)
+        if not is_node_reading:
+            return False
 
-    print("Reading from:")
+        print("Reading from:")
 
     for node in node_list:
         print(
@@ -251,112 +276,287 @@ def stream_data_to_csv(args, out):
         "</configurable>"
     )
 
-    client = MotionSDK.Client(node_ip_addr, args.port)
-
-    if not client.writeData(xml_string):
-        raise RuntimeError(
-            "failed to send channel list request to Configurable service"
+    if args.reconnect:
+        # Reconnect with backoff and resend the channel request if the
+        # stream is interrupted, keep writing to the same output.
+        client = MotionSDK.ReconnectClient(
+            node_ip_addr,
+            args.port,
+            xml_string,
+            MotionSDK.SocketOptions.HighThroughput,
         )
+    else:
+        client = MotionSDK.Client(
+            node_ip_addr, args.port, MotionSDK.SocketOptions.HighThroughput
+        )
+
+        if not client.writeData(xml_string):
+            raise RuntimeError(
+                "failed to send channel list request to Configurable service"
+            )
+
+    monitor = None
+    if args.monitor and len(node_list):
+        # Check for sensor faults, configured from the scanned node list. The
+        # checks run in a background thread, off the stream loop.
+        from MotionMonitor import Monitor, MonitorThread
+
+        monitor = MonitorThread(Monitor(node_list, num_channels=len(ChannelName)))
 
     num_frames = 0
+    num_columns = 0
     xml_node_list = None
+    header_written = False
+    columnar = None
+    columnar_keys = []
+    missing_values = [float("nan")] * len(ChannelName)
+
+    profile = None
+    if args.profile:
+        # Time each stage of the loop, report to stderr.
+        from MotionProfile import StageProfile
+
+        profile = StageProfile(["read", "decode", "flatten", "format", "write"])
+        profile_time = time.monotonic()
+
+    # Format and write the rows in blocks, not one write per frame.
+    writer = CSVWriter(
+        out,
+        precision=args.precision,
+        width=args.width,
+        block_frames=args.block_frames,
+        flush_second=args.flush_second,
+        profile=profile,
+    )
+
+    metrics = None
+    metrics_server = None
+    if args.metrics_port > 0:
+        # Count frames and serve the counters from a background thread.
+        from MotionMetrics import MetricsServer, StreamMetrics
+
+        metrics = StreamMetrics()
+        metrics.addGauge(
+            "queue_bytes", client.queuedBytes, "Bytes waiting in the receive queue."
+        )
+        metrics.addGauge(
+            "bytes_received", client.bytesReceived, "Bytes read from the stream."
+        )
+        metrics.addGauge(
+            "bytes_written", writer.bytesWritten, "Characters written to the output."
+        )
+        if args.reconnect:
+            metrics.addGauge(
+                "reconnects", client.reconnectCount, "Reconnects after an interruption."
+            )
+        metrics_server = MetricsServer(
+            metrics, (args.metrics_address, args.metrics_port)
+        )
 
     # keep a list of actual node key:name pairs
     # removing any parent Bus nodes (which are empty data)
     node_list_imus = {}
 
-    while True:
-        # Block, waiting for the next sample.
-        data = client.readData(time_out_second=5)
-        if data is None:
-            raise RuntimeError("data stream interrupted or timed out")
-            break
-
-        if data.startswith(b"<?xml"):
-            xml_node_list = data
-            continue
-
-        container = MotionSDK.Format.Configurable(data)
-
-        # Consume the XML node name list. If the print header option is active
-        # add that now.
-        if xml_node_list:
-
-            # populate a node_list_imus with the names of each IMU ("node_xx")
-            # removing any empty "Bus" container nodes.
-            name_map = parse_name_map(xml_node_list)
-            for key, val in name_map.items():
-                if "Bus" not in val:
-                    node_list_imus[key] = val
-
-            if args.header:
-                # generate the csv header.  change this to match the selected
-                # configurable channels.
-                ChannelName = [
-                    "ax",
-                    "ay",
-                    "az",
-                    "mx",
-                    "my",
-                    "mz",
-                    "gz",
-                    "gy",
-                    "gz",
-                    "rx",
-                    "ry",
-                    "rz",
-                ]
-
-                flat_list = []
-                for key in container:
-                    if key not in node_list_imus:
-                        continue
+    try:
+        while True:
+            # Block, waiting for the next sample.
+            if profile is not None:
+                read_start_ns = time.perf_counter_ns()
+            data = client.readData(time_out_second=5)
+            if profile is not None:
+                profile.add("read", time.perf_counter_ns() - read_start_ns)
+            if data is None:
+                raise RuntimeError("data stream interrupted or timed out")
+                break
 
-                    if key not in name_map:
-                        raise RuntimeError(
-                            "device missing from name map, unable to print " "header"
+            if args.reconnect:
+                gap_second = client.takeGap()
+                if gap_second is not None:
+                    # Mark the gap in the output with a row of empty values.
+                    if columnar is not None:
+                        columnar.writeRow([float("nan")] * num_columns)
+                    elif num_columns:
+                        writer.writeLine("," * (num_columns - 1))
+                    print(
+                        "Reconnected after {:.1f} seconds".format(gap_second),
+                        file=sys.stderr,
+                    )
+
+            if data.startswith(b"<?xml"):
+                xml_node_list = data
+                continue
+
+            if (metrics is not None) or (profile is not None):
+                decode_start_ns = time.perf_counter_ns()
+                container = MotionSDK.Format.Configurable(data)
+                decode_ns = time.perf_counter_ns() - decode_start_ns
+                if metrics is not None:
+                    metrics.frame(container, decode_ns)
+                if profile is not None:
+                    profile.add("decode", decode_ns)
+            else:
+                container = MotionSDK.Format.Configurable(data)
+
+            if monitor is not None:
+                for event in monitor.updateContainer(container):
+                    print("Sensor: {}".format(event), file=sys.stderr)
+
+            # Consume the XML node name list. If the print header option is active
+            # add that now.
+            if xml_node_list:
+
+                # populate a node_list_imus with the names of each IMU ("node_xx")
+                # removing any empty "Bus" container nodes.
+                name_map = parse_name_map(xml_node_list)
+                if metrics is not None:
+                    metrics.setNames(name_map)
+                imus = {}
+                for key, val in name_map.items():
+                    if "Bus" not in val:
+                        imus[key] = val
+
+                # After a reconnect the columns must still match the rows
+                # already written.
+                if len(node_list_imus) and imus != node_list_imus:
+                    raise RuntimeError(
+                        "device list changed after reconnect, unable to continue "
+                        "the same output"
+                    )
+                node_list_imus = imus
+
+                if args.monitor and monitor is None and len(imus):
+                    # No scan, configure the monitor from the name map and
+                    # the command line settings.
+                    from MotionMonitor import Monitor, MonitorThread
+
+                    monitor = MonitorThread(
+                        Monitor(
+                            [
+                                {
+                                    "key": key,
+                                    "name": name,
+                                    "sampling_rate": args.sampling_rate,
+                                    "accel_range": args.accel_range,
+                                }
+                                for key, name in sorted(imus.items())
+                            ],
+                            num_channels=len(ChannelName),
                         )
+                    )
 
-                    item = container[key]
-                    if len(ChannelName) != item.size():
+                if (args.header or args.columnar) and not header_written:
+                    # generate the csv header.  change ChannelName to match the
+                    # selected configurable channels.
+                    flat_list = []
+                    header_keys = []
+                    # The columnar file has a column for every node in the
+                    # name map, also if it is missing from this frame.
+                    for key in node_list_imus if args.columnar else container:
+                        if key not in node_list_imus:
+                            continue
+
+                        if key not in name_map:
+                            raise RuntimeError(
+                                "device missing from name map, unable to print "
+                                "header"
+                            )
+
+                        item = container.get(key)
+                        if (item is not None) and (len(ChannelName) != item.size()):
+                            raise RuntimeError(
+                                "expected {} channels but found {}, unable to "
+                                "print header".format(len(ChannelName), item.size())
+                            )
+
+                        header_keys.append(key)
+                        name = name_map[key]
+                        for channel in ChannelName:
+                            flat_list.append("{}.{}".format(name, channel))
+
+                    if not len(flat_list):
                         raise RuntimeError(
-                            "expected {} channels but found {}, unable to "
-                            "print header".format(len(ChannelName), item.size())
+                            "unknown data format, unabled to print header"
                         )
 
-                    name = name_map[key]
-                    for channel in ChannelName:
-                        flat_list.append("{}.{}".format(name, channel))
-
-                if not len(flat_list):
-                    raise RuntimeError("unknown data format, unabled to print header")
-
-                out.write(",".join(["{}".format(v) for v in flat_list]) + "\n")
-
-            xml_node_list = None
-
-        #
-        # Make an array of all of the values, in order, that are part of one
-        # sample. This is a single row in the output.
-        #
-        flat_list = []
-        for key in container:
-            if key not in node_list_imus:
-                continue
-            item = container[key]
-            for i in range(item.size()):
-                flat_list.append(item.value(i))
-
-        if not len(flat_list):
-            raise RuntimeError("unknown data format in stream")
+                    if args.columnar:
+                        # Write the columns directly, no CSV to convert later.
+                        from MotionColumnar import ColumnarWriter
 
-        out.write(",".join(["{}".format(round(v, 8)) for v in flat_list]) + "\n")
+                        columnar = ColumnarWriter(
+                            args.columnar,
+                            flat_list,
+                            metadata={"sampling_rate": args.sampling_rate},
+                        )
+                        columnar_keys = header_keys
+                    else:
+                        writer.writeLine(",".join(flat_list))
+                    header_written = True
+
+                xml_node_list = None
+
+            #
+            # Make an array of all of the values, in order, that are part of one
+            # sample. This is a single row in the output.
+            #
+            if profile is not None:
+                flatten_start_ns = time.perf_counter_ns()
+            flat_list = []
+            if columnar is not None:
+                # Fixed columns, NaN for a node missing from this frame.
+                for key in columnar_keys:
+                    item = container.get(key)
+                    if item is None:
+                        flat_list.extend(missing_values)
+                    else:
+                        flat_list.extend(item.access())
+            else:
+                for key in container:
+                    if key not in node_list_imus:
+                        continue
+                    flat_list.extend(container[key].access())
+            if profile is not None:
+                profile.add("flatten", time.perf_counter_ns() - flatten_start_ns)
+
+            if not len(flat_list):
+                raise RuntimeError("unknown data format in stream")
+
+            if columnar is not None:
+                if profile is not None:
+                    write_start_ns = time.perf_counter_ns()
+                columnar.writeRow(flat_list)
+                if profile is not None:
+                    profile.add("write", time.perf_counter_ns() - write_start_ns)
+            else:
+                # Times the format and write stages of each block.
+                writer.writeRow(flat_list)
+            num_columns = len(flat_list)
+
+            if profile is not None:
+                profile.frame()
+                if (args.profile_interval > 0) and (
+                    time.monotonic() - profile_time >= args.profile_interval
+                ):
+                    profile_time = time.monotonic()
+                    print(profile.report(interval=True), file=sys.stderr)
+
+            if args.frames > 0:
+                num_frames += 1
+                if num_frames >= args.frames:
+                    break
+    finally:
+        # Write any buffered rows, also on an error or Ctrl-C.
+        writer.close()
+        if columnar is not None:
+            columnar.close()
+        if metrics_server is not None:
+            metrics_server.close()
+        if monitor is not None:
+            monitor.close()
+            for event in monitor.takeEvents():
+                print("Sensor: {}".format(event), file=sys.stderr)
+        if profile is not None:
+            print(profile.report(), file=sys.stderr)
 
-        if args.frames > 0:
-            num_frames += 1
-            if num_frames >= args.frames:
-                break
-    
     return True
 
 
@@ -372,6 +572,12 @@ def main(argv):
         "--host", help="IP address of the Motion Service", default="127.0.0.1"
     )
     parser.add_argument("--search", help="search for a MotionNode POE device using Zeroconf.", action="store_true")
+    parser.add_argument(
+        "--no-scan",
+        help="do not scan and configure the devices on the console port, read a "
+        "stream that is already running (relay, replay)",
+        action="store_true",
+    )
     parser.add_argument(
         "--port",
         help="port number address of the Motion Service",
@@ -384,14 +590,96 @@ def main(argv):
     parser.add_argument(
         "--sampling-rate", help="sampling rate in Hz", type=int, default=100
     )
+    parser.add_argument(
+        "--columnar",
+        help="write a columnar file (.parquet needs pyarrow, or .mtcf) "
+        "instead of CSV",
+        default="",
+    )
+    parser.add_argument(
+        "--precision",
+        help="number of decimal places in the CSV output",
+        type=int,
+        default=8,
+    )
+    parser.add_argument(
+        "--width",
+        help="pad CSV values to a fixed width, 0 to remove trailing zeros",
+        type=int,
+        default=0,
+    )
+    parser.add_argument(
+        "--block-frames",
+        help="write the CSV output every N frames",
+        type=int,
+        default=256,
+    )
+    parser.add_argument(
+        "--flush-second",
+        help="write the CSV output at least every N seconds",
+        type=float,
+        default=0.5,
+    )
+    parser.add_argument(
+        "--monitor",
+        help="print sensor fault events (stuck, clipping, NaN, gyro bias, "
+        "magnetic, rate) to stderr",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--metrics-port",
+        help="serve /metrics and /health over HTTP on this port, 0 to disable",
+        type=int,
+        default=0,
+    )
+    parser.add_argument(
+        "--metrics-address",
+        help="local address of the metrics endpoint",
+        default="127.0.0.1",
+    )
+    parser.add_argument(
+        "--profile",
+        help="time each stage of the loop and print a breakdown to stderr",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--profile-interval",
+        help="print the --profile breakdown every N seconds, 0 for only at exit",
+        type=float,
+        default=0,
+    )
+    parser.add_argument(
+        "--profile-output",
+        help="write a cProfile function profile of the whole run to this file",
+        default="",
+    )
+    parser.add_argument(
+        "--reconnect",
+        help="reconnect and continue if the data stream is interrupted",
+        action="store_true",
+    )
 
     args = parser.parse_args()
 
-    if args.file:
-        with open(args.file, "w") as f:
-            stream_data_to_csv(args, f)
-    else:
-        stream_data_to_csv(args, sys.stdout)
+    profiler = None
+    if args.profile_output:
+        # Function level profile, read it with the pstats module.
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        if args.file:
+            with open(args.file, "w") as f:
+                stream_data_to_csv(args, f)
+        else:
+            stream_data_to_csv(args, sys.stdout)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(args.profile_output)
+            print("Profile written to {}".format(args.profile_output), file=sys.stderr)
 
 
 if __name__ == "__main__":
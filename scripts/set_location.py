@@ -27,22 +27,38 @@ python set_location.py --search --latitude 47.6 --longitude 122 --elevation 20
 # ip address 192.168.1.50
 python set_location.py --host 192.168.1.50 --latitude 47.6 --longitude 122 --elevation 20 
 
+# set locations on many devices from a manifest file, with columns
+# host (or uuid), address (or latitude, longitude, elevation)
+python set_location.py --manifest site.csv
+
+# also read each location back from the device and compare it to the
+# request
+python set_location.py --manifest site.csv --verify
+
 
 Copyright (c) 2026, Motion Workshop
 All rights reserved.
 """
 
 import argparse
+import concurrent.futures
+import csv
+import json
 import sys
 from xml.etree.ElementTree import XML
 import MotionSDK
-from MotionNodePOEBrowser import *
-import requests
-from geopy.geocoders import Nominatim
-from geopy.exc import GeocoderTimedOut
+from LocationCache import LocationCache, DefaultPathname
 
 PortConsole = 32075
 
+# Reuse console connections for every command sent to a host.
+console_pool = MotionSDK.ConsolePool(PortConsole)
+
+# Largest difference between the requested location and the location read
+# back from the device, in degrees and meters.
+LocationTolerance = 1e-4
+ElevationTolerance = 1.0
+
 
 """
 Sets the geographic location for MotionNode POE device
@@ -53,15 +69,19 @@ Args:
     latitude: new location latitude to set
     longitude: new location longitude to set
     elevation:  new location elevation to set
+    lua_client: optional console for node_ip_addr, from the console pool
+              by default
+    verify: read the location back and compare it to the new location
     
 Returns:
     True if successful
 """
 def set_location(
-    node_ip_addr, latitude, longitude, elevation
+    node_ip_addr, latitude, longitude, elevation, lua_client=None, verify=False
 ):
 
-    lua_client = MotionSDK.Client(node_ip_addr, PortConsole)
+    if lua_client is None:
+        lua_client = console_pool.console(node_ip_addr)
 
     # set the static ip address
     lua_chunk = (
@@ -71,52 +91,67 @@ def set_location(
   
     console_result = MotionSDK.LuaConsole.SendChunk(lua_client, lua_chunk, 5)
     if "false" in console_result:
-        print("Error setting location = {}, {}, {}".format(latitude, longitude, elevation))
+        print("{}: Error setting location = {}, {}, {}".format(node_ip_addr, latitude, longitude, elevation))
         return False
-    else:
-        print("Success - set location = {}, {}, {}".format(latitude, longitude, elevation))
 
-    return True
+    if verify:
+        location = get_location(node_ip_addr, lua_client)
+        if location is None:
+            print("{}: Error - unable to read back the location".format(node_ip_addr))
+            return False
 
+        if (
+            abs(location[0] - float(latitude)) > LocationTolerance
+            or abs(location[1] - float(longitude)) > LocationTolerance
+            or abs(location[2] - float(elevation)) > ElevationTolerance
+        ):
+            print(
+                "{}: Error - location is {}, {}, {} after setting {}, {}, {}".format(
+                    node_ip_addr, *(tuple(location) + (latitude, longitude, elevation))
+                )
+            )
+            return False
 
-"""
-Run geocode call to estimate lat/long.  Try up to max_attempts 
-times, as sometimes this api times out.
+    print("{}: Success - set location = {}, {}, {}".format(node_ip_addr, latitude, longitude, elevation))
 
-Args:
-    address: address string, for example "Seattle, WA, USA"
-"""
-def get_geocode_location(address):
-    attempt=1
-    max_attempts=5
-    try:
-        geolocator = Nominatim(user_agent="geo_app")
-        return geolocator.geocode(address)
-        #return geopy.geocode(address)
-    except GeocoderTimedOut:
-        if attempt <= max_attempts:
-            return do_geocode(address, attempt=attempt+1)
-        raise
+    return True
 
 
 """
-Get the elevation at a location on Earth
+Read the geographic location of a MotionNode POE device.
 
 Args:
-    latitude: location latitude in degrees
-    longitude: location longitude in degrees
+    node_ip_addr: current target device IP address
+    lua_client: optional console for node_ip_addr, from the console pool
+              by default
 
 Returns:
-    elevation in meters at given location
+    [latitude, longitude, elevation], or None if the location is not set
 """
-def get_elevation(latitude, longitude):
+def get_location(node_ip_addr, lua_client=None):
+
+    if lua_client is None:
+        lua_client = console_pool.console(node_ip_addr)
+
+    # location() with no arguments returns the current location, as three
+    # values or as a table. This return shape is not documented, so
+    # verification is off unless --verify is set.
+    lua_chunk = (
+        " local r = {node.system.location()}"
+        ' if "table" == type(r[1]) then r = r[1] end'
+        " print(r[1] or r.latitude, r[2] or r.longitude, r[3] or r.elevation)"
+    )
+
+    console_result = MotionSDK.LuaConsole.SendChunk(lua_client, lua_chunk, 5)
     try:
-      url = f"https://api.open-elevation.com/api/v1/lookup?locations={latitude},{longitude}"
-      response = requests.get(url).json()
-      return response['results'][0]['elevation']
-    except:
-      print("Error - elevation api call failed.")
-      raise
+        location = [float(value) for value in console_result.split()]
+    except ValueError:
+        return None
+
+    if 3 != len(location):
+        return None
+
+    return location
 
 
 """
@@ -136,6 +171,9 @@ def connect_and_set_location(args):
     # if no host ip address is specified on the command line,
     # then scan.
     if args.search:
+        # Only load zeroconf when searching.
+        from MotionNodePOEBrowser import MotionNodePOEBrowser
+
         # Find any MotionNode POE devices on the network using
         # zeroconf, waiting up to 2 seconds for scanning.
         wait_duration = 2
@@ -155,27 +193,217 @@ def connect_and_set_location(args):
       else:
         node_ip_addr = args.host
 
-    # if address was specified, attempt to get the lat/long via geopy.
-    if args.address:
-        location = get_geocode_location(args.address)
-        if not location:
-            print(f"Error - location service failed to find {args.address}")
-            return False
-        
-        elevation = get_elevation(location.latitude, location.longitude)
-        # set the new static ip address for the target MotionNode POE device
-        set_location_success = set_location(node_ip_addr, location.latitude, location.longitude, elevation)
-        if not set_location_success:
-            return False
-    else:
-        # set the new static ip address for the target MotionNode POE device
-        set_location_success = set_location(node_ip_addr, args.latitude, args.longitude, args.elevation)
-        if not set_location_success:
-            return False
+    # geocode and elevation lookups are cached locally, so repeated runs
+    # for the same site do not call the web services again.
+    cache = LocationCache(
+        args.cache or None, args.cache_ttl * 24 * 60 * 60, args.offline
+    )
+
+    try:
+        # if address was specified, attempt to get the lat/long via geopy.
+        if args.address:
+            location = cache.geocode(args.address)
+            if not location:
+                print(f"Error - location service failed to find {args.address}")
+                return False
+
+            latitude, longitude = location
+            elevation = cache.elevation(latitude, longitude)
+        else:
+            if args.latitude is None or args.longitude is None:
+                print("Error, --latitude and --longitude or --address must be specified.")
+                return False
+
+            latitude, longitude = args.latitude, args.longitude
+            elevation = args.elevation
+            if elevation is None:
+                elevation = cache.elevation(latitude, longitude)
+    except Exception as e:
+        # Not in the cache in --offline mode, or the lookup service failed
+        # (time out, connection error, bad response).
+        print("Error - location lookup failed: {}".format(e))
+        return False
+
+    # set the new location for the target MotionNode POE device
+    set_location_success = set_location(
+        node_ip_addr, latitude, longitude, elevation, verify=args.verify
+    )
+    if not set_location_success:
+        return False
 
     return True
 
 
+"""
+Read a batch location manifest.  A CSV file with a header row, or a
+JSON list of objects, with the fields:
+
+    host or uuid: target device ip address, or MotionNode uuid
+    address: location address, or
+    latitude, longitude, elevation: location in degrees and meters
+
+Args:
+    pathname: manifest file
+
+Returns:
+    list of entry dictionaries
+"""
+def load_manifest(pathname):
+    with open(pathname, "r", newline="") as f:
+        if pathname.lower().endswith(".json"):
+            entries = json.load(f)
+        else:
+            entries = list(csv.DictReader(f))
+
+    # treat empty CSV cells as missing values
+    for entry in entries:
+        for key, value in list(entry.items()):
+            if value is None or value == "":
+                del entry[key]
+
+    return entries
+
+
+"""
+Find the host of each MotionNode POE device on the network by uuid,
+using Zeroconf to list devices and the console to read their node
+configuration.
+
+Args:
+    uuid_list: list of uuid strings to find
+    jobs: number of devices to query at once
+
+Returns:
+    dictionary from uuid to host ip address
+"""
+def find_hosts_by_uuid(uuid_list, jobs):
+    # Only load zeroconf when searching.
+    from MotionNodePOEBrowser import MotionNodePOEBrowser
+
+    wait_duration = 2
+    node_browser = MotionNodePOEBrowser(wait_duration)
+    host_list = [addresses[0] for addresses in node_browser.get_node_list()]
+
+    def read_uuids(host):
+        lua_client = console_pool.console(host)
+        config = json.loads(
+            MotionSDK.LuaConsole.SendChunk(
+                lua_client, " list = node.configuration() print(list)", 5
+            )
+        )
+        return host, [node["uuid"] for node in config["items"] if "uuid" in node]
+
+    host_map = {}
+    with concurrent.futures.ThreadPoolExecutor(max(1, jobs)) as executor:
+        for future in [executor.submit(read_uuids, host) for host in host_list]:
+            try:
+                host, uuids = future.result()
+            except (OSError, RuntimeError, ValueError):
+                continue
+            for uuid in uuids:
+                if uuid in uuid_list:
+                    host_map[uuid] = host
+
+    return host_map
+
+
+"""
+Set the location on every device in a manifest.  Each unique address is
+looked up once, then all devices are set concurrently, using pooled
+console connections.
+
+Args:
+    args: command line ArgumentParser arguments
+
+Returns:
+    True if every device was set successfully
+"""
+def set_location_batch(args):
+    entries = load_manifest(args.manifest)
+
+    cache = LocationCache(
+        args.cache or None, args.cache_ttl * 24 * 60 * 60, args.offline
+    )
+
+    # resolve each unique address or lat/long once
+    targets = []
+    failed = []
+    for entry in entries:
+        name = entry.get("host") or entry.get("uuid")
+        if not name:
+            print("Error - manifest entry without host or uuid: {}".format(entry))
+            failed.append(str(entry))
+            continue
+
+        try:
+            if "address" in entry:
+                location = cache.geocode(entry["address"])
+                if not location:
+                    print("{}: Error - location service failed to find {}".format(name, entry["address"]))
+                    failed.append(name)
+                    continue
+                latitude, longitude = location
+                elevation = entry.get("elevation")
+                if elevation is None:
+                    elevation = cache.elevation(latitude, longitude)
+            else:
+                latitude = float(entry["latitude"])
+                longitude = float(entry["longitude"])
+                elevation = entry.get("elevation")
+                if elevation is None:
+                    elevation = cache.elevation(latitude, longitude)
+            elevation = float(elevation)
+        except Exception as e:
+            # An invalid entry, or any failure of the lookup service. Only
+            # this device fails, the rest of the batch is still set.
+            print("{}: Error - unable to resolve location: {}".format(name, e))
+            failed.append(name)
+            continue
+
+        targets.append([entry, name, latitude, longitude, elevation])
+
+    # map uuid entries to a host on the network
+    uuid_list = [t[0]["uuid"] for t in targets if not t[0].get("host")]
+    if len(uuid_list):
+        host_map = find_hosts_by_uuid(uuid_list, args.jobs)
+        for target in targets:
+            if not target[0].get("host"):
+                target[0]["host"] = host_map.get(target[0]["uuid"])
+
+    def set_one(target):
+        entry, name, latitude, longitude, elevation = target
+        host = entry.get("host")
+        if not host:
+            print("{}: Error - device not found on the network".format(name))
+            return name, False
+
+        try:
+            return name, set_location(
+                host, latitude, longitude, elevation, verify=args.verify
+            )
+        except OSError as e:
+            print("{}: Error - unable to connect: {}".format(name, e))
+            return name, False
+        except RuntimeError as e:
+            print("{}: Error - {}".format(name, e))
+            return name, False
+
+    with concurrent.futures.ThreadPoolExecutor(max(1, args.jobs)) as executor:
+        for name, success in executor.map(set_one, targets):
+            if not success:
+                failed.append(name)
+
+    print(
+        "Set location on {} of {} devices.".format(
+            len(entries) - len(failed), len(entries)
+        )
+    )
+    for name in failed:
+        print("  failed: {}".format(name))
+
+    return not len(failed)
+
+
 def main(argv):
     parser = argparse.ArgumentParser(description="")
 
@@ -184,14 +412,25 @@ def main(argv):
     parser.add_argument("--elevation", help="new location elevation in meters")
     parser.add_argument("--address", help="new location address.  attempt to look up geolocation automatically.")
     parser.add_argument("--search", help="search for a MotionNode POE device using Zeroconf.", action="store_true")
-    
+    parser.add_argument("--cache", help="location lookup cache file, empty to disable", default=DefaultPathname)
+    parser.add_argument("--cache-ttl", help="location lookup cache time to live in days", type=float, default=30)
+    parser.add_argument("--offline", help="only use cached location lookups", action="store_true")
+    parser.add_argument("--manifest", help="CSV or JSON file of devices and locations to set in one batch")
+    parser.add_argument("--jobs", help="number of devices to set at once in batch mode", type=int, default=16)
+    parser.add_argument("--verify", help="read the location back from the device and compare it to the new location", action="store_true")
+
     parser.add_argument(
         "--host", help="IP address of the MotionNode POE device", default="127.0.0.1"
     )
 
     args = parser.parse_args()
 
-    connect_and_set_location(args)
+    if args.manifest:
+        if not set_location_batch(args):
+            return 1
+    else:
+        if not connect_and_set_location(args):
+            return 1
 
 
 if __name__ == "__main__":